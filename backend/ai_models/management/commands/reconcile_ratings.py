@@ -0,0 +1,75 @@
+"""
+Repair drift between stored rating aggregates and approved reviews.
+"""
+from django.core.management.base import BaseCommand
+from ai_models.models import AIModel
+
+
+class Command(BaseCommand):
+    help = "Recompute AI model rating aggregates from reviews and fix any drift"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--model', dest='model_id', help="Only reconcile the model with this id")
+        parser.add_argument('--batch-size', type=int, default=500, help="Models checked per query")
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing")
+    
+    def handle(self, *args, **options):
+        queryset = AIModel.objects.order_by('pk')
+        if options['model_id']:
+            queryset = queryset.filter(pk=options['model_id'])
+        
+        batch_size = options['batch_size']
+        checked = repaired = 0
+        last_pk = None
+        
+        while True:
+            batch = queryset
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(
+                batch.annotate(**{
+                    f'actual_{name}': expression
+                    for name, expression in AIModel.rating_aggregates().items()
+                })[:batch_size]
+            )
+            if not batch:
+                break
+            
+            for model in batch:
+                checked += 1
+                if self.reconcile(model, options['dry_run']):
+                    repaired += 1
+            last_pk = batch[-1].pk
+        
+        action = 'would repair' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} models, {action} {repaired}"
+        ))
+    
+    def reconcile(self, model, dry_run):
+        """Fix a single model's rating state; return True if it had drifted."""
+        stored = {field: getattr(model, field) for field in AIModel.RATING_STATE_FIELDS}
+        
+        model.set_rating_state(
+            model.actual_rating_sum,
+            model.actual_rating_count,
+            {
+                rating: getattr(model, f'actual_{field}')
+                for rating, field in AIModel.RATING_BUCKET_FIELDS.items()
+            }
+        )
+        actual = {field: getattr(model, field) for field in AIModel.RATING_STATE_FIELDS}
+        
+        if stored == actual:
+            return False
+        
+        drifted = ', '.join(
+            f"{field}: {stored[field]} -> {actual[field]}"
+            for field in AIModel.RATING_STATE_FIELDS
+            if stored[field] != actual[field]
+        )
+        self.stdout.write(f"{model.api_name}: {drifted}")
+        
+        if not dry_run:
+            model.save(update_fields=AIModel.RATING_STATE_FIELDS + ['updated_at'])
+        return True
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('nlp', 'Natural Language Processing'), ('computer_vision', 'Computer Vision'), ('speech', 'Speech & Audio'), ('recommendation', 'Recommendation Systems'), ('forecasting', 'Forecasting & Prediction'), ('classification', 'Classification'), ('generation', 'Content Generation'), ('translation', 'Translation'), ('sentiment', 'Sentiment Analysis'), ('other', 'Other')], max_length=50)),
+                ('api_name', models.CharField(max_length=100, unique=True)),
+                ('api_endpoint', models.URLField()),
+                ('api_version', models.CharField(default='v1', max_length=20)),
+                ('tags', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), default=list, help_text='Tags for categorization and search', size=20)),
+                ('thumbnail_url', models.URLField(blank=True, null=True)),
+                ('documentation_url', models.URLField(blank=True, null=True)),
+                ('example_request', models.JSONField(blank=True, default=dict)),
+                ('example_response', models.JSONField(blank=True, default=dict)),
+                ('pricing_type', models.CharField(choices=[('per_request', 'Per Request'), ('per_token', 'Per Token'), ('subscription', 'Subscription'), ('free', 'Free')], default='per_request', max_length=20)),
+                ('price_per_request', models.DecimalField(decimal_places=4, default=0.0001, max_digits=10)),
+                ('price_per_token', models.DecimalField(decimal_places=6, default=1e-06, max_digits=10)),
+                ('monthly_subscription_price', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('rate_limit_per_minute', models.PositiveIntegerField(default=60)),
+                ('rate_limit_per_hour', models.PositiveIntegerField(default=1000)),
+                ('rate_limit_per_day', models.PositiveIntegerField(default=10000)),
+                ('max_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('supported_languages', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=10), default=list, help_text="Supported language codes (e.g., 'en', 'es', 'fr')", size=50)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive'), ('deprecated', 'Deprecated'), ('beta', 'Beta'), ('maintenance', 'Under Maintenance')], default='active', max_length=20)),
+                ('is_public', models.BooleanField(default=True)),
+                ('total_requests', models.PositiveIntegerField(default=0)),
+                ('average_response_time', models.FloatField(default=0.0)),
+                ('success_rate', models.FloatField(default=100.0)),
+                ('average_rating', models.FloatField(default=0.0)),
+                ('total_reviews', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'AI Model',
+                'verbose_name_plural': 'AI Models',
+                'db_table': 'models',
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('developers', '0001_initial'),
+        ('ai_models', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimodel',
+            name='developer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='models', to='developers.developer'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['api_name'], name='models_api_nam_1fae65_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['category'], name='models_categor_0ea9a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['status'], name='models_status_2e8f5a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['is_public'], name='models_is_publ_94df98_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['developer'], name='models_develop_2c465b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['created_at'], name='models_created_3dc094_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['average_rating'], name='models_average_9b2a20_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='aimodel',
+            constraint=models.CheckConstraint(check=models.Q(('average_rating__gte', 0), ('average_rating__lte', 5)), name='valid_rating_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='aimodel',
+            constraint=models.CheckConstraint(check=models.Q(('success_rate__gte', 0), ('success_rate__lte', 100)), name='valid_success_rate'),
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+# Rating buckets of ai_models.AIModel at the time of this migration
+RATING_BUCKET_FIELDS = {
+    1: 'rating_1_count',
+    2: 'rating_2_count',
+    3: 'rating_3_count',
+    4: 'rating_4_count',
+    5: 'rating_5_count',
+}
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    """
+    Fill the new rating aggregates from the approved reviews, the same
+    recompute as reconcile_ratings, so review writes apply their deltas
+    to the real totals.
+    """
+    AIModel = apps.get_model('ai_models', 'AIModel')
+
+    approved = Q(reviews__is_approved=True)
+    aggregates = {
+        'actual_rating_sum': Coalesce(Sum('reviews__rating', filter=approved), 0),
+        'actual_rating_count': Count('reviews', filter=approved),
+    }
+    for rating, field in RATING_BUCKET_FIELDS.items():
+        aggregates[f'actual_{field}'] = Count('reviews', filter=approved & Q(reviews__rating=rating))
+
+    for model in AIModel.objects.annotate(**aggregates).iterator():
+        rating_sum = model.actual_rating_sum
+        rating_count = model.actual_rating_count
+
+        state = {
+            'rating_sum': rating_sum,
+            'rating_count': rating_count,
+            'total_reviews': rating_count,
+            # Rounded half-up like AIModel.set_rating_state()
+            'average_rating': float(
+                (Decimal(rating_sum) / rating_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            ) if rating_count else 0.0,
+        }
+        for field in RATING_BUCKET_FIELDS.values():
+            state[field] = getattr(model, f'actual_{field}')
+
+        AIModel.objects.filter(pk=model.pk).update(**state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0002_initial'),
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='aimodel',
+            name='models_status_2e8f5a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='aimodel',
+            name='models_is_publ_94df98_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='aimodel',
+            name='models_develop_2c465b_idx',
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        # Start the aggregates from the existing reviews, not from zero
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(condition=models.Q(('is_public', True), ('status', 'active')), fields=['-created_at'], name='model_catalog_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(condition=models.Q(('is_public', True), ('status', 'active')), fields=['category', '-created_at'], name='model_catalog_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(condition=models.Q(('is_public', True), ('status', 'active')), fields=['-average_rating', '-total_requests'], name='model_catalog_rating_idx'),
+        ),
+    ]
@@ -2,8 +2,12 @@
 AI Model models for the platform.
 """
 import uuid
+from decimal import Decimal, ROUND_HALF_UP
 from django.db import models
-from django.contrib.postgres.fields import ArrayField, JSONField
+from django.db.models import Count, DecimalField, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from core.models import BaseModel
 from developers.models import Developer
@@ -41,6 +45,20 @@ class AIModel(BaseModel):
         ('free', 'Free'),
     ]
     
+    # Histogram bucket field for each star rating
+    RATING_BUCKET_FIELDS = {
+        1: 'rating_1_count',
+        2: 'rating_2_count',
+        3: 'rating_3_count',
+        4: 'rating_4_count',
+        5: 'rating_5_count',
+    }
+    RATING_STATE_FIELDS = [
+        'average_rating', 'total_reviews', 'rating_sum', 'rating_count',
+        'rating_1_count', 'rating_2_count', 'rating_3_count',
+        'rating_4_count', 'rating_5_count',
+    ]
+    
     # Basic information
     developer = models.ForeignKey(Developer, on_delete=models.CASCADE, related_name='models')
     name = models.CharField(max_length=200)
@@ -63,8 +81,8 @@ class AIModel(BaseModel):
     # Visual and documentation
     thumbnail_url = models.URLField(blank=True, null=True)
     documentation_url = models.URLField(blank=True, null=True)
-    example_request = JSONField(default=dict, blank=True)
-    example_response = JSONField(default=dict, blank=True)
+    example_request = models.JSONField(default=dict, blank=True)
+    example_response = models.JSONField(default=dict, blank=True)
     
     # Pricing and limits
     pricing_type = models.CharField(max_length=20, choices=PRICING_TYPE_CHOICES, default='per_request')
@@ -99,6 +117,15 @@ class AIModel(BaseModel):
     average_rating = models.FloatField(default=0.0)
     total_reviews = models.PositiveIntegerField(default=0)
     
+    # Incremental rating aggregates over approved reviews (see apply_rating_change)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    
     class Meta:
         db_table = 'models'
         verbose_name = 'AI Model'
@@ -106,11 +133,24 @@ class AIModel(BaseModel):
         indexes = [
             models.Index(fields=['api_name']),
             models.Index(fields=['category']),
-            models.Index(fields=['status']),
-            models.Index(fields=['is_public']),
-            models.Index(fields=['developer']),
             models.Index(fields=['created_at']),
             models.Index(fields=['average_rating']),
+            # Public catalog (active and public models) only
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status='active', is_public=True),
+                name='model_catalog_recent_idx'
+            ),
+            models.Index(
+                fields=['category', '-created_at'],
+                condition=models.Q(status='active', is_public=True),
+                name='model_catalog_category_idx'
+            ),
+            models.Index(
+                fields=['-average_rating', '-total_requests'],
+                condition=models.Q(status='active', is_public=True),
+                name='model_catalog_rating_idx'
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -129,7 +169,7 @@ class AIModel(BaseModel):
     def increment_request_count(self):
         """Increment total request count."""
         self.total_requests += 1
-        self.save(update_fields=['total_requests'])
+        self.save(update_fields=['total_requests', 'updated_at'])
     
     def update_average_response_time(self, new_response_time):
         """Update average response time with new measurement."""
@@ -140,7 +180,7 @@ class AIModel(BaseModel):
             current_total = self.average_response_time * (self.total_requests - 1)
             self.average_response_time = (current_total + new_response_time) / self.total_requests
         
-        self.save(update_fields=['average_response_time'])
+        self.save(update_fields=['average_response_time', 'updated_at'])
     
     def update_success_rate(self, was_successful):
         """Update success rate based on request outcome."""
@@ -154,23 +194,91 @@ class AIModel(BaseModel):
             
             self.success_rate = (current_successful / self.total_requests) * 100.0
         
-        self.save(update_fields=['success_rate'])
+        self.save(update_fields=['success_rate', 'updated_at'])
     
-    def update_rating(self):
-        """Update average rating from reviews."""
-        from reviews.models import ModelReview
-        reviews = ModelReview.objects.filter(model=self)
+    @property
+    def rating_distribution(self):
+        """Get review counts per star rating."""
+        return {
+            str(rating): getattr(self, field)
+            for rating, field in self.RATING_BUCKET_FIELDS.items()
+        }
+    
+    @classmethod
+    def rating_aggregates(cls):
+        """Get aggregate expressions computing rating state from approved reviews."""
+        approved = Q(reviews__is_approved=True)
+        aggregates = {
+            'rating_sum': Coalesce(Sum('reviews__rating', filter=approved), 0),
+            'rating_count': Count('reviews', filter=approved),
+        }
+        for rating, field in cls.RATING_BUCKET_FIELDS.items():
+            aggregates[field] = Count('reviews', filter=approved & Q(reviews__rating=rating))
+        return aggregates
+    
+    def set_rating_state(self, rating_sum, rating_count, distribution):
+        """Set all rating fields from a sum, count and {rating: count} histogram."""
+        self.rating_sum = rating_sum
+        self.rating_count = rating_count
+        for rating, field in self.RATING_BUCKET_FIELDS.items():
+            setattr(self, field, distribution.get(rating, 0))
         
-        if reviews.exists():
-            from django.db.models import Avg
-            avg_rating = reviews.aggregate(avg=Avg('rating'))['avg'] or 0
-            self.average_rating = round(avg_rating, 2)
-            self.total_reviews = reviews.count()
-        else:
-            self.average_rating = 0.0
-            self.total_reviews = 0
+        self.total_reviews = rating_count
+        self.average_rating = float(
+            (Decimal(rating_sum) / rating_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        ) if rating_count else 0.0
+    
+    def apply_rating_change(self, old_rating=None, new_rating=None):
+        """
+        Apply a single review's rating change to the stored aggregates.
+        
+        ``old_rating``/``new_rating`` are the review's contribution before and
+        after the write (None when it didn't count, e.g. new or unapproved).
+        All fields are updated by delta in one UPDATE, so concurrent review
+        writes can't lose counts.
+        """
+        if old_rating == new_rating:
+            return
+        
+        sum_delta = (new_rating or 0) - (old_rating or 0)
+        count_delta = (1 if new_rating else 0) - (1 if old_rating else 0)
+        new_sum = F('rating_sum') + sum_delta
+        new_count = F('rating_count') + count_delta
+        
+        updates = {
+            'rating_sum': new_sum,
+            'rating_count': new_count,
+            'total_reviews': new_count,
+            # Exact numeric division, rounded half-up like set_rating_state()
+            'average_rating': Coalesce(
+                Cast(
+                    Cast(new_sum, DecimalField(max_digits=20, decimal_places=6)) / NullIf(new_count, 0),
+                    DecimalField(max_digits=4, decimal_places=2)
+                ),
+                0.0,
+                output_field=FloatField()
+            ),
+            'updated_at': timezone.now(),
+        }
+        if old_rating:
+            field = self.RATING_BUCKET_FIELDS[old_rating]
+            updates[field] = F(field) - 1
+        if new_rating:
+            field = self.RATING_BUCKET_FIELDS[new_rating]
+            updates[field] = F(field) + 1
+        
+        AIModel.objects.filter(pk=self.pk).update(**updates)
+    
+    def update_rating(self):
+        """Recompute rating aggregates from approved reviews."""
+        state = AIModel.objects.filter(pk=self.pk).aggregate(**self.rating_aggregates())
         
-        self.save(update_fields=['average_rating', 'total_reviews'])
+        self.set_rating_state(
+            state['rating_sum'],
+            state['rating_count'],
+            {rating: state[field] for rating, field in self.RATING_BUCKET_FIELDS.items()}
+        )
+        self.save(update_fields=self.RATING_STATE_FIELDS + ['updated_at'])
     
     def is_rate_limited(self, user, time_window='minute'):
         """Check if user has exceeded rate limits."""
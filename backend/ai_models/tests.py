@@ -1,3 +1,191 @@
+import io
+from decimal import Decimal
+from unittest import mock
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+from core.read_serializers import compile_serializer
+from core.testing import create_developer, create_model, create_user
+from reviews.models import ModelReview
+from .models import AIModel
+from .serializers import AIModelListSerializer
 
-# Create your tests here.
+
+class CompiledListSerializerTests(TestCase):
+    """
+    The compiled model list must render exactly like the DRF serializer.
+    """
+    
+    def setUp(self):
+        developer = create_developer()
+        for index, category in enumerate(['nlp', 'computer_vision', 'speech']):
+            create_model(
+                developer,
+                name=f'Model {index}',
+                api_name=f'model-{index}',
+                category=category,
+                tags=['test', category],
+                price_per_request=Decimal('0.0125'),
+                average_rating=4.5
+            )
+    
+    def test_compiled_rows_match_serializer_output(self):
+        compiled = compile_serializer(AIModelListSerializer)
+        queryset = AIModel.objects.order_by('name')
+        
+        expected = AIModelListSerializer(queryset, many=True).data
+        actual = compiled.represent_many(compiled.values(queryset))
+        
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual[0]['category_display'], 'Natural Language Processing')
+    
+    def test_list_endpoint_uses_compiled_rows(self):
+        response = APIClient().get('/api/v1/models/?ordering=name')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['results'],
+            [dict(item) for item in AIModelListSerializer(AIModel.objects.order_by('name'), many=True).data]
+        )
+
+
+class RatingAggregateTests(TestCase):
+    """
+    Review writes must keep a model's rating aggregates equal to a
+    recompute over its approved reviews, and reconcile_ratings must repair
+    aggregates that have drifted.
+    """
+    
+    def setUp(self):
+        self.model = create_model(create_developer())
+    
+    def review(self, username, rating):
+        """Create a review of the model."""
+        return ModelReview.objects.create(
+            model=self.model, user=create_user(username), rating=rating,
+            review_title='Review', review_text='Review text'
+        )
+    
+    def assertRatingState(self, rating_sum, distribution, average):
+        """Check the stored aggregates against the expected histogram and average."""
+        model = AIModel.objects.get(pk=self.model.pk)
+        rating_count = sum(distribution.values())
+        self.assertEqual(model.rating_sum, rating_sum)
+        self.assertEqual(model.rating_count, rating_count)
+        self.assertEqual(model.total_reviews, rating_count)
+        self.assertEqual(
+            model.rating_distribution,
+            {str(rating): distribution.get(rating, 0) for rating in range(1, 6)}
+        )
+        self.assertEqual(model.average_rating, average)
+    
+    def test_create(self):
+        self.review('first', 4)
+        self.assertRatingState(4, {4: 1}, 4.0)
+        
+        self.review('second', 5)
+        self.assertRatingState(9, {4: 1, 5: 1}, 4.5)
+    
+    def test_average_rounds_half_up(self):
+        for index, rating in enumerate([1, 1, 2]):
+            self.review(f'user{index}', rating)
+        self.assertRatingState(4, {1: 2, 2: 1}, 1.33)
+        
+        self.review('user3', 4)
+        self.assertRatingState(8, {1: 2, 2: 1, 4: 1}, 2.0)
+    
+    def test_rating_edit(self):
+        review = self.review('first', 4)
+        self.review('second', 5)
+        
+        review.rating = 2
+        review.save()
+        self.assertRatingState(7, {2: 1, 5: 1}, 3.5)
+        
+        # A freshly loaded instance applies its delta the same way
+        review = ModelReview.objects.get(pk=review.pk)
+        review.rating = 3
+        review.save()
+        self.assertRatingState(8, {3: 1, 5: 1}, 4.0)
+    
+    def test_approval(self):
+        self.review('first', 2)
+        review = self.review('second', 5)
+        
+        review.is_approved = False
+        review.save()
+        self.assertRatingState(2, {2: 1}, 2.0)
+        
+        # Saving an unapproved review again changes nothing
+        review.review_text = 'Edited'
+        review.save()
+        self.assertRatingState(2, {2: 1}, 2.0)
+        
+        review = ModelReview.objects.get(pk=review.pk)
+        review.is_approved = True
+        review.save(update_fields=['is_approved', 'updated_at'])
+        self.assertRatingState(7, {2: 1, 5: 1}, 3.5)
+    
+    def test_delete(self):
+        review = self.review('first', 4)
+        self.review('second', 5)
+        
+        ModelReview.objects.get(pk=review.pk).delete()
+        self.assertRatingState(5, {5: 1}, 5.0)
+        
+        unapproved = self.review('third', 1)
+        unapproved.is_approved = False
+        unapproved.save()
+        unapproved.delete()
+        self.assertRatingState(5, {5: 1}, 5.0)
+    
+    def test_stale_instances_apply_deltas_from_the_stored_rating(self):
+        review = self.review('first', 4)
+        stale = ModelReview.objects.get(pk=review.pk)
+        
+        review.rating = 5
+        review.save()
+        stale.rating = 2
+        stale.save()
+        self.assertRatingState(2, {2: 1}, 2.0)
+        
+        # A stale unapproved copy must not count the review twice
+        review.is_approved = False
+        review.save()
+        stale.review_text = 'Edited'
+        stale.save(update_fields=['review_text', 'rating', 'updated_at'])
+        self.assertRatingState(0, {}, 0.0)
+        
+        stale.delete()
+        self.assertRatingState(0, {}, 0.0)
+    
+    def test_failed_aggregate_update_rolls_back_the_review(self):
+        review = self.review('first', 4)
+        
+        review.rating = 1
+        with mock.patch.object(AIModel, 'apply_rating_change', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                review.save()
+        self.assertEqual(ModelReview.objects.get(pk=review.pk).rating, 4)
+        self.assertRatingState(4, {4: 1}, 4.0)
+    
+    def test_reconcile_repairs_drift(self):
+        self.review('first', 4)
+        self.review('second', 5)
+        AIModel.objects.filter(pk=self.model.pk).update(
+            rating_sum=100, rating_count=3, total_reviews=3, rating_3_count=3, average_rating=1.0
+        )
+        
+        output = io.StringIO()
+        call_command('reconcile_ratings', dry_run=True, stdout=output)
+        self.assertIn('would repair 1', output.getvalue())
+        self.assertEqual(AIModel.objects.get(pk=self.model.pk).rating_sum, 100)
+        
+        output = io.StringIO()
+        call_command('reconcile_ratings', stdout=output)
+        self.assertIn('rating_sum: 100 -> 9', output.getvalue())
+        self.assertRatingState(9, {4: 1, 5: 1}, 4.5)
+        
+        output = io.StringIO()
+        call_command('reconcile_ratings', stdout=output)
+        self.assertIn('Checked 1 models, repaired 0', output.getvalue())
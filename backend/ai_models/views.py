@@ -8,7 +8,11 @@ from rest_framework.viewsets import ModelViewSet
 from django.db.models import Count, Avg, Sum, Q
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
+from core.mixins import CompiledListMixin, ConditionalGetMixin, ProjectedListMixin
+from core.projection import project_queryset
 from core.permissions import IsOwnerDeveloperOrAdmin, IsDeveloperOrAdmin
+from core.principal import get_principal
+from core.timebuckets import count_current_periods, get_request_timezone
 from .models import AIModel
 from .serializers import (
     AIModelSerializer,
@@ -77,11 +81,15 @@ class AIModelFilter:
         return queryset
 
 
-class AIModelViewSet(ModelViewSet):
+class AIModelViewSet(ConditionalGetMixin, CompiledListMixin, ProjectedListMixin, ModelViewSet):
     """
     ViewSet for managing AI models.
     """
     queryset = AIModel.objects.select_related('developer__user').all()
+    # The detail payload nests the developer's totals over all of their
+    # models, which this model's timestamps don't track, so only list is conditional
+    conditional_actions = ['list']
+    conditional_timestamp_fields = ['updated_at', 'developer__updated_at']
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description', 'tags', 'category']
     ordering_fields = [
@@ -114,20 +122,16 @@ class AIModelViewSet(ModelViewSet):
     
     def get_queryset(self):
         queryset = super().get_queryset()
+        principal = get_principal(self.request)
         
         # For public listing, only show active and public models
-        if self.action == 'list' and not (
-            self.request.user.is_authenticated and 
-            hasattr(self.request.user, 'developer_profile')
-        ):
+        if self.action == 'list' and not principal.is_developer:
             queryset = queryset.filter(status='active', is_public=True)
         
         # Developers can see their own models regardless of status
-        elif (self.request.user.is_authenticated and 
-              hasattr(self.request.user, 'developer_profile') and
-              not self.request.user.is_staff):
+        elif principal.is_developer and not principal.is_staff:
             if self.action in ['update', 'partial_update', 'destroy']:
-                queryset = queryset.filter(developer=self.request.user.developer_profile)
+                queryset = queryset.filter(developer_id=principal.developer_id)
         
         # Apply custom filters
         queryset = AIModelFilter.filter_queryset(queryset, self.request)
@@ -137,7 +141,7 @@ class AIModelViewSet(ModelViewSet):
     def create(self, request, *args, **kwargs):
         """Create AI model."""
         # Check if user has developer profile
-        if not hasattr(request.user, 'developer_profile'):
+        if not get_principal(request).is_developer:
             return Response(
                 {'error': 'Only developers can create AI models'},
                 status=status.HTTP_403_FORBIDDEN
@@ -155,32 +159,34 @@ class AIModelViewSet(ModelViewSet):
         model = self.get_object()
         
         # Import here to avoid circular imports
-        from user_history.models import UserHistory
+        from user_history.models import UserHistory, UserModelUsage
         from reviews.models import ModelReview
-        from django.utils import timezone
-        from datetime import timedelta
         
-        # Calculate statistics
+        # Calculate statistics from the per-user usage summaries
         interactions = UserHistory.objects.filter(model=model)
-        total_interactions = interactions.count()
-        unique_users = interactions.values('user').distinct().count()
+        usage = UserModelUsage.objects.filter(model=model).aggregate(
+            total_interactions=Sum('interaction_count'),
+            unique_users=Count('id'),
+            total_tokens=Sum('total_tokens')
+        )
+        total_interactions = usage['total_interactions'] or 0
+        unique_users = usage['unique_users']
         
         # Calculate revenue
         total_revenue = 0
         if model.pricing_type == 'per_request':
             total_revenue = float(model.price_per_request) * model.total_requests
         elif model.pricing_type == 'per_token':
-            total_tokens = interactions.aggregate(
-                total=Sum('input_tokens') + Sum('output_tokens')
-            )['total'] or 0
+            total_tokens = usage['total_tokens'] or 0
             total_revenue = float(model.price_per_token) * total_tokens
         
         # Time-based metrics
-        today = timezone.now().date()
-        requests_today = interactions.filter(created_at__date=today).count()
+        try:
+            tz = get_request_timezone(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        first_day_of_month = today.replace(day=1)
-        requests_this_month = interactions.filter(created_at__date__gte=first_day_of_month).count()
+        current_periods = count_current_periods(interactions, tz)
         
         stats_data = {
             'total_requests': model.total_requests,
@@ -191,8 +197,8 @@ class AIModelViewSet(ModelViewSet):
             'average_rating': round(model.average_rating, 2),
             'total_reviews': model.total_reviews,
             'total_revenue': round(total_revenue, 2),
-            'requests_today': requests_today,
-            'requests_this_month': requests_this_month,
+            'requests_today': current_periods['today'],
+            'requests_this_month': current_periods['this_month'],
         }
         
         serializer = AIModelStatsSerializer(stats_data)
@@ -200,7 +206,7 @@ class AIModelViewSet(ModelViewSet):
     
     @extend_schema(
         summary="Get model reviews",
-        description="Get all reviews for the AI model"
+        description="Get paginated reviews for the AI model"
     )
     @action(detail=True, methods=['get'])
     def reviews(self, request, pk=None):
@@ -209,10 +215,23 @@ class AIModelViewSet(ModelViewSet):
         
         # Import here to avoid circular imports
         from reviews.models import ModelReview
-        from reviews.serializers import ModelReviewSerializer
+        from reviews.serializers import ModelReviewSerializer, prefetch_user_votes
+        
+        reviews = ModelReview.objects.filter(model=model).select_related(
+            'user', 'model__developer'
+        ).order_by('-created_at')
+        reviews = prefetch_user_votes(reviews, request.user)
+        
+        # Pagination
+        from core.pagination import CustomPageNumberPagination
+        paginator = CustomPageNumberPagination()
+        page = paginator.paginate_queryset(reviews, request)
+        
+        if page is not None:
+            serializer = ModelReviewSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         
-        reviews = ModelReview.objects.filter(model=model).order_by('-created_at')
-        serializer = ModelReviewSerializer(reviews, many=True)
+        serializer = ModelReviewSerializer(reviews, many=True, context={'request': request})
         return Response(serializer.data)
     
     @extend_schema(
@@ -228,7 +247,10 @@ class AIModelViewSet(ModelViewSet):
         from user_history.models import UserHistory
         from user_history.serializers import UserHistoryListSerializer
         
-        history = UserHistory.objects.filter(model=model).order_by('-created_at')
+        history = project_queryset(
+            UserHistory.objects.filter(model=model).order_by('-created_at'),
+            UserHistoryListSerializer
+        )
         
         # Pagination
         from core.pagination import CustomPageNumberPagination
@@ -269,7 +291,7 @@ class AIModelViewSet(ModelViewSet):
         elif ordering in ['requests', '-requests']:
             ordering = ordering.replace('requests', 'total_requests')
         
-        queryset = queryset.order_by(ordering)
+        queryset = project_queryset(queryset.order_by(ordering), AIModelSearchSerializer)
         
         # Pagination
         from core.pagination import CustomPageNumberPagination
@@ -296,7 +318,8 @@ class AIModelViewSet(ModelViewSet):
             is_public=True,
             average_rating__gte=4.0,
             total_requests__gte=100
-        ).order_by('-average_rating', '-total_requests')[:12]
+        ).order_by('-average_rating', '-total_requests')
+        queryset = project_queryset(queryset, AIModelListSerializer)[:12]
         
         serializer = AIModelListSerializer(queryset, many=True)
         return Response(serializer.data)
@@ -8,4 +8,7 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_platform.settings')
 
+# Request threads wait on a bounded pool for password hashing instead of hashing inline
+os.environ.setdefault('PASSWORD_HASHING_WORKERS', str(os.cpu_count() or 1))
+
 application = get_asgi_application()
@@ -29,6 +29,7 @@ DJANGO_APPS = [
 THIRD_PARTY_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'drf_spectacular',
     'django_filters',
@@ -49,6 +50,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryInspectionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -56,6 +59,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.PrincipalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -114,6 +118,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: the first hasher encodes new passwords, the rest verify older hashes
+# and upgrade them on login. PASSWORD_HASHER=pbkdf2 keeps PBKDF2 for new passwords.
+PASSWORD_HASHERS = [
+    'users.hashers.TunedArgon2PasswordHasher',
+    'users.hashers.PooledPBKDF2PasswordHasher',
+]
+if config('PASSWORD_HASHER', default='argon2') == 'pbkdf2':
+    PASSWORD_HASHERS.reverse()
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=19456, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=1, cast=int)
+
+# Hashes run at most this many at a time on a worker pool (0 hashes in the request thread);
+# asgi.py defaults it to the CPU count
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -135,7 +155,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.ClaimsJWTAuthentication',
+        'developers.authentication.APIKeyAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -150,10 +171,10 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'core.parsers.ORJSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
@@ -166,7 +187,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=config('JWT_REFRESH_TOKEN_LIFETIME', default=7, cast=int)),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # Logins are tracked by authentication.login_tracking instead
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': config('JWT_SECRET_KEY', default=SECRET_KEY),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -174,6 +196,47 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Users of JWTs issued without principal claims are cached in process (seconds)
+JWT_USER_CACHE_TIMEOUT = config('JWT_USER_CACHE_TIMEOUT', default=60, cast=int)
+
+# Seconds logins are buffered before last_login and login_count are written (0 writes each login)
+LOGIN_TRACKING_INTERVAL = config('LOGIN_TRACKING_INTERVAL', default=5, cast=int)
+
+# Refresh token blacklist filter: seconds between syncs with the blacklist table and full rebuilds,
+# and how far back each sync re-reads for rows committed after the previous one
+TOKEN_BLACKLIST_SYNC_INTERVAL = config('TOKEN_BLACKLIST_SYNC_INTERVAL', default=5, cast=int)
+TOKEN_BLACKLIST_REBUILD_INTERVAL = config('TOKEN_BLACKLIST_REBUILD_INTERVAL', default=3600, cast=int)
+TOKEN_BLACKLIST_SYNC_OVERLAP = config('TOKEN_BLACKLIST_SYNC_OVERLAP', default=60, cast=int)
+
+# Fraction of requests measured into the /api/v1/_metrics histograms; every request is counted
+METRICS_SAMPLE_RATE = config('METRICS_SAMPLE_RATE', default=0.1, cast=float)
+
+# Query inspection (on with DEBUG): statements repeated this many times in one request are
+# logged as likely N+1 patterns, and queries slower than the threshold with their plan
+QUERY_INSPECTION = config('QUERY_INSPECTION', default=DEBUG, cast=bool)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_SLOW_THRESHOLD_MS = config('QUERY_SLOW_THRESHOLD_MS', default=100, cast=int)
+
+# Most queries a request to each (view, method) may issue; overruns are logged, or raised with QUERY_BUDGET_RAISE
+QUERY_BUDGETS = {
+    ('developers:developer-list', 'GET'): 4,
+    ('ai_models:aimodel-list', 'GET'): 6,
+    ('ai_models:aimodel-detail', 'GET'): 6,
+    ('reviews:modelreview-list', 'GET'): 5,
+    ('user_history:userhistory-list', 'GET'): 3,
+    ('api_logs:apiusagelog-list', 'GET'): 3,
+}
+QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=False, cast=bool)
+
+# Developer API key lookup caching (seconds)
+API_KEY_CACHE_TIMEOUT = config('API_KEY_CACHE_TIMEOUT', default=300, cast=int)
+API_KEY_LOCAL_CACHE_TIMEOUT = config('API_KEY_LOCAL_CACHE_TIMEOUT', default=30, cast=int)
+
+# Developer quota: calls reserved per block for frequent callers (0 charges every
+# call in the database) and seconds before unspent reservations are refunded
+QUOTA_RESERVATION_SIZE = config('QUOTA_RESERVATION_SIZE', default=0, cast=int)
+QUOTA_RESERVATION_TIMEOUT = config('QUOTA_RESERVATION_TIMEOUT', default=5, cast=int)
+
 # API Documentation with Spectacular
 SPECTACULAR_SETTINGS = {
     'TITLE': 'AI Model Platform API',
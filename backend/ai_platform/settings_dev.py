@@ -28,6 +28,7 @@ DJANGO_APPS = [
 
 THIRD_PARTY_APPS = [
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     'drf_spectacular',
@@ -47,12 +48,15 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryInspectionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.PrincipalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -104,6 +108,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: the first hasher encodes new passwords, the rest verify older hashes
+# and upgrade them on login. PASSWORD_HASHER=pbkdf2 keeps PBKDF2 for new passwords.
+PASSWORD_HASHERS = [
+    'users.hashers.TunedArgon2PasswordHasher',
+    'users.hashers.PooledPBKDF2PasswordHasher',
+]
+if config('PASSWORD_HASHER', default='argon2') == 'pbkdf2':
+    PASSWORD_HASHERS.reverse()
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=19456, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=1, cast=int)
+
+# Hashes run at most this many at a time on a worker pool (0 hashes in the request thread);
+# asgi.py defaults it to the CPU count
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -127,16 +147,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.ClaimsJWTAuthentication',
+        'developers.authentication.APIKeyAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'core.parsers.ORJSONParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'core.pagination.CustomPageNumberPagination',
     'PAGE_SIZE': 20,
@@ -175,6 +196,23 @@ SPECTACULAR_SETTINGS = {
 # Development-specific settings
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Query inspection: statements repeated this many times in one request are logged as
+# likely N+1 patterns, and queries slower than the threshold with their plan
+QUERY_INSPECTION = True
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_SLOW_THRESHOLD_MS = config('QUERY_SLOW_THRESHOLD_MS', default=100, cast=int)
+
+# Most queries a request to each (view, method) may issue; overruns are logged, or raised with QUERY_BUDGET_RAISE
+QUERY_BUDGETS = {
+    ('developers:developer-list', 'GET'): 4,
+    ('ai_models:aimodel-list', 'GET'): 6,
+    ('ai_models:aimodel-detail', 'GET'): 6,
+    ('reviews:modelreview-list', 'GET'): 5,
+    ('user_history:userhistory-list', 'GET'): 3,
+    ('api_logs:apiusagelog-list', 'GET'): 3,
+}
+QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=False, cast=bool)
+
 # Development logging
 LOGGING = {
     'version': 1,
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+import django.core.validators
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APIMetrics',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('period_type', models.CharField(choices=[('hourly', 'Hourly'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=20)),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('total_requests', models.PositiveIntegerField(default=0)),
+                ('successful_requests', models.PositiveIntegerField(default=0)),
+                ('failed_requests', models.PositiveIntegerField(default=0)),
+                ('average_response_time_ms', models.FloatField(default=0.0)),
+                ('min_response_time_ms', models.PositiveIntegerField(default=0)),
+                ('max_response_time_ms', models.PositiveIntegerField(default=0)),
+                ('total_data_transferred_bytes', models.BigIntegerField(default=0)),
+                ('average_request_size_bytes', models.FloatField(default=0.0)),
+                ('average_response_size_bytes', models.FloatField(default=0.0)),
+                ('unique_users', models.PositiveIntegerField(default=0)),
+                ('unique_ip_addresses', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'API Metrics',
+                'verbose_name_plural': 'API Metrics',
+                'db_table': 'api_metrics',
+                'ordering': ['-period_start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='APIUsageLog',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('api_key_used', models.CharField(blank=True, max_length=255, null=True)),
+                ('request_method', models.CharField(choices=[('GET', 'GET'), ('POST', 'POST'), ('PUT', 'PUT'), ('PATCH', 'PATCH'), ('DELETE', 'DELETE')], max_length=10)),
+                ('request_path', models.TextField()),
+                ('request_params', models.JSONField(blank=True, default=dict)),
+                ('request_headers', models.JSONField(blank=True, default=dict)),
+                ('response_status_code', models.PositiveIntegerField()),
+                ('response_headers', models.JSONField(blank=True, default=dict)),
+                ('request_size_bytes', models.PositiveIntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('response_size_bytes', models.PositiveIntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('processing_time_ms', models.PositiveIntegerField(help_text='Total processing time in milliseconds', validators=[django.core.validators.MinValueValidator(0)])),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True)),
+                ('referer', models.URLField(blank=True, null=True)),
+                ('api_version', models.CharField(default='v1', max_length=20)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('error_code', models.CharField(blank=True, max_length=50, null=True)),
+            ],
+            options={
+                'verbose_name': 'API Usage Log',
+                'verbose_name_plural': 'API Usage Logs',
+                'db_table': 'api_usage_logs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
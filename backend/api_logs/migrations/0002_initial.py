@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('api_logs', '0001_initial'),
+        ('developers', '0001_initial'),
+        ('ai_models', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiusagelog',
+            name='developer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_logs', to='developers.developer'),
+        ),
+        migrations.AddField(
+            model_name='apiusagelog',
+            name='model',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_logs', to='ai_models.aimodel'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('api_logs', '0002_initial'),
+        ('developers', '0001_initial'),
+        ('ai_models', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiusagelog',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='apimetrics',
+            name='developer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='developers.developer'),
+        ),
+        migrations.AddField(
+            model_name='apimetrics',
+            name='model',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='ai_models.aimodel'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['user'], name='api_usage_l_user_id_2a4c3b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['developer'], name='api_usage_l_develop_29a75b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['model'], name='api_usage_l_model_i_56e5cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['api_key_used'], name='api_usage_l_api_key_8b2ce2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['request_method'], name='api_usage_l_request_145a46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['response_status_code'], name='api_usage_l_respons_08acf6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['created_at'], name='api_usage_l_created_c81af4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['ip_address'], name='api_usage_l_ip_addr_bfb878_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['api_version'], name='api_usage_l_api_ver_0df1e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apimetrics',
+            index=models.Index(fields=['period_type', 'period_start'], name='api_metrics_period__c41980_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apimetrics',
+            index=models.Index(fields=['model'], name='api_metrics_model_i_e997a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apimetrics',
+            index=models.Index(fields=['developer'], name='api_metrics_develop_caad4c_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='apimetrics',
+            unique_together={('period_type', 'period_start', 'developer'), ('period_type', 'period_start', 'model')},
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0003_rating_aggregates_and_catalog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('developers', '0003_hashed_api_keys_and_usage_period'),
+        ('api_logs', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_user_id_2a4c3b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_develop_29a75b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_model_i_56e5cc_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_api_key_8b2ce2_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_request_145a46_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_respons_08acf6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_ip_addr_bfb878_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apiusagelog',
+            name='api_usage_l_api_ver_0df1e6_idx',
+        ),
+        migrations.AlterField(
+            model_name='apiusagelog',
+            name='developer',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_logs', to='developers.developer'),
+        ),
+        migrations.AlterField(
+            model_name='apiusagelog',
+            name='model',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='api_logs', to='ai_models.aimodel'),
+        ),
+        migrations.AlterField(
+            model_name='apiusagelog',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['model', 'created_at'], include=('response_status_code', 'processing_time_ms'), name='api_log_model_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['developer', 'created_at'], include=('response_status_code', 'processing_time_ms'), name='api_log_dev_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['user', 'created_at'], name='api_log_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(condition=models.Q(('response_status_code__range', (200, 299)), _negated=True), fields=['developer', '-created_at'], name='api_log_dev_errors_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(condition=models.Q(('response_status_code__range', (200, 299)), _negated=True), fields=['model', '-created_at'], name='api_log_model_errors_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(condition=models.Q(('response_status_code__range', (200, 299)), _negated=True), fields=['-created_at'], name='api_log_errors_idx'),
+        ),
+    ]
@@ -9,6 +9,10 @@ from users.models import User
 from developers.models import Developer
 
 
+# Requests answered outside the 2xx range; the partial error indexes use this predicate
+FAILED_REQUEST_Q = ~models.Q(response_status_code__range=(200, 299))
+
+
 class APIUsageLog(BaseModel):
     """
     Track API usage across the platform.
@@ -21,25 +25,28 @@ class APIUsageLog(BaseModel):
         ('DELETE', 'DELETE'),
     ]
     
-    # Optional relationships (can be null for anonymous access)
+    # Optional relationships (can be null for anonymous access), indexed by the composites in Meta
     user = models.ForeignKey(
         User, 
         on_delete=models.SET_NULL, 
         null=True, 
         blank=True, 
-        related_name='api_logs'
+        related_name='api_logs',
+        db_index=False
     )
     developer = models.ForeignKey(
         Developer, 
         on_delete=models.SET_NULL, 
         null=True, 
         blank=True, 
-        related_name='api_logs'
+        related_name='api_logs',
+        db_index=False
     )
     model = models.ForeignKey(
         'ai_models.AIModel', 
         on_delete=models.CASCADE, 
-        related_name='api_logs'
+        related_name='api_logs',
+        db_index=False
     )
     
     # Request details
@@ -84,15 +91,32 @@ class APIUsageLog(BaseModel):
         verbose_name = 'API Usage Log'
         verbose_name_plural = 'API Usage Logs'
         indexes = [
-            models.Index(fields=['user']),
-            models.Index(fields=['developer']),
-            models.Index(fields=['model']),
-            models.Index(fields=['api_key_used']),
-            models.Index(fields=['request_method']),
-            models.Index(fields=['response_status_code']),
             models.Index(fields=['created_at']),
-            models.Index(fields=['ip_address']),
-            models.Index(fields=['api_version']),
+            # Per-owner time windows (stats endpoints); the covered columns
+            # let counts and latency trends run as index-only scans
+            models.Index(
+                fields=['model', 'created_at'],
+                include=['response_status_code', 'processing_time_ms'],
+                name='api_log_model_created_idx'
+            ),
+            models.Index(
+                fields=['developer', 'created_at'],
+                include=['response_status_code', 'processing_time_ms'],
+                name='api_log_dev_created_idx'
+            ),
+            models.Index(fields=['user', 'created_at'], name='api_log_user_created_idx'),
+            # Failed requests only, for error panels and dashboards
+            models.Index(
+                fields=['developer', '-created_at'],
+                condition=FAILED_REQUEST_Q,
+                name='api_log_dev_errors_idx'
+            ),
+            models.Index(
+                fields=['model', '-created_at'],
+                condition=FAILED_REQUEST_Q,
+                name='api_log_model_errors_idx'
+            ),
+            models.Index(fields=['-created_at'], condition=FAILED_REQUEST_Q, name='api_log_errors_idx'),
         ]
         ordering = ['-created_at']
     
@@ -120,6 +144,11 @@ class APIUsageLog(BaseModel):
         """Get total request + response size."""
         return self.request_size_bytes + self.response_size_bytes
     
+    @classmethod
+    def recent_errors(cls, **filters):
+        """Get failed requests newest first, served by the partial error indexes."""
+        return cls.objects.filter(FAILED_REQUEST_Q, **filters).order_by('-created_at')
+    
     def save(self, *args, **kwargs):
         # Set developer from model if not provided
         if not self.developer and self.model:
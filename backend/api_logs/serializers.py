@@ -65,6 +65,7 @@ class APIUsageLogListSerializer(serializers.ModelSerializer):
             'response_status_code', 'processing_time_ms',
             'is_successful', 'created_at'
         ]
+        projection_extra_fields = ['response_status_code']
     
     def get_is_successful(self, obj):
         """Check if request was successful."""
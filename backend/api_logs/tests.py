@@ -1,3 +1,88 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
+from core.read_serializers import compile_serializer
+from core.testing import create_developer, create_model, create_user, explain_with_index_scans
+from core.timebuckets import TimeBuckets, count_current_periods
+from .models import APIUsageLog
+from .serializers import APIUsageLogListSerializer
 
-# Create your tests here.
+
+class IndexUsageTests(TestCase):
+    """
+    Stats queries must be range scans on the intended indexes.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('caller')
+        cls.developer = create_developer()
+        cls.model = create_model(cls.developer)
+        for age in [timedelta(0), timedelta(days=40)]:
+            log = APIUsageLog.objects.create(
+                user=cls.user,
+                model=cls.model,
+                request_method='POST',
+                request_path='/api/v1/predict/',
+                response_status_code=200,
+                processing_time_ms=120,
+                ip_address='127.0.0.1'
+            )
+            APIUsageLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - age)
+    
+    def test_current_period_counts(self):
+        counts = count_current_periods(APIUsageLog.objects.filter(model=self.model))
+        self.assertEqual(counts, {'today': 1, 'this_month': 1})
+    
+    def test_window_predicates_use_composite_indexes(self):
+        this_month = TimeBuckets.current('month')
+        cases = [
+            ({'model': self.model}, 'api_log_model_created_idx'),
+            ({'developer': self.developer}, 'api_log_dev_created_idx'),
+            ({'user': self.user}, 'api_log_user_created_idx'),
+        ]
+        
+        for owner_filter, index_name in cases:
+            with self.subTest(index=index_name):
+                plan = explain_with_index_scans(this_month.filter(APIUsageLog.objects.filter(**owner_filter)))
+                self.assertIn(index_name, plan)
+                self.assertNotIn('::date', plan)
+    
+    def test_recent_errors_use_partial_error_index(self):
+        plan = explain_with_index_scans(APIUsageLog.recent_errors(developer=self.developer)[:5])
+        self.assertIn('api_log_dev_errors_idx', plan)
+
+
+class CompiledListSerializerTests(TestCase):
+    """
+    The compiled log list must render exactly like the DRF serializer.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('caller')
+        model = create_model(create_developer())
+        
+        # Anonymous calls have no user, so the serializer skips user_name
+        for user, status_code in [(cls.user, 200), (None, 503)]:
+            APIUsageLog.objects.create(
+                user=user,
+                model=model,
+                request_method='POST',
+                request_path='/api/v1/predict/',
+                response_status_code=status_code,
+                processing_time_ms=40,
+                ip_address='127.0.0.1'
+            )
+    
+    def test_compiled_rows_match_serializer_output(self):
+        compiled = compile_serializer(APIUsageLogListSerializer)
+        queryset = APIUsageLog.objects.order_by('response_status_code')
+        
+        expected = APIUsageLogListSerializer(queryset, many=True).data
+        actual = compiled.represent_many(compiled.values(queryset))
+        
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual[0]['user_name'], 'caller')
+        self.assertNotIn('user_name', actual[1])
+        self.assertFalse(actual[1]['is_successful'])
@@ -1,16 +1,21 @@
 """
 API Logs views for API endpoints.
 """
-from rest_framework import generics, permissions, status, filters
+from rest_framework import exceptions, generics, permissions, status, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django.db.models import Count, Avg, Sum, Q, Min, Max
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
 from drf_spectacular.utils import extend_schema
+from core.mixins import CompiledListMixin, ProjectedListMixin
 from core.permissions import IsOwnerOrAdmin
-from .models import APIUsageLog, APIMetrics
+from core.principal import get_principal
+from core.timebuckets import TimeBuckets, count_current_periods, get_request_timezone
+from developers.models import Developer
+from developers.quota import consume_quota
+from .models import APIUsageLog, APIMetrics, FAILED_REQUEST_Q
 from .serializers import (
     APIUsageLogSerializer,
     APIUsageLogListSerializer,
@@ -22,7 +27,7 @@ from .serializers import (
 )
 
 
-class APIUsageLogViewSet(ModelViewSet):
+class APIUsageLogViewSet(CompiledListMixin, ProjectedListMixin, ModelViewSet):
     """
     ViewSet for managing API usage logs.
     """
@@ -44,16 +49,17 @@ class APIUsageLogViewSet(ModelViewSet):
         queryset = super().get_queryset()
         
         # Regular users can only see their own logs
-        if not self.request.user.is_staff:
-            if hasattr(self.request.user, 'developer_profile'):
+        principal = get_principal(self.request)
+        if not principal.is_staff:
+            if principal.is_developer:
                 # Developers can see logs for their models
                 queryset = queryset.filter(
-                    Q(user=self.request.user) | 
-                    Q(developer=self.request.user.developer_profile)
+                    Q(user_id=principal.user_id) | 
+                    Q(developer_id=principal.developer_id)
                 )
             else:
                 # Regular users can only see their own logs
-                queryset = queryset.filter(user=self.request.user)
+                queryset = queryset.filter(user_id=principal.user_id)
         
         # Filter by model
         model_id = self.request.query_params.get('model')
@@ -79,7 +85,7 @@ class APIUsageLogViewSet(ModelViewSet):
             if success_filter.lower() in ['true', '1', 'yes']:
                 queryset = queryset.filter(response_status_code__range=(200, 299))
             else:
-                queryset = queryset.exclude(response_status_code__range=(200, 299))
+                queryset = queryset.filter(FAILED_REQUEST_Q)
         
         # Filter by date range
         date_from = self.request.query_params.get('date_from')
@@ -113,6 +119,16 @@ class APIUsageLogViewSet(ModelViewSet):
         # This endpoint is typically used by the system itself
         # to log API usage, not by end users
         return super().create(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        # Calls authenticated by API key count against the developer's monthly
+        # quota and record the key's prefix, never the key
+        if isinstance(self.request.auth, Developer):
+            if not consume_quota(self.request.auth.pk):
+                raise exceptions.Throttled(detail='Monthly API quota exceeded')
+            serializer.save(api_key_used=self.request.auth.api_key_prefix)
+        else:
+            serializer.save()
 
 
 class APIMetricsViewSet(ModelViewSet):
@@ -131,9 +147,10 @@ class APIMetricsViewSet(ModelViewSet):
         queryset = super().get_queryset()
         
         # Non-admin users can only see metrics for their own resources
-        if not self.request.user.is_staff:
-            if hasattr(self.request.user, 'developer_profile'):
-                queryset = queryset.filter(developer=self.request.user.developer_profile)
+        principal = get_principal(self.request)
+        if not principal.is_staff:
+            if principal.is_developer:
+                queryset = queryset.filter(developer_id=principal.developer_id)
             else:
                 # Regular users cannot see metrics
                 queryset = queryset.none()
@@ -169,6 +186,11 @@ def api_stats_view(request):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
     
+    try:
+        tz = get_request_timezone(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
     logs = APIUsageLog.objects.filter(created_at__gte=start_date)
     
     # Basic stats
@@ -190,11 +212,9 @@ def api_stats_view(request):
     unique_models = logs.values('model').distinct().count()
     
     # Time-based stats
-    today = timezone.now().date()
-    requests_today = logs.filter(created_at__date=today).count()
-    
-    first_day_of_month = today.replace(day=1)
-    requests_this_month = logs.filter(created_at__date__gte=first_day_of_month).count()
+    current_periods = count_current_periods(logs, tz)
+    requests_today = current_periods['today']
+    requests_this_month = current_periods['this_month']
     
     # Top models
     top_models = logs.values('model__name').annotate(
@@ -202,9 +222,7 @@ def api_stats_view(request):
     ).order_by('-count')[:5]
     
     # Error distribution
-    error_dist = logs.exclude(
-        response_status_code__range=(200, 299)
-    ).values('response_status_code').annotate(
+    error_dist = logs.filter(FAILED_REQUEST_Q).values('response_status_code').annotate(
         count=Count('id')
     ).order_by('-count')
     
@@ -252,9 +270,8 @@ def developer_api_stats_view(request, developer_id):
         )
     
     # Permission check
-    if (not request.user.is_staff and 
-        not (hasattr(request.user, 'developer_profile') and 
-             request.user.developer_profile == developer)):
+    principal = get_principal(request)
+    if not principal.is_staff and principal.developer_id != developer.pk:
         return Response(
             {'error': 'Permission denied'},
             status=status.HTTP_403_FORBIDDEN
@@ -265,6 +282,11 @@ def developer_api_stats_view(request, developer_id):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
     
+    try:
+        tz = get_request_timezone(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
     logs = APIUsageLog.objects.filter(
         developer=developer,
         created_at__gte=start_date
@@ -284,11 +306,9 @@ def developer_api_stats_view(request, developer_id):
     unique_users = logs.values('user').distinct().count()
     
     # Time-based stats
-    today = timezone.now().date()
-    requests_today = logs.filter(created_at__date=today).count()
-    
-    first_day_of_month = today.replace(day=1)
-    requests_this_month = logs.filter(created_at__date__gte=first_day_of_month).count()
+    current_periods = count_current_periods(logs, tz)
+    requests_today = current_periods['today']
+    requests_this_month = current_periods['this_month']
     
     # Top performing models
     top_models = logs.values('model__name').annotate(
@@ -296,12 +316,11 @@ def developer_api_stats_view(request, developer_id):
         avg_time=Avg('processing_time_ms')
     ).order_by('-count')[:5]
     
-    # Recent errors
-    recent_errors = logs.exclude(
-        response_status_code__range=(200, 299)
-    ).order_by('-created_at')[:5].values(
-        'model__name', 'response_status_code', 'error_message', 'created_at'
-    )
+    # Recent errors, read from the partial error index
+    recent_errors = APIUsageLog.recent_errors(
+        developer=developer,
+        created_at__gte=start_date
+    )[:5].values('model__name', 'response_status_code', 'error_message', 'created_at')
     
     stats_data = {
         'total_requests': total_requests,
@@ -344,6 +363,11 @@ def model_api_stats_view(request, model_id):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
     
+    try:
+        tz = get_request_timezone(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
     logs = APIUsageLog.objects.filter(
         model=model,
         created_at__gte=start_date
@@ -363,25 +387,15 @@ def model_api_stats_view(request, model_id):
     unique_users = logs.values('user').distinct().count()
     
     # Time-based stats
-    today = timezone.now().date()
-    requests_today = logs.filter(created_at__date=today).count()
-    
-    first_day_of_month = today.replace(day=1)
-    requests_this_month = logs.filter(created_at__date__gte=first_day_of_month).count()
+    current_periods = count_current_periods(logs, tz)
+    requests_today = current_periods['today']
+    requests_this_month = current_periods['this_month']
     
     # Hourly distribution (last 24 hours)
-    last_24h = timezone.now() - timedelta(hours=24)
-    hourly_logs = logs.filter(created_at__gte=last_24h)
-    
-    hourly_distribution = {}
-    for i in range(24):
-        hour_start = last_24h + timedelta(hours=i)
-        hour_end = hour_start + timedelta(hours=1)
-        hour_count = hourly_logs.filter(
-            created_at__gte=hour_start,
-            created_at__lt=hour_end
-        ).count()
-        hourly_distribution[hour_start.strftime('%H:00')] = hour_count
+    hourly_distribution = {
+        datetime.fromisoformat(row['period']).strftime('%H:00'): row['count']
+        for row in TimeBuckets.last(24, 'hour', tz).aggregate(logs, count=Count('id'))
+    }
     
     # Status code distribution
     status_dist = logs.values('response_status_code').annotate(
@@ -393,20 +407,20 @@ def model_api_stats_view(request, model_id):
         for item in status_dist
     }
     
-    # Recent performance trend (daily averages)
-    daily_trend = []
-    for i in range(7):  # Last 7 days
-        day_start = (timezone.now() - timedelta(days=i)).replace(hour=0, minute=0, second=0)
-        day_end = day_start + timedelta(days=1)
-        
-        day_logs = logs.filter(created_at__gte=day_start, created_at__lt=day_end)
-        avg_time = day_logs.aggregate(avg_time=Avg('processing_time_ms'))['avg_time'] or 0
-        
-        daily_trend.append({
-            'date': day_start.strftime('%Y-%m-%d'),
-            'average_response_time': round(avg_time, 2),
-            'request_count': day_logs.count()
-        })
+    # Recent performance trend (daily averages, newest first)
+    daily_rows = TimeBuckets.last(7, 'day', tz).aggregate(
+        logs,
+        average_response_time=Avg('processing_time_ms'),
+        request_count=Count('id')
+    )
+    daily_trend = [
+        {
+            'date': row['period'],
+            'average_response_time': round(row['average_response_time'] or 0, 2),
+            'request_count': row['request_count']
+        }
+        for row in reversed(daily_rows)
+    ]
     
     stats_data = {
         'total_requests': total_requests,
@@ -0,0 +1,88 @@
+"""
+JWT authentication that resolves the request user from token claims.
+"""
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from core.cache import TTLCache, rebuild_instance
+from .tokens import DEVELOPER_ID_CLAIM, ROLE_CLAIM
+
+# Users of tokens issued without principal claims, per process
+local_users = TTLCache(ttl=getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 60))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds ``request.user`` from the access token's
+    principal claims instead of loading the user row.
+    
+    The user carries its id, username and staff flags, with its
+    ``developer_profile`` pre-set from the ``developer_id`` claim (or
+    known to be absent), so ``hasattr(request.user, 'developer_profile')``
+    and filters on the user or developer cost no queries; any other field
+    is loaded on first access. Claims are as fresh as the access token.
+    Tokens without the claims fall back to a user loaded from the database
+    and cached briefly in process.
+    
+    As the claims may be stale (a user deactivated or demoted since the
+    token was issued), these users refuse to be saved; write paths must
+    load the user row first.
+    """
+    
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return self.get_cached_user(validated_token)
+        
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        
+        return self.build_user({
+            'id': user_id,
+            'username': validated_token.get('username', ''),
+            'is_active': True,
+            'is_staff': validated_token.get('is_staff', False),
+            'is_superuser': validated_token.get('is_superuser', False),
+        }, validated_token.get(DEVELOPER_ID_CLAIM))
+    
+    def get_cached_user(self, validated_token):
+        """Resolve a token without claims through the short-lived user cache."""
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        record = local_users.get(user_id)
+        if record is None:
+            user = super().get_user(validated_token)
+            developer = getattr(user, 'developer_profile', None)
+            record = {
+                'user': {
+                    field: getattr(user, field)
+                    for field in ['id', 'username', 'is_active', 'is_staff', 'is_superuser']
+                },
+                'developer_id': developer.pk if developer else None,
+            }
+            local_users.set(user_id, record)
+        
+        return self.build_user(record['user'], record['developer_id'])
+    
+    def build_user(self, values, developer_id):
+        """Build a user with its developer profile relation already resolved."""
+        # Import here to avoid circular imports
+        from developers.models import Developer
+        
+        values = dict(values, id=self.user_model._meta.pk.to_python(values['id']))
+        user = rebuild_instance(self.user_model, values)
+        user._built_from_claims = True
+        
+        developer_relation = self.user_model._meta.get_field('developer_profile')
+        if developer_id:
+            developer = rebuild_instance(Developer, {
+                'id': Developer._meta.pk.to_python(developer_id),
+                'user_id': user.pk,
+            })
+            developer_relation.set_cached_value(user, developer)
+            Developer._meta.get_field('user').set_cached_value(developer, user)
+        else:
+            developer_relation.set_cached_value(user, None)
+        
+        return user
@@ -0,0 +1,140 @@
+"""
+In-process bloom filter in front of the refresh token blacklist.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+
+class BloomFilter:
+    """
+    A fixed-size bloom filter over strings.
+    
+    Membership tests never give false negatives; false positives occur at
+    about ``error_rate`` once ``capacity`` items have been added.
+    """
+    
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def positions(self, item):
+        """Get the bit positions of an item, by double hashing one digest."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+    
+    def add(self, item):
+        """Add an item."""
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+
+class TokenBlacklist:
+    """
+    Blacklist lookups that answer "not blacklisted" from memory.
+    
+    A bloom filter holds the jti of every unexpired blacklisted token. A
+    jti missing from the filter is not blacklisted, which is the common
+    case on refresh; a hit is confirmed in the database. Blacklist rows
+    added by any process are pulled into the filter incrementally at most
+    every ``sync_interval`` seconds, and the filter is rebuilt from scratch
+    every ``rebuild_interval`` seconds to drop expired tokens. Tokens
+    blacklisted in this process are added immediately.
+    
+    Row ids and ``blacklisted_at`` are assigned before commit, so rows
+    become visible out of order. Each sync therefore re-reads the rows
+    blacklisted since ``sync_overlap`` seconds before the previous sync
+    started, which picks up every row whose transaction committed within
+    that window (and allows for clock skew between processes).
+    """
+    
+    def __init__(self, sync_interval, rebuild_interval, sync_overlap=60, capacity=100000, error_rate=0.001):
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Forget the filter so the next lookup rebuilds it."""
+        self.bloom = None
+        self.synced_from = None
+        self.synced_at = self.rebuilt_at = float('-inf')
+    
+    def contains(self, jti):
+        """Check if a token id is blacklisted."""
+        # Import here to avoid circular imports
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        
+        self.sync()
+        if jti not in self.bloom:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+    
+    def add(self, jti):
+        """Record a token blacklisted by this process."""
+        bloom = self.bloom
+        if bloom is not None:
+            bloom.add(jti)
+    
+    def sync(self):
+        """Pull new blacklist rows into the filter, or rebuild it, when due."""
+        now = time.monotonic()
+        if now - self.synced_at < self.sync_interval:
+            return
+        
+        with self.lock:
+            if now - self.synced_at < self.sync_interval:
+                return
+            if self.bloom is None or now - self.rebuilt_at >= self.rebuild_interval:
+                self.rebuild()
+            else:
+                started = timezone.now()
+                self.load(self.bloom, self.synced_from - self.sync_overlap)
+                self.synced_from = started
+            self.synced_at = time.monotonic()
+    
+    def rebuild(self):
+        """Build a new filter from the unexpired blacklisted tokens."""
+        # Import here to avoid circular imports
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        
+        started = timezone.now()
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=started)
+        bloom = BloomFilter(max(self.capacity, live.count() * 2), self.error_rate)
+        self.load(bloom, queryset=live)
+        self.bloom = bloom
+        self.synced_from = started
+        self.rebuilt_at = time.monotonic()
+    
+    def load(self, bloom, since=None, queryset=None):
+        """Add the token ids blacklisted since the given time (all of them without one) to a filter."""
+        # Import here to avoid circular imports
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        
+        if queryset is None:
+            queryset = BlacklistedToken.objects.all()
+        if since is not None:
+            queryset = queryset.filter(blacklisted_at__gte=since)
+        
+        for jti in queryset.order_by().values_list('token__jti', flat=True).iterator(chunk_size=5000):
+            bloom.add(jti)
+
+
+token_blacklist = TokenBlacklist(
+    sync_interval=getattr(settings, 'TOKEN_BLACKLIST_SYNC_INTERVAL', 5),
+    rebuild_interval=getattr(settings, 'TOKEN_BLACKLIST_REBUILD_INTERVAL', 3600),
+    sync_overlap=getattr(settings, 'TOKEN_BLACKLIST_SYNC_OVERLAP', 60)
+)
@@ -0,0 +1,116 @@
+"""
+Buffered login tracking for users.
+"""
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class LoginTracker:
+    """
+    Coalesce ``last_login`` and ``login_count`` writes per user.
+    
+    Logins are counted in memory and written at most once per user every
+    ``interval`` seconds, as ``login_count = login_count + n`` with the
+    latest login time, so a burst of logins by one user costs one UPDATE
+    instead of a row lock per login. Writes happen on a background timer
+    armed by the first buffered login, and on process exit; logins a
+    failed write couldn't store stay buffered for the next one. With an
+    interval of zero every login is written immediately.
+    """
+    
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.timer = None
+    
+    def record(self, user, when=None):
+        """Count a login for a user, updating the instance to match."""
+        when = when or timezone.now()
+        user.last_login = when
+        user.login_count += 1
+        
+        with self.lock:
+            self.add_pending(user.pk, 1, when)
+            self.arm_timer()
+        
+        if self.interval <= 0:
+            self.flush()
+    
+    def add_pending(self, user_id, logins, last_login):
+        """Add logins to a user's buffered count; call with the lock held."""
+        pending_logins, pending_last_login = self.pending.get(user_id, (0, None))
+        if pending_last_login is not None:
+            last_login = max(last_login, pending_last_login)
+        self.pending[user_id] = (pending_logins + logins, last_login)
+    
+    def arm_timer(self):
+        """Start the flush timer unless one is armed; call with the lock held."""
+        if self.interval > 0 and self.timer is None:
+            self.timer = threading.Timer(self.interval, self.flush_in_background)
+            self.timer.daemon = True
+            self.timer.start()
+    
+    def flush(self):
+        """
+        Write the buffered logins, one UPDATE per user; return the users
+        written. If a write fails, the logins not yet written are buffered
+        again for the next flush and the error is raised.
+        """
+        # Import here to avoid circular imports
+        from users.models import User
+        
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            timer, self.timer = self.timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        
+        now = timezone.now()
+        # Ordered by id so concurrent flushes lock rows in the same order
+        entries = sorted(pending.items(), key=lambda item: str(item[0]))
+        written = 0
+        try:
+            for user_id, (logins, last_login) in entries:
+                User.objects.filter(pk=user_id).update(
+                    login_count=F('login_count') + logins,
+                    last_login=last_login,
+                    updated_at=now
+                )
+                written += 1
+        except Exception:
+            # Keep the unwritten logins, merged with any recorded since, and retry on the timer
+            with self.lock:
+                for user_id, (logins, last_login) in entries[written:]:
+                    self.add_pending(user_id, logins, last_login)
+                self.arm_timer()
+            raise
+        return written
+    
+    def flush_in_background(self):
+        """Flush from the timer thread, closing its database connection afterwards."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to write buffered logins")
+        finally:
+            connection.close()
+
+
+login_tracker = LoginTracker(interval=getattr(settings, 'LOGIN_TRACKING_INTERVAL', 5))
+
+
+@atexit.register
+def flush_login_tracker():
+    """Write logins still buffered when the process exits."""
+    try:
+        login_tracker.flush()
+    except Exception:
+        logger.exception("Failed to write buffered logins")
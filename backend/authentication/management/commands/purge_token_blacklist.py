@@ -0,0 +1,49 @@
+"""
+Delete expired outstanding and blacklisted refresh tokens in batches.
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding tokens and their blacklist entries in batches"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Tokens deleted per batch")
+        parser.add_argument(
+            '--grace-hours', type=int, default=0, help="Keep tokens expired less than this many hours"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Count expired tokens without deleting")
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        expired = OutstandingToken.objects.filter(expires_at__lt=cutoff)
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Would delete {expired.count()} expired tokens "
+                f"({BlacklistedToken.objects.filter(token__in=expired).count()} blacklisted)"
+            ))
+            return
+        
+        tokens = blacklisted = 0
+        last_pk = 0
+        while True:
+            # Walk the primary key so each batch is one short delete
+            batch = list(
+                expired.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            
+            # Blacklist entries go with their tokens by cascade
+            _, deleted = OutstandingToken.objects.filter(pk__in=batch).delete()
+            tokens += deleted.get(OutstandingToken._meta.label, 0)
+            blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+            last_pk = batch[-1]
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {tokens} expired tokens ({blacklisted} blacklisted)"
+        ))
@@ -0,0 +1,12 @@
+"""
+Authentication serializers for JWT token management.
+"""
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .tokens import PlatformRefreshToken
+
+
+class PlatformTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer whose access tokens carry fresh principal claims.
+    """
+    token_class = PlatformRefreshToken
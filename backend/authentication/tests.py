@@ -1,3 +1,257 @@
+import io
+from datetime import timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from users.models import User
+from core.testing import create_developer, create_user
+from .authentication import local_users
+from .blacklist import BloomFilter, TokenBlacklist, token_blacklist
+from .login_tracking import LoginTracker, login_tracker
 
-# Create your tests here.
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    """
+    Authenticated reads must resolve the user from token claims, without auth queries.
+    """
+    
+    def setUp(self):
+        local_users.clear()
+        self.addCleanup(login_tracker.flush)
+        self.developer = create_developer()
+        self.user = self.developer.user
+        self.client = APIClient()
+    
+    def login(self):
+        response = self.client.post(
+            '/api/v1/auth/login/',
+            {'email': 'developer@example.com', 'password': 'pass12345'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+    
+    def auth_queries(self, url):
+        """Get the queries of a request that touch the users or developers tables."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "users"' in query['sql'] or 'FROM "developers"' in query['sql']
+        ]
+    
+    def test_list_reads_do_no_auth_queries(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        
+        for url in ['/api/v1/models/', '/api/v1/history/', '/api/v1/logs/usage/']:
+            with self.subTest(url=url):
+                self.assertEqual(self.auth_queries(url), [])
+    
+    def test_profile_loads_deferred_fields_once(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        
+        self.assertEqual(len(self.auth_queries('/api/v1/users/me/')), 1)
+    
+    def test_refresh_picks_up_role_changes(self):
+        other = create_user('user')
+        refresh = self.client.post(
+            '/api/v1/auth/login/', {'email': 'user@example.com', 'password': 'pass12345'}, format='json'
+        ).data['refresh']
+        developer = create_developer('user', user=other)
+        
+        response = self.client.post('/api/v1/auth/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        claims = AccessToken(response.data['access'])
+        self.assertEqual(claims['role'], 'developer')
+        self.assertEqual(claims['developer_id'], str(developer.pk))
+    
+    def test_tokens_without_claims_use_cached_user(self):
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        
+        self.assertNotEqual(self.auth_queries('/api/v1/history/'), [])
+        self.assertEqual(self.auth_queries('/api/v1/history/'), [])
+
+
+class LoginTrackingTests(TestCase):
+    """
+    Logins must be counted in memory and written once per user per flush.
+    """
+    
+    def setUp(self):
+        login_tracker.flush()
+        self.user = create_user('member')
+        self.client = APIClient()
+    
+    def login(self):
+        return self.client.post(
+            '/api/v1/auth/login/',
+            {'email': 'member@example.com', 'password': 'pass12345'},
+            format='json'
+        )
+    
+    def test_login_does_not_write_the_user_row(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.login()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['login_count'], 1)
+        self.assertFalse([
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "users"')
+        ])
+    
+    def test_logins_are_coalesced_into_one_update(self):
+        for _ in range(3):
+            self.login()
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(login_tracker.flush(), 1)
+        
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.login_count, 3)
+        self.assertIsNotNone(self.user.last_login)
+    
+    def test_zero_interval_writes_each_login(self):
+        tracker = LoginTracker(interval=0)
+        tracker.record(self.user)
+        tracker.record(self.user)
+        
+        self.assertEqual(User.objects.get(pk=self.user.pk).login_count, 2)
+    
+    def test_failed_flush_keeps_unwritten_logins(self):
+        tracker = LoginTracker(interval=60)
+        self.addCleanup(tracker.flush)
+        other = create_user('other')
+        tracker.record(self.user)
+        tracker.record(other)
+        
+        update = QuerySet.update
+        calls = []
+        
+        def fail_second_update(queryset, **kwargs):
+            calls.append(queryset)
+            if len(calls) == 2:
+                raise DatabaseError('connection lost')
+            return update(queryset, **kwargs)
+        
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=fail_second_update):
+            with self.assertRaises(DatabaseError):
+                tracker.flush()
+        
+        counts = dict(User.objects.filter(pk__in=[self.user.pk, other.pk]).values_list('pk', 'login_count'))
+        self.assertEqual(sorted(counts.values()), [0, 1])
+        unwritten = next(pk for pk, count in counts.items() if count == 0)
+        self.assertEqual(list(tracker.pending), [unwritten])
+        self.assertIsNotNone(tracker.timer)
+        
+        # Logins recorded since are merged with the ones kept
+        tracker.record(User.objects.get(pk=unwritten))
+        self.assertEqual(tracker.flush(), 1)
+        self.assertEqual(User.objects.get(pk=unwritten).login_count, 2)
+
+
+class TokenBlacklistTests(TestCase):
+    """
+    Blacklist checks must answer from the bloom filter and refuse reused refresh tokens.
+    """
+    
+    def setUp(self):
+        token_blacklist.reset()
+        self.addCleanup(login_tracker.flush)
+        self.user = create_user('member')
+        self.client = APIClient()
+    
+    def login(self):
+        return self.client.post(
+            '/api/v1/auth/login/',
+            {'email': 'member@example.com', 'password': 'pass12345'},
+            format='json'
+        ).data
+    
+    def refresh(self, token):
+        return self.client.post('/api/v1/auth/refresh/', {'refresh': token}, format='json')
+    
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        items = [f'jti-{index}' for index in range(1000)]
+        for item in items:
+            bloom.add(item)
+        
+        self.assertTrue(all(item in bloom for item in items))
+        self.assertLess(sum(f'other-{index}' in bloom for index in range(10000)), 100)
+    
+    def test_unlisted_tokens_are_checked_in_memory(self):
+        self.refresh(self.login()['refresh'])
+        
+        with self.assertNumQueries(0):
+            self.assertFalse(token_blacklist.contains('not-blacklisted'))
+    
+    def test_logged_out_token_cannot_refresh(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(
+            self.client.post('/api/v1/auth/logout/', {'refresh': tokens['refresh']}, format='json').status_code,
+            200
+        )
+        
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+    
+    def test_rotated_token_is_refused_before_the_filter_syncs(self):
+        refresh = self.login()['refresh']
+        self.assertEqual(self.refresh(refresh).status_code, 200)
+        
+        # As seen by another process whose filter predates the rotation
+        token_blacklist.bloom = BloomFilter(10)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+    
+    def blacklist(self, jti, row_id, blacklisted_at):
+        """Blacklist a live token under a given row id and time, as if committed now."""
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token='token', expires_at=timezone.now() + timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(id=row_id, token=token)
+        BlacklistedToken.objects.filter(id=row_id).update(blacklisted_at=blacklisted_at)
+    
+    def test_sync_picks_up_rows_committed_out_of_order(self):
+        blacklist = TokenBlacklist(sync_interval=0, rebuild_interval=3600, sync_overlap=60)
+        now = timezone.now()
+        self.blacklist('first', 100, now)
+        self.assertTrue(blacklist.contains('first'))
+        
+        # Row id and time assigned before the last sync, committed after it
+        self.blacklist('late', 50, now - timedelta(seconds=10))
+        self.assertTrue(blacklist.contains('late'))
+        
+        # Rows committed longer than the overlap after their time wait for the rebuild
+        self.blacklist('stale', 60, now - timedelta(hours=2))
+        self.assertFalse(blacklist.contains('stale'))
+        blacklist.rebuilt_at = float('-inf')
+        self.assertTrue(blacklist.contains('stale'))
+    
+    def test_purge_deletes_expired_tokens_in_batches(self):
+        now = timezone.now()
+        for index in range(5):
+            token = OutstandingToken.objects.create(
+                user=self.user, jti=f'expired-{index}', token='token', expires_at=now - timedelta(days=1)
+            )
+            if index % 2:
+                BlacklistedToken.objects.create(token=token)
+        OutstandingToken.objects.create(user=self.user, jti='live', token='token', expires_at=now + timedelta(days=1))
+        
+        output = io.StringIO()
+        call_command('purge_token_blacklist', batch_size=2, stdout=output, skip_checks=True)
+        
+        self.assertIn('Deleted 5 expired tokens (2 blacklisted)', output.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
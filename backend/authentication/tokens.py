@@ -0,0 +1,82 @@
+"""
+JWT tokens carrying the claims needed to authorize requests.
+"""
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.principal import Principal
+from .blacklist import token_blacklist
+
+# Claims describing the principal, read by ClaimsJWTAuthentication
+ROLE_CLAIM = 'role'
+DEVELOPER_ID_CLAIM = 'developer_id'
+PRINCIPAL_CLAIMS = [ROLE_CLAIM, DEVELOPER_ID_CLAIM, 'username', 'is_staff', 'is_superuser']
+
+
+def get_role(user):
+    """Get the role name of a user: admin, developer or user."""
+    return Principal.from_user(user).role
+
+
+def principal_claims(user):
+    """Get the principal claims for a user."""
+    developer = getattr(user, 'developer_profile', None)
+    return {
+        ROLE_CLAIM: get_role(user),
+        DEVELOPER_ID_CLAIM: str(developer.pk) if developer else None,
+        'username': user.username,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+    }
+
+
+class PlatformRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the principal claims.
+    
+    The claims are taken from the user again whenever an access token is
+    minted, so a role change reaches the next token issued by refresh,
+    and users deactivated since login can no longer refresh.
+    
+    Blacklist checks go through the in-process bloom filter, and
+    blacklisting a token that is already blacklisted fails, so a rotated
+    refresh token replayed before this process has seen its blacklist
+    entry is still refused.
+    """
+    
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.user = user
+        return token
+    
+    def get_user(self):
+        """Get the active user this token was issued to."""
+        user = getattr(self, 'user', None)
+        if user is None:
+            # Import here to avoid circular imports
+            from users.models import User
+            
+            user = User.objects.select_related('developer_profile').filter(
+                **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+            ).first()
+        
+        if user is None or not user.is_active:
+            raise TokenError('User not found or inactive')
+        return user
+    
+    def check_blacklist(self):
+        if token_blacklist.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+    
+    def blacklist(self):
+        blacklisted, created = super().blacklist()
+        if not created:
+            raise TokenError('Token is blacklisted')
+        token_blacklist.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted, created
+    
+    @property
+    def access_token(self):
+        self.payload.update(principal_claims(self.get_user()))
+        return super().access_token
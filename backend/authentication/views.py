@@ -5,9 +5,11 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
 from drf_spectacular.utils import extend_schema
 from users.serializers import UserLoginSerializer, UserSerializer
+from .login_tracking import login_tracker
+from .serializers import PlatformTokenRefreshSerializer
+from .tokens import PlatformRefreshToken
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -25,14 +27,11 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         if serializer.is_valid():
             user = serializer.validated_data['user']
             
-            # Update login tracking
-            from django.utils import timezone
-            user.last_login = timezone.now()
-            user.login_count += 1
-            user.save(update_fields=['last_login', 'login_count'])
+            # Login tracking is buffered and written once per user per interval
+            login_tracker.record(user)
             
-            # Generate tokens
-            refresh = RefreshToken.for_user(user)
+            # Generate tokens carrying the role and developer claims
+            refresh = PlatformRefreshToken.for_user(user)
             
             return Response({
                 'message': 'Login successful',
@@ -48,6 +47,7 @@ class CustomTokenRefreshView(TokenRefreshView):
     """
     Custom JWT token refresh view.
     """
+    serializer_class = PlatformTokenRefreshSerializer
     
     @extend_schema(
         summary="Refresh JWT token",
@@ -70,7 +70,7 @@ def logout_view(request):
     try:
         refresh_token = request.data.get('refresh')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = PlatformRefreshToken(refresh_token)
             token.blacklist()
         
         return Response({
@@ -0,0 +1,65 @@
+"""
+In-process caching helpers for the AI Platform.
+"""
+import threading
+import time
+
+
+class TTLCache:
+    """
+    A small thread-safe in-process cache whose entries expire after
+    ``ttl`` seconds.
+    
+    It sits in front of the shared Django cache for values read on every
+    request. Entries live in the current process only, so a deletion here
+    reaches other processes when their own copy expires.
+    """
+    
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = {}
+        self.lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        """Get a live entry, or default."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return default
+        return value
+    
+    def set(self, key, value):
+        """Store an entry, evicting expired or oldest entries when full."""
+        now = time.monotonic()
+        with self.lock:
+            if key not in self.entries and len(self.entries) >= self.maxsize:
+                for stale in [k for k, (expires_at, _) in self.entries.items() if expires_at <= now]:
+                    del self.entries[stale]
+                if len(self.entries) >= self.maxsize:
+                    del self.entries[next(iter(self.entries))]
+            self.entries[key] = (now + self.ttl, value)
+    
+    def delete(self, key):
+        """Drop an entry if present."""
+        with self.lock:
+            self.entries.pop(key, None)
+    
+    def clear(self):
+        """Drop every entry."""
+        with self.lock:
+            self.entries.clear()
+
+
+def rebuild_instance(model, values):
+    """
+    Build a model instance from cached field values, as if loaded with
+    ``only()``; the other fields are read from the database on access.
+    """
+    # from_db expects the loaded fields in model field order
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db('default', field_names, [values[name] for name in field_names])
@@ -0,0 +1,119 @@
+"""
+Audit index use for the queries the API actually runs.
+"""
+import re
+import uuid
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.timebuckets import TimeBuckets
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN representative viewset queries and report unused indexes"
+    
+    # Index names reported by EXPLAIN for index, index-only and bitmap scans
+    INDEX_SCAN_PATTERN = re.compile(r'(?:Index Scan|Index Only Scan|Bitmap Index Scan)(?: Backward)? (?:using|on) (\S+)')
+    SEQ_SCAN_PATTERN = re.compile(r'Seq Scan on (\S+)')
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="Use EXPLAIN ANALYZE (runs the queries)")
+        parser.add_argument('--plans', action='store_true', help="Print full query plans")
+    
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING("Query plans"))
+        for label, queryset in self.representative_queries():
+            plan = queryset.explain(analyze=options['analyze'])
+            indexes = sorted(set(self.INDEX_SCAN_PATTERN.findall(plan)))
+            seq_scans = sorted(set(self.SEQ_SCAN_PATTERN.findall(plan)))
+            
+            line = f"  {label}: indexes={', '.join(indexes) or '-'}"
+            if seq_scans:
+                line += f" seq_scans={', '.join(seq_scans)}"
+            self.stdout.write(self.style.WARNING(line) if seq_scans else line)
+            
+            if options['plans']:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+        
+        self.stdout.write(self.style.MIGRATE_HEADING("Index usage since the last statistics reset"))
+        for table, index, scans, size in self.index_usage():
+            line = f"  {table}.{index}: {scans} scans, {size}"
+            self.stdout.write(self.style.WARNING(line + " (unused)") if scans == 0 else line)
+    
+    def replay(self, viewset_class, action='list', params=None, user=None):
+        """Get the filtered queryset a viewset action would run for a request."""
+        request = Request(APIRequestFactory().get('/', params or {}))
+        request.user = user or AnonymousUser()
+        
+        view = viewset_class(request=request, action=action, args=(), kwargs={}, format_kwarg=None)
+        return view.filter_queryset(view.get_queryset())
+    
+    def representative_queries(self):
+        """Yield (label, queryset) pairs mirroring the hottest API queries."""
+        # Import here to avoid circular imports
+        from users.models import User
+        from ai_models.models import AIModel
+        from ai_models.views import AIModelViewSet
+        from reviews.views import ModelReviewViewSet
+        from user_history.models import UserHistory
+        from user_history.views import UserHistoryViewSet
+        from api_logs.models import APIUsageLog
+        from api_logs.views import APIUsageLogViewSet
+        
+        # Sample ids from real data where available so plans reflect real selectivity
+        model = AIModel.objects.select_related('developer__user').first()
+        model_id = model.pk if model else uuid.uuid4()
+        developer_id = model.developer_id if model else uuid.uuid4()
+        developer_user = model.developer.user if model else User(username='audit-developer')
+        user = (
+            User.objects.filter(history__isnull=False, is_staff=False).first()
+            or User(username='audit-user')
+        )
+        this_month = TimeBuckets.current('month')
+        
+        yield 'model catalog', self.replay(AIModelViewSet)
+        yield 'model catalog by category', self.replay(AIModelViewSet, params={'category': 'nlp'})
+        yield 'model reviews', self.replay(ModelReviewViewSet, params={'model': model_id})
+        yield 'user history', self.replay(UserHistoryViewSet, user=user)
+        yield 'user history by model and status', self.replay(
+            UserHistoryViewSet, params={'model': model_id, 'status': 'success'}, user=user
+        )
+        yield 'developer usage logs', self.replay(APIUsageLogViewSet, user=developer_user)
+        yield 'model stats window', this_month.filter(UserHistory.objects.filter(model_id=model_id))
+        yield 'model API stats window', this_month.filter(APIUsageLog.objects.filter(model_id=model_id))
+        yield 'developer API stats window', this_month.filter(
+            APIUsageLog.objects.filter(developer_id=developer_id)
+        )
+        yield 'developer recent errors', APIUsageLog.recent_errors(developer_id=developer_id)[:5]
+        yield 'platform error distribution', APIUsageLog.recent_errors().values(
+            'response_status_code'
+        ).annotate(count=Count('id'))
+        yield 'featured models', self.replay(AIModelViewSet, action='featured').filter(
+            average_rating__gte=4.0, total_requests__gte=100
+        ).order_by('-average_rating', '-total_requests')[:12]
+    
+    def index_usage(self):
+        """Get (table, index, scans, size) for non-unique indexes on project tables."""
+        tables = [
+            model._meta.db_table
+            for model in apps.get_models()
+            if model._meta.app_label in settings.LOCAL_APPS
+        ]
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT stats.relname, stats.indexrelname, stats.idx_scan, "
+                "pg_size_pretty(pg_relation_size(stats.indexrelid)) "
+                "FROM pg_stat_user_indexes stats "
+                "JOIN pg_index ON pg_index.indexrelid = stats.indexrelid "
+                "WHERE stats.relname = ANY(%s) "
+                "AND NOT pg_index.indisunique AND NOT pg_index.indisprimary "
+                "ORDER BY stats.idx_scan, pg_relation_size(stats.indexrelid) DESC",
+                [tables]
+            )
+            return cursor.fetchall()
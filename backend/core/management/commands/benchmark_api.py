@@ -0,0 +1,420 @@
+"""
+Benchmark API endpoints in process on seeded synthetic data.
+"""
+import json
+import math
+import platform
+import random
+import time
+import uuid
+from io import StringIO
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.models import User
+from developers.models import Developer
+from ai_models.models import AIModel
+from user_history.models import UserHistory, UserModelUsage, UserDailyUsage, UserSession
+from reviews.models import ModelReview
+from api_logs.models import APIUsageLog
+
+# Statements spreading the created_at of rows inserted since a time over the last %s days, per database vendor
+SPREAD_CREATED_AT = {
+    'sqlite': (
+        "UPDATE {table} SET created_at = datetime('now', '-' || (abs(random()) %% (%s * 86400)) || ' seconds') "
+        "WHERE created_at >= %s"
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Measure latency percentiles, queries per request and rows/sec of key API endpoints"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500, help="Users to seed")
+        parser.add_argument('--developers', type=int, default=20, help="Developers to seed")
+        parser.add_argument('--models', type=int, default=200, help="AI models to seed")
+        parser.add_argument('--history', type=int, default=100000, help="User history rows to seed")
+        parser.add_argument('--logs', type=int, default=100000, help="API usage log rows to seed")
+        parser.add_argument('--reviews', type=int, default=2000, help="Reviews to seed")
+        parser.add_argument('--days', type=int, default=90, help="Days the history and logs are spread over")
+        parser.add_argument('--requests', type=int, default=200, help="Timed requests per endpoint")
+        parser.add_argument('--warmup', type=int, default=10, help="Untimed requests per endpoint")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic data")
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+        parser.add_argument('--compare', help="Compare with the JSON results of an earlier run")
+        parser.add_argument(
+            '--max-regression', type=float,
+            help="Fail if any endpoint's p95 is more than this many percent above the compared run"
+        )
+    
+    def handle(self, *args, **options):
+        if options['max_regression'] is not None and not options['compare']:
+            raise CommandError("--max-regression needs --compare")
+        
+        volumes = {
+            name: options[name] for name in ['users', 'developers', 'models', 'history', 'logs', 'reviews']
+        }
+        
+        # Seed inside a transaction that is always rolled back
+        with transaction.atomic():
+            started = time.perf_counter()
+            fixtures = self.seed(random.Random(options['seed']), options['days'], **volumes)
+            self.stdout.write(f"Seeded {volumes} in {time.perf_counter() - started:.1f} s")
+            
+            # Measure the production request path, without debug query logging or inspection
+            with override_settings(DEBUG=False, QUERY_INSPECTION=False):
+                results = {
+                    name: self.benchmark_endpoint(client, url, options['requests'], options['warmup'])
+                    for name, client, url in self.endpoints(fixtures)
+                }
+            
+            transaction.set_rollback(True)
+        
+        report = {
+            'environment': {
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'volumes': volumes,
+            'requests': options['requests'],
+            'endpoints': results,
+        }
+        self.print_results(results)
+        
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+        
+        if options['compare']:
+            self.compare(results, options['compare'], options['max_regression'])
+    
+    def endpoints(self, fixtures):
+        """Yield (name, client, url) for each benchmarked endpoint."""
+        member, developer, admin = (
+            self.client_for(fixtures['member']),
+            self.client_for(fixtures['developer'].user),
+            self.client_for(fixtures['admin'])
+        )
+        model_id = fixtures['model'].id
+        
+        yield 'models.list', member, '/api/v1/models/'
+        yield 'models.detail', member, f'/api/v1/models/{model_id}/'
+        yield 'models.search', member, '/api/v1/models/search/?q=model'
+        yield 'models.reviews', member, f'/api/v1/models/{model_id}/reviews/'
+        yield 'developers.list', member, '/api/v1/developers/'
+        yield 'reviews.list', member, '/api/v1/reviews/'
+        yield 'history.list', member, '/api/v1/history/'
+        yield 'history.stats', member, '/api/v1/history/stats/'
+        yield 'history.timeline', member, '/api/v1/history/timeline/'
+        yield 'logs.usage', developer, '/api/v1/logs/usage/'
+        yield 'logs.stats', admin, '/api/v1/logs/stats/'
+    
+    def client_for(self, user):
+        """Get a test client authenticated as a user."""
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user)
+        return client
+    
+    def benchmark_endpoint(self, client, url, requests, warmup):
+        """Time GET requests to an endpoint; return its latency, query and row statistics."""
+        for _ in range(warmup):
+            client.get(url)
+        
+        queries = 0
+        
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+        
+        timings = []
+        rows = 0
+        with connection.execute_wrapper(count_query):
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f"GET {url} returned {response.status_code}: {response.content[:200]!r}")
+                rows += self.count_rows(response.data)
+        
+        timings.sort()
+        total = sum(timings)
+        return {
+            'url': url,
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3),
+            'mean_ms': round(total / requests * 1000, 3),
+            'queries_per_request': round(queries / requests, 2),
+            'rows_per_request': round(rows / requests, 2),
+            'rows_per_sec': round(rows / total, 1),
+        }
+    
+    def count_rows(self, data):
+        """Count the rows in a response: page results, a list, or one object."""
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            return len(data['results'])
+        if isinstance(data, list):
+            return len(data)
+        return 1
+    
+    def print_results(self, results):
+        """Print a table of the results."""
+        self.stdout.write(
+            f"  {'endpoint':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'rows/sec':>12}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"  {name:<18} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} "
+                f"{result['queries_per_request']:8.1f} {result['rows_per_sec']:12,.0f}"
+            )
+    
+    def compare(self, results, baseline_path, max_regression):
+        """Print p95 and query count changes against an earlier run, failing past max_regression."""
+        with open(baseline_path) as file:
+            baseline = json.load(file)['endpoints']
+        
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Compared with {baseline_path}"))
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f"  {name:<18} (not in baseline)")
+                continue
+            
+            change = (result['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0
+            line = (
+                f"  {name:<18} p95 {before['p95_ms']:8.2f} -> {result['p95_ms']:8.2f} ms ({change:+.1f}%)   "
+                f"queries {before['queries_per_request']:.1f} -> {result['queries_per_request']:.1f}"
+            )
+            if max_regression is not None and change > max_regression:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        
+        if regressions:
+            raise CommandError(f"p95 regressed more than {max_regression}% for: {', '.join(regressions)}")
+    
+    def seed(self, rng, days, users, developers, models, history, logs, reviews):
+        """Create synthetic users, developers, models, reviews, history and logs; return fixtures."""
+        suffix = uuid.uuid4().hex[:8]
+        
+        # Bulk inserts skip save(); passwords are unusable, as none is needed with forced authentication
+        user_rows = User.objects.bulk_create(
+            (
+                User(username=f'bench-{suffix}-{index}', email=f'bench-{suffix}-{index}@example.com', password='!')
+                for index in range(max(users, developers + 1))
+            ),
+            batch_size=2000
+        )
+        admin = User.objects.create_user(
+            username=f'bench-admin-{suffix}', email=f'bench-admin-{suffix}@example.com', password=None,
+            is_staff=True
+        )
+        
+        # Developers are saved one by one so each is issued an API key
+        developer_rows = [
+            Developer.objects.create(user=user, developer_name=f'Bench Developer {index}', status='active')
+            for index, user in enumerate(user_rows[:max(developers, 1)])
+        ]
+        model_rows = AIModel.objects.bulk_create(
+            (
+                AIModel(
+                    developer=developer_rows[index % len(developer_rows)],
+                    name=f'Bench Model {index}',
+                    description='Benchmark model for language tasks',
+                    category=rng.choice(['nlp', 'vision', 'audio']),
+                    api_name=f'bench-{suffix}-{index}',
+                    api_endpoint='https://example.com/api',
+                    total_requests=rng.randrange(100000)
+                )
+                for index in range(max(models, 1))
+            ),
+            batch_size=2000
+        )
+        
+        # One review per (model, user) pair; rating aggregates are reconciled afterwards
+        ModelReview.objects.bulk_create(
+            (
+                ModelReview(
+                    model=model_rows[index % len(model_rows)],
+                    user=user_rows[index // len(model_rows) % len(user_rows)],
+                    rating=rng.randint(1, 5),
+                    review_title='Benchmark review',
+                    review_text='Benchmark review text'
+                )
+                for index in range(min(reviews, len(model_rows) * len(user_rows)))
+            ),
+            batch_size=2000
+        )
+        
+        # The first user issues a tenth of the history and the first developer serves a tenth of the calls
+        member, developer = user_rows[0], developer_rows[0]
+        developer_models = [model for model in model_rows if model.developer_id == developer.id]
+        if connection.vendor == 'postgresql':
+            self.seed_postgresql(rng, days, history, logs, user_rows, model_rows, member, developer_models)
+        else:
+            self.seed_bulk(rng, days, history, logs, user_rows, model_rows, member, developer_models)
+        
+        # Rebuild the aggregates the bulk inserts skipped, with statistics for the seeded rows first
+        self.analyze([User, Developer, AIModel, ModelReview, UserHistory, APIUsageLog])
+        call_command('reconcile_ratings', stdout=StringIO())
+        call_command('backfill_usage_summaries', stdout=StringIO())
+        self.analyze([UserModelUsage, UserDailyUsage, UserSession])
+        
+        return {'member': member, 'developer': developer, 'admin': admin, 'model': model_rows[0]}
+    
+    def analyze(self, models):
+        """Refresh PostgreSQL planner statistics, which autovacuum can't gather for uncommitted rows."""
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            for model in models:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+    
+    def seed_postgresql(self, rng, days, history, logs, user_rows, model_rows, member, developer_models):
+        """Generate history and log rows in the database, fast enough for millions of rows."""
+        user_ids = [str(user.pk) for user in user_rows]
+        model_ids = [str(model.pk) for model in model_rows]
+        developer_model_ids = [str(model.pk) for model in developer_models]
+        
+        def pick(ids):
+            return f"(%s::uuid[])[1 + floor(random() * {len(ids)})::int]", [ids]
+        
+        created_at = ("now() - random() * %s * interval '1 day'", [days])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT setseed(%s)', [rng.random()])
+        
+        self.insert_series(UserHistory, history, {
+            'user': (
+                f"CASE WHEN n % 10 = 0 THEN %s::uuid ELSE {pick(user_ids)[0]} END", [str(member.pk), user_ids]
+            ),
+            'model': pick(model_ids),
+            'session_id': ("'bench-session-' || n / 20", []),
+            'prompt': ('%s', ['Benchmark prompt']),
+            'response': ('%s', ['Benchmark response']),
+            'response_status': ("CASE WHEN random() < 0.9 THEN 'success' ELSE 'error' END", []),
+            'response_time_ms': ('50 + floor(random() * 1950)::int', []),
+            'input_tokens': ('floor(random() * 500)::int', []),
+            'output_tokens': ('floor(random() * 2000)::int', []),
+            'ip_address': ("'127.0.0.1'", []),
+            'created_at': created_at,
+        })
+        
+        # The developer is read from the model, as APIUsageLog.save() would
+        self.insert_series(APIUsageLog, logs, {
+            'user': pick(user_ids),
+            'model': (
+                f"CASE WHEN n % 10 = 0 THEN {pick(developer_model_ids)[0]} ELSE {pick(model_ids)[0]} END",
+                [developer_model_ids, model_ids]
+            ),
+            'request_method': ("'POST'", []),
+            'request_path': ("'/v1/models/predict'", []),
+            'response_status_code': ('CASE WHEN random() < 0.95 THEN 200 ELSE 500 END', []),
+            'request_size_bytes': ('100 + floor(random() * 4900)::int', []),
+            'response_size_bytes': ('100 + floor(random() * 49900)::int', []),
+            'processing_time_ms': ('20 + floor(random() * 2980)::int', []),
+            'ip_address': ("'127.0.0.1'", []),
+            'created_at': created_at,
+        })
+        table = connection.ops.quote_name(APIUsageLog._meta.db_table)
+        model_table = connection.ops.quote_name(AIModel._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET developer_id = {model_table}.developer_id FROM {model_table} "
+                f"WHERE {model_table}.id = {table}.model_id AND {table}.developer_id IS NULL"
+            )
+    
+    def insert_series(self, model, count, values):
+        """
+        Insert count rows of a model with one INSERT ... SELECT over generate_series.
+        
+        values maps field names to (SQL expression, params) over the series
+        number n. UUID primary keys and unique UUID fields get random UUIDs,
+        automatic timestamps now(), and every other field its default.
+        """
+        columns, expressions, params = [], [], []
+        for field in model._meta.concrete_fields:
+            columns.append(connection.ops.quote_name(field.column))
+            if field.name in values:
+                expression, field_params = values[field.name]
+            elif field.get_internal_type() == 'UUIDField' and (field.primary_key or field.unique):
+                expression, field_params = 'gen_random_uuid()', []
+            elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                expression, field_params = 'now()', []
+            else:
+                expression, field_params = '%s', [field.get_db_prep_save(field.get_default(), connection)]
+            expressions.append(expression.replace('%', '%%').replace('%%s', '%s'))
+            params.extend(field_params)
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({', '.join(columns)}) "
+                f"SELECT {', '.join(expressions)} FROM generate_series(1, %s) AS n",
+                params + [count]
+            )
+    
+    def seed_bulk(self, rng, days, history, logs, user_rows, model_rows, member, developer_models):
+        """Create history and log rows with bulk inserts, on databases without generate_series."""
+        seeded_at = timezone.now()
+        UserHistory.objects.bulk_create(
+            (
+                UserHistory(
+                    user=member if index % 10 == 0 else rng.choice(user_rows),
+                    model=rng.choice(model_rows),
+                    session_id=f'bench-session-{index // 20}',
+                    prompt='Benchmark prompt',
+                    response='Benchmark response',
+                    response_status='success' if rng.random() < 0.9 else 'error',
+                    response_time_ms=rng.randrange(50, 2000),
+                    input_tokens=rng.randrange(500),
+                    output_tokens=rng.randrange(2000),
+                    ip_address='127.0.0.1'
+                )
+                for index in range(history)
+            ),
+            batch_size=5000
+        )
+        APIUsageLog.objects.bulk_create(
+            (
+                APIUsageLog(
+                    user=rng.choice(user_rows),
+                    developer_id=model.developer_id,
+                    model=model,
+                    request_method='POST',
+                    request_path='/v1/models/predict',
+                    response_status_code=200 if rng.random() < 0.95 else 500,
+                    request_size_bytes=rng.randrange(100, 5000),
+                    response_size_bytes=rng.randrange(100, 50000),
+                    processing_time_ms=rng.randrange(20, 3000),
+                    ip_address='127.0.0.1'
+                )
+                for model in (
+                    rng.choice(developer_models) if index % 10 == 0 else rng.choice(model_rows)
+                    for index in range(logs)
+                )
+            ),
+            batch_size=5000
+        )
+        
+        # Bulk inserts stamp every row with now, so spread them over the window
+        statement = SPREAD_CREATED_AT.get(connection.vendor)
+        if statement:
+            with connection.cursor() as cursor:
+                for model in [UserHistory, APIUsageLog]:
+                    table = connection.ops.quote_name(model._meta.db_table)
+                    cursor.execute(statement.format(table=table), [days, seeded_at])
+
+
+def percentile(sorted_values, percent):
+    """Get a percentile of sorted values by the nearest-rank method."""
+    return sorted_values[max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)]
@@ -0,0 +1,133 @@
+"""
+Benchmark the orjson renderer against the stock DRF JSON renderer.
+"""
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from core.read_serializers import compile_serializer
+from core.renderers import ORJSONRenderer
+from user_history.serializers import UserHistoryListSerializer
+from api_logs.serializers import APIUsageLogListSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare JSONRenderer and ORJSONRenderer on representative API payloads"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help="Rows in the large history payload")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per renderer")
+    
+    def handle(self, *args, **options):
+        payloads = {
+            'history page (100 rows)': self.page(self.history_rows(100)),
+            f"history page ({options['rows']} rows)": self.page(self.history_rows(options['rows'])),
+            'usage log page (100 rows)': self.page(self.log_rows(100)),
+            'developer stats': self.stats(),
+        }
+        renderers = {'JSONRenderer': JSONRenderer(), 'ORJSONRenderer': ORJSONRenderer()}
+        
+        self.stdout.write(f"Best of {options['repeat']} runs")
+        for name, payload in payloads.items():
+            rendered = {label: renderer.render(payload) for label, renderer in renderers.items()}
+            same = 'identical' if len(set(rendered.values())) == 1 else 'DIFFERENT'
+            self.stdout.write(f"{name}: {len(rendered['JSONRenderer']):,} bytes, output {same}")
+            
+            for label, renderer in renderers.items():
+                best = min(self.time(renderer.render, payload) for _ in range(options['repeat']))
+                self.stdout.write(
+                    f"  {label:<16} {best * 1000:9.3f} ms   "
+                    f"{len(rendered[label]) / best / 1024 / 1024:8.1f} MB/s"
+                )
+    
+    def time(self, render, payload):
+        """Get the wall time of one render in seconds."""
+        started = time.perf_counter()
+        render(payload)
+        return time.perf_counter() - started
+    
+    def page(self, results):
+        """Wrap results in the paginated response envelope."""
+        return {
+            'count': len(results),
+            'pages': 1,
+            'current_page': 1,
+            'page_size': len(results),
+            'next': None,
+            'previous': None,
+            'results': results
+        }
+    
+    def history_rows(self, count):
+        """Serialized history list rows, as the list endpoint returns them."""
+        now = timezone.now()
+        compiled = compile_serializer(UserHistoryListSerializer)
+        return compiled.represent_many(
+            {
+                'id': uuid.uuid4(),
+                'model__name': f'Model {index % 10}',
+                'session_id': f'session-{index // 20}',
+                'response_status': 'success' if index % 10 else 'error',
+                'response_time_ms': 100 + index % 400,
+                'cost_incurred': Decimal('0.000125') * index,
+                'user_rating': index % 5 + 1 if index % 3 else None,
+                'created_at': now - timedelta(minutes=index),
+                'input_tokens': index % 50,
+                'output_tokens': index % 200,
+            }
+            for index in range(count)
+        )
+    
+    def log_rows(self, count):
+        """Serialized usage log list rows, as the list endpoint returns them."""
+        now = timezone.now()
+        compiled = compile_serializer(APIUsageLogListSerializer)
+        return compiled.represent_many(
+            {
+                'id': uuid.uuid4(),
+                'user': uuid.uuid4() if index % 5 else None,
+                'user__username': f'user{index % 50}',
+                'model__name': f'Model {index % 10}',
+                'request_method': 'POST',
+                'response_status_code': 200 if index % 10 else 500,
+                'processing_time_ms': 50 + index % 300,
+                'created_at': now - timedelta(seconds=index),
+            }
+            for index in range(count)
+        )
+    
+    def stats(self):
+        """A stats payload with raw UUIDs, Decimals, datetimes and distributions."""
+        now = timezone.now()
+        return {
+            'total_requests': 125000,
+            'success_rate': 97.52,
+            'total_cost': Decimal('1520.337500'),
+            'status_code_distribution': {200: 121900, 400: 1200, 429: 800, 500: 1100},
+            'hourly_distribution': [
+                {'period': (now - timedelta(hours=hour)).isoformat(), 'count': hour * 37}
+                for hour in range(24)
+            ],
+            'daily_trend': [
+                {
+                    'period': (now - timedelta(days=day)).date(),
+                    'requests': 4000 + day,
+                    'total_cost': Decimal('50.125000') + day,
+                    'average_response_time': 180.25 + day
+                }
+                for day in range(30)
+            ],
+            'recent_errors': [
+                {
+                    'id': uuid.uuid4(),
+                    'model__name': f'Model {index}',
+                    'response_status_code': 500,
+                    'error_message': 'Upstream timeout',
+                    'created_at': now - timedelta(minutes=index)
+                }
+                for index in range(5)
+            ],
+        }
@@ -0,0 +1,132 @@
+"""
+Benchmark compiled read serializers against the stock DRF list serializers.
+"""
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.projection import project_queryset
+from core.read_serializers import compile_serializer
+from users.models import User
+from developers.models import Developer
+from ai_models.models import AIModel
+from ai_models.serializers import AIModelListSerializer
+from user_history.models import UserHistory
+from user_history.serializers import UserHistoryListSerializer
+from api_logs.models import APIUsageLog
+from api_logs.serializers import APIUsageLogListSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of compiled read serializers and the DRF list serializers"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help="Rows seeded per table")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per path")
+    
+    def handle(self, *args, **options):
+        # Seed inside a transaction that is always rolled back
+        with transaction.atomic():
+            user, developer = self.seed(options['rows'])
+            cases = [
+                (AIModelListSerializer, AIModel.objects.filter(developer=developer)),
+                (UserHistoryListSerializer, UserHistory.objects.filter(user=user)),
+                (APIUsageLogListSerializer, APIUsageLog.objects.filter(developer=developer)),
+            ]
+            
+            self.stdout.write(f"{options['rows']} rows per table, best of {options['repeat']} runs")
+            for serializer_class, queryset in cases:
+                self.stdout.write(serializer_class.__name__)
+                self.benchmark_serializer(serializer_class, queryset.order_by('-created_at'), options['repeat'])
+            
+            transaction.set_rollback(True)
+    
+    def benchmark_serializer(self, serializer_class, queryset, repeat):
+        """Time query plus serialization, and serialization alone, for both paths."""
+        compiled = compile_serializer(serializer_class)
+        projected = project_queryset(queryset, serializer_class)
+        instances = list(projected)
+        rows = list(compiled.values(queryset))
+        
+        paths = {
+            'DRF, query + serialize': lambda: serializer_class(list(projected.all()), many=True).data,
+            'compiled, query + serialize': lambda: compiled.represent_many(compiled.values(queryset)),
+            'DRF, serialize only': lambda: serializer_class(instances, many=True).data,
+            'compiled, serialize only': lambda: compiled.represent_many(rows),
+        }
+        for name, run in paths.items():
+            run()  # Warm up
+            best = min(self.time(run) for _ in range(repeat))
+            self.stdout.write(
+                f"  {name:<28} {best * 1000:9.2f} ms   {len(rows) / best:12,.0f} rows/sec"
+            )
+    
+    def time(self, run):
+        """Get the wall time of one run in seconds."""
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
+    
+    def seed(self, rows):
+        """Create models, history and logs for one user and developer."""
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            username=f'bench-{suffix}', email=f'bench-{suffix}@example.com', password=None
+        )
+        developer = Developer.objects.create(
+            user=User.objects.create_user(
+                username=f'bench-dev-{suffix}', email=f'bench-dev-{suffix}@example.com', password=None
+            ),
+            developer_name=f'bench-dev-{suffix}'
+        )
+        models = AIModel.objects.bulk_create(
+            (
+                AIModel(
+                    developer=developer,
+                    name=f'Bench Model {index}',
+                    description='Benchmark model ' * 50,
+                    category='nlp',
+                    api_name=f'bench-{suffix}-{index}',
+                    api_endpoint='https://example.com/api',
+                    tags=['benchmark', 'nlp']
+                )
+                for index in range(rows)
+            ),
+            batch_size=2000
+        )
+        UserHistory.objects.bulk_create(
+            (
+                UserHistory(
+                    user=user,
+                    model=models[index % len(models)],
+                    session_id=f'bench-session-{index // 20}',
+                    prompt='Benchmark prompt ' * 100,
+                    response='Benchmark response ' * 200,
+                    response_status='success' if index % 10 else 'error',
+                    response_time_ms=100 + index % 400,
+                    input_tokens=index % 50,
+                    output_tokens=index % 200,
+                    ip_address='127.0.0.1'
+                )
+                for index in range(rows)
+            ),
+            batch_size=2000
+        )
+        APIUsageLog.objects.bulk_create(
+            (
+                APIUsageLog(
+                    user=user if index % 5 else None,
+                    developer=developer,
+                    model=models[index % len(models)],
+                    request_method='POST',
+                    request_path='/api/v1/predict/',
+                    request_headers={'content-type': 'application/json'},
+                    response_status_code=200 if index % 10 else 500,
+                    processing_time_ms=50 + index % 300,
+                    ip_address='127.0.0.1'
+                )
+                for index in range(rows)
+            ),
+            batch_size=2000
+        )
+        return user, developer
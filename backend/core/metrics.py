@@ -0,0 +1,212 @@
+"""
+In-process request metrics exported in the Prometheus text format.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Metric name prefix
+NAMESPACE = 'ai_platform'
+
+# The measurements of the request being sampled in this context, if any
+current_sample = ContextVar('current_sample', default=None)
+
+
+class Histogram:
+    """
+    A log-linear histogram in the style of HDR histograms.
+    
+    Each power of two is split into ``SUB_BUCKETS`` equal buckets, so a
+    recorded value is known to within a quarter of itself whatever its
+    magnitude, from microseconds to minutes or bytes to megabytes, without
+    choosing bucket bounds per metric. Only buckets that received values
+    are stored and exported.
+    """
+    SUB_BUCKETS = 4
+    
+    def __init__(self):
+        self.counts = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0
+    
+    @classmethod
+    def bucket_index(cls, value):
+        """Get the bucket of a positive value."""
+        mantissa, exponent = math.frexp(value)
+        return exponent * cls.SUB_BUCKETS + int((mantissa - 0.5) * 2 * cls.SUB_BUCKETS)
+    
+    @classmethod
+    def bucket_upper_bound(cls, index):
+        """Get the upper bound of a bucket."""
+        exponent, sub_bucket = divmod(index, cls.SUB_BUCKETS)
+        return math.ldexp(0.5 + (sub_bucket + 1) / (2 * cls.SUB_BUCKETS), exponent)
+    
+    def record(self, value):
+        """Add a value; callers hold the registry lock."""
+        self.count += 1
+        self.sum += value
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            index = self.bucket_index(value)
+            self.counts[index] = self.counts.get(index, 0) + 1
+    
+    def cumulative_buckets(self):
+        """Get (upper bound, cumulative count) pairs in increasing order, ending with +Inf."""
+        buckets = [(0, self.zero_count)] if self.zero_count else []
+        total = self.zero_count
+        for index in sorted(self.counts):
+            total += self.counts[index]
+            buckets.append((self.bucket_upper_bound(index), total))
+        buckets.append((math.inf, self.count))
+        return buckets
+
+
+class MetricsRegistry:
+    """
+    Request counters for every request and histograms for sampled ones,
+    per view and method.
+    """
+    # Histogram name suffix and help text, per measurement
+    HISTOGRAMS = {
+        'request_seconds': ('http_request_duration_seconds', 'Wall time of sampled requests'),
+        'db_queries': ('db_queries_per_request', 'Database queries issued by sampled requests'),
+        'db_seconds': ('db_query_duration_seconds', 'Database time of sampled requests'),
+        'serializer_seconds': ('serializer_duration_seconds', 'Serializer time of sampled requests'),
+        'response_bytes': ('http_response_size_bytes', 'Response body size of sampled requests'),
+    }
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+    
+    def clear(self):
+        """Drop every recorded value."""
+        self.requests = {}
+        self.histograms = {}
+    
+    def count_request(self, view, method, status):
+        """Count one request, sampled or not."""
+        key = (view, method, str(status))
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+    
+    def record_sample(self, view, method, sample):
+        """Record the measurements of a sampled request."""
+        with self.lock:
+            histograms = self.histograms.get((view, method))
+            if histograms is None:
+                histograms = self.histograms[(view, method)] = {name: Histogram() for name in self.HISTOGRAMS}
+            for name, histogram in histograms.items():
+                histogram.record(getattr(sample, name))
+    
+    def render(self, sample_rate):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = [
+            f'# HELP {NAMESPACE}_metrics_sample_rate Fraction of requests measured into histograms',
+            f'# TYPE {NAMESPACE}_metrics_sample_rate gauge',
+            f'{NAMESPACE}_metrics_sample_rate {format_value(sample_rate)}',
+            f'# HELP {NAMESPACE}_http_requests_total Requests handled, sampled or not',
+            f'# TYPE {NAMESPACE}_http_requests_total counter',
+        ]
+        
+        with self.lock:
+            for (view, method, status), count in sorted(self.requests.items()):
+                labels = format_labels(view=view, method=method, status=status)
+                lines.append(f'{NAMESPACE}_http_requests_total{{{labels}}} {count}')
+            
+            for name, (suffix, help_text) in self.HISTOGRAMS.items():
+                metric = f'{NAMESPACE}_{suffix}'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (view, method), histograms in sorted(self.histograms.items()):
+                    histogram = histograms[name]
+                    labels = format_labels(view=view, method=method)
+                    for upper_bound, count in histogram.cumulative_buckets():
+                        lines.append(f'{metric}_bucket{{{labels},le="{format_value(upper_bound)}"}} {count}')
+                    lines.append(f'{metric}_sum{{{labels}}} {format_value(histogram.sum)}')
+                    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+        
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(**labels):
+    """Format label pairs, escaping values as Prometheus requires."""
+    return ','.join(
+        f'{name}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+
+
+def format_value(value):
+    """Format a sample value."""
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestSample:
+    """
+    The measurements of one sampled request.
+    
+    Installed with ``connection.execute_wrapper`` while the request runs, it
+    counts and times every query on the default database.
+    """
+    __slots__ = ('request_seconds', 'db_queries', 'db_seconds', 'serializer_seconds', 'response_bytes',
+                 'serializing')
+    
+    def __init__(self):
+        self.request_seconds = 0
+        self.db_queries = 0
+        self.db_seconds = 0
+        self.serializer_seconds = 0
+        self.response_bytes = 0
+        self.serializing = False
+    
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.db_queries += 1
+
+
+@contextmanager
+def serializer_timer():
+    """Add the time spent in the block to the sampled request's serializer time."""
+    sample = current_sample.get()
+    if sample is None or sample.serializing:
+        yield
+        return
+    
+    sample.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.serializer_seconds += time.perf_counter() - started
+        sample.serializing = False
+
+
+def instrument_serializers():
+    """Time ``serializer.data`` of REST framework serializers for sampled requests."""
+    from rest_framework.serializers import BaseSerializer
+    
+    data = BaseSerializer.data
+    if getattr(data.fget, 'instrumented', False):
+        return
+    
+    def timed_data(self):
+        if current_sample.get() is None:
+            return data.fget(self)
+        with serializer_timer():
+            return data.fget(self)
+    timed_data.instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+registry = MetricsRegistry()
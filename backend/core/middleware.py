@@ -0,0 +1,126 @@
+"""
+Middleware for the AI Platform.
+"""
+import logging
+import random
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+from .metrics import RequestSample, current_sample, instrument_serializers, registry
+from .principal import Principal
+from .query_inspection import QueryBudgetExceeded, QueryInspector
+
+logger = logging.getLogger(__name__)
+
+
+def get_view_name(request):
+    """Get the URL name of the matched view, keeping per-view labels bounded."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match._func_path
+
+
+class PrincipalMiddleware:
+    """
+    Attach ``request.principal``, the request's user reduced to
+    ``user_id``, ``developer_id``, ``is_staff`` and ``role``.
+    
+    The principal is resolved lazily, on first access, because REST
+    framework authenticates inside the view; by the time permissions and
+    querysets read it, ``request.user`` is the authenticated user. It is
+    then computed once per request however many checks consult it.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        request.principal = SimpleLazyObject(lambda: Principal.from_user(request.user))
+        return self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Count every request and measure a sample of them into the metrics
+    registry served at ``/api/v1/_metrics``.
+    
+    Sampled requests record wall time, database query count and time
+    (through ``connection.execute_wrapper``), time spent producing
+    serializer data and response size, per view name and method. Other
+    requests only bump a counter, so ``METRICS_SAMPLE_RATE`` bounds the
+    overhead. Place it first so the wall time covers the other middleware.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 0.1)
+        instrument_serializers()
+    
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            response = self.get_response(request)
+            registry.count_request(get_view_name(request), request.method, response.status_code)
+            return response
+        
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(sample):
+                response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        sample.request_seconds = time.perf_counter() - started
+        if not response.streaming:
+            sample.response_bytes = len(response.content)
+        
+        view = get_view_name(request)
+        registry.count_request(view, request.method, response.status_code)
+        registry.record_sample(view, request.method, sample)
+        return response
+
+
+class QueryInspectionMiddleware:
+    """
+    Report N+1 patterns, slow queries and query budget overruns per request.
+    
+    Enabled by ``QUERY_INSPECTION`` (on with ``DEBUG``). Statements repeated
+    ``QUERY_REPEAT_THRESHOLD`` times in one request are logged with the
+    code that issued them, and queries slower than ``QUERY_SLOW_THRESHOLD_MS``
+    with their plan. ``QUERY_BUDGETS`` maps (view name, method) pairs to
+    the most queries a request may issue, so a POST to a list route isn't
+    held to the budget of reading it (HEAD counts as GET). With
+    ``QUERY_BUDGET_RAISE`` an overrun raises QueryBudgetExceeded instead of
+    being logged, failing the test that made the request.
+    """
+    
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        self.raise_on_overrun = getattr(settings, 'QUERY_BUDGET_RAISE', False)
+    
+    def __call__(self, request):
+        inspector = QueryInspector()
+        with connection.execute_wrapper(inspector):
+            response = self.get_response(request)
+        
+        view = get_view_name(request)
+        if inspector.repeated():
+            logger.warning(
+                "Repeated queries in %s %s (%s, %d queries):\n%s",
+                request.method, request.path, view, inspector.count, inspector.report()
+            )
+        
+        method = 'GET' if request.method == 'HEAD' else request.method
+        budget = self.budgets.get((view, method))
+        if budget is not None and inspector.count > budget:
+            message = f"{request.method} {request.path} ({view}) issued {inspector.count} queries, budget is {budget}"
+            if self.raise_on_overrun:
+                raise QueryBudgetExceeded(f"{message}\n{inspector.report()}")
+            logger.error(message)
+        return response
@@ -0,0 +1,146 @@
+"""
+Reusable view mixins for the AI Platform.
+"""
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+from .projection import project_queryset
+from .read_serializers import compile_serializer
+
+
+class ConditionalGetMixin:
+    """
+    Answer conditional GET requests (If-None-Match / If-Modified-Since)
+    with 304 Not Modified.
+    
+    The validators are derived from ``max(updated_at)`` and the row count
+    of the queryset behind the action, computed in a single aggregate query,
+    so an unchanged resource is never loaded or serialized.
+    
+    The ETag sees nothing but the row count and those timestamps: every
+    write that changes the payload (counters kept with ``update()`` and
+    ``F()`` expressions included) must bump ``updated_at`` of a row listed
+    in ``conditional_timestamp_fields``, or clients keep getting 304s for
+    stale data. Payloads that depend on rows not covered by these fields
+    must leave the action out of ``conditional_actions``; payloads that
+    change with time alone must fold that into ``get_conditional_state()``.
+    """
+    # Actions that emit ETag/Last-Modified and honour conditional headers
+    conditional_actions = ['list', 'retrieve']
+    
+    # Timestamp fields whose maximum marks the last change of the payload.
+    # Include related timestamps for nested data (e.g. 'developer__updated_at').
+    conditional_timestamp_fields = ['updated_at']
+    
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+    
+    def get_conditional_queryset(self):
+        """Get the queryset whose rows make up the response payload."""
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        if self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        
+        return queryset
+    
+    def get_conditional_state(self):
+        """Return (row_count, last_modified) without fetching any rows."""
+        aggregates = {'row_count': Count('pk', distinct=True)}
+        for index, field in enumerate(self.conditional_timestamp_fields):
+            aggregates[f'last_modified_{index}'] = Max(field)
+        
+        state = self.get_conditional_queryset().order_by().aggregate(**aggregates)
+        row_count = state.pop('row_count')
+        timestamps = [value for value in state.values() if value is not None]
+        
+        return row_count, max(timestamps) if timestamps else None
+    
+    def compute_etag(self, row_count, last_modified):
+        """Build an ETag scoped to the request path, query string and user."""
+        seed = '|'.join([
+            self.request.get_full_path(),
+            str(self.request.user.pk or ''),
+            str(row_count),
+            last_modified.isoformat() if last_modified else '',
+        ])
+        return '"%s"' % hashlib.md5(seed.encode('utf-8')).hexdigest()
+    
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Return 304 when the client copy is fresh, otherwise run handler."""
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+        
+        row_count, last_modified = self.get_conditional_state()
+        
+        # Let a missing object fall through to the normal 404 handling
+        if self.detail and row_count == 0:
+            return handler(request, *args, **kwargs)
+        
+        etag = self.compute_etag(row_count, last_modified)
+        last_modified_ts = last_modified.timestamp() if last_modified else None
+        
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified_ts) if last_modified_ts else None,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified_ts:
+                response['Last-Modified'] = http_date(last_modified_ts)
+            patch_vary_headers(response, ['Authorization', 'Cookie'])
+        
+        return response
+
+
+class ProjectedListMixin:
+    """
+    Load only the columns the serializer of a list action reads.
+    
+    The projection is derived from the serializer's declared fields (see
+    ``core.projection``), so large text and JSON columns that a list never
+    renders stay in the database, and only the relations the serializer
+    follows are joined.
+    """
+    # Actions whose querysets are projected onto their serializer's fields
+    projected_actions = ['list']
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.projected_actions:
+            queryset = project_queryset(queryset, self.get_serializer_class())
+        return queryset
+
+
+class CompiledListMixin:
+    """
+    Serve list actions through a compiled read serializer.
+    
+    The filtered queryset is read with ``values()`` and rendered by the
+    function compiled from the list serializer (see ``core.read_serializers``),
+    so neither model instances nor per-row serializer fields are created.
+    Serializers that cannot be compiled fall back to the stock list.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        compiled = compile_serializer(self.get_serializer_class())
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.represent_many(page))
+        
+        return Response(compiled.represent_many(queryset))
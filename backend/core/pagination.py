@@ -1,7 +1,7 @@
 """
 Custom pagination classes for the AI Platform.
 """
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -41,3 +41,15 @@ class SmallResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
+
+
+class RecentActivityCursorPagination(CursorPagination):
+    """
+    Cursor pagination for activity feeds ordered by a recency timestamp.
+    
+    Pages are keyset range reads, so their cost doesn't grow with depth.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
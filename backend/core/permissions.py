@@ -2,6 +2,7 @@
 Custom permissions for the AI Platform.
 """
 from rest_framework import permissions
+from .principal import get_principal
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -10,18 +11,20 @@ class IsOwnerOrAdmin(permissions.BasePermission):
     """
     
     def has_object_permission(self, request, view, obj):
+        principal = get_principal(request)
+        
         # Admin users have full access
-        if request.user.is_staff:
+        if principal.is_staff:
             return True
         
         # Check if object has an owner field
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        if hasattr(obj, 'user_id'):
+            return principal.owns_user_object(obj)
         
         # Check if object is the user themselves
-        if hasattr(obj, 'id') and hasattr(request.user, 'id'):
-            return obj.id == request.user.id
-            
+        if hasattr(obj, 'id') and principal.is_authenticated:
+            return obj.id == principal.user_id
+        
         return False
 
 
@@ -34,13 +37,15 @@ class IsUserOrAdmin(permissions.BasePermission):
         return request.user and request.user.is_authenticated
     
     def has_object_permission(self, request, view, obj):
+        principal = get_principal(request)
+        
         # Admin users have full access
-        if request.user.is_staff:
+        if principal.is_staff:
             return True
         
         # Check if object belongs to the user
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        if hasattr(obj, 'user_id'):
+            return principal.owns_user_object(obj)
         
         # Check if object is the user themselves
         return obj == request.user
@@ -52,11 +57,12 @@ class IsDeveloperOrAdmin(permissions.BasePermission):
     """
     
     def has_permission(self, request, view):
-        if request.user and request.user.is_authenticated:
-            if request.user.is_staff:
+        principal = get_principal(request)
+        if principal.is_authenticated:
+            if principal.is_staff:
                 return True
             # Check if user has developer profile
-            return hasattr(request.user, 'developer_profile')
+            return principal.is_developer
         return False
 
 
@@ -66,13 +72,15 @@ class IsOwnerDeveloperOrAdmin(permissions.BasePermission):
     """
     
     def has_object_permission(self, request, view, obj):
+        principal = get_principal(request)
+        
         # Admin users have full access
-        if request.user.is_staff:
+        if principal.is_staff:
             return True
         
-        # Check if object belongs to the developer
-        if hasattr(obj, 'developer'):
-            return hasattr(request.user, 'developer_profile') and obj.developer == request.user.developer_profile
+        # Check if object belongs to the developer, by foreign key id
+        if hasattr(obj, 'developer_id'):
+            return principal.owns_developer_object(obj)
         
         return False
 
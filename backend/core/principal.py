@@ -0,0 +1,86 @@
+"""
+The authenticated principal of a request, resolved once per request.
+"""
+
+# Role names, from most to least privileged
+ROLE_ADMIN = 'admin'
+ROLE_DEVELOPER = 'developer'
+ROLE_USER = 'user'
+ROLE_ANONYMOUS = 'anonymous'
+
+
+class Principal:
+    """
+    Who a request acts as, reduced to the ids and flags that
+    authorization needs.
+    
+    Ownership checks compare ``developer_id`` and ``user_id`` with the
+    foreign key ids of objects (``obj.developer_id``), so neither the
+    developer profile nor the object's related rows are loaded to decide
+    access.
+    """
+    __slots__ = ('user_id', 'developer_id', 'is_staff', 'is_authenticated')
+    
+    def __init__(self, user_id=None, developer_id=None, is_staff=False, is_authenticated=False):
+        self.user_id = user_id
+        self.developer_id = developer_id
+        self.is_staff = is_staff
+        self.is_authenticated = is_authenticated
+    
+    def __repr__(self):
+        return f"<Principal {self.role} user={self.user_id} developer={self.developer_id}>"
+    
+    @classmethod
+    def from_user(cls, user):
+        """Build the principal of a user; the developer profile is read at most once."""
+        if user is None or not user.is_authenticated:
+            return cls()
+        
+        developer = getattr(user, 'developer_profile', None)
+        return cls(
+            user_id=user.pk,
+            developer_id=developer.pk if developer else None,
+            is_staff=user.is_staff,
+            is_authenticated=True
+        )
+    
+    @property
+    def is_developer(self):
+        """Check if the principal has a developer profile."""
+        return self.developer_id is not None
+    
+    @property
+    def role(self):
+        """Get the role name: admin, developer, user or anonymous."""
+        if not self.is_authenticated:
+            return ROLE_ANONYMOUS
+        if self.is_staff:
+            return ROLE_ADMIN
+        if self.is_developer:
+            return ROLE_DEVELOPER
+        return ROLE_USER
+    
+    def owns_developer_object(self, obj):
+        """Check if an object's ``developer`` foreign key points at this principal."""
+        return self.is_developer and getattr(obj, 'developer_id', None) == self.developer_id
+    
+    def owns_user_object(self, obj):
+        """Check if an object's ``user`` foreign key points at this principal."""
+        return self.is_authenticated and getattr(obj, 'user_id', None) == self.user_id
+
+
+def get_principal(request):
+    """
+    Get the principal of a request, resolving it from ``request.user`` on
+    first use and reusing it afterwards.
+    
+    Works with both Django and REST framework requests; REST framework
+    authentication sets the user on the underlying request as well, so a
+    principal resolved inside a view reflects the token or API key user.
+    """
+    http_request = getattr(request, '_request', request)
+    principal = getattr(http_request, 'principal', None)
+    if principal is None:
+        principal = Principal.from_user(getattr(request, 'user', None))
+        http_request.principal = principal
+    return principal
@@ -0,0 +1,111 @@
+"""
+Column projection for read-only list serializers.
+"""
+import re
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def resolve_source(model, source_attrs):
+    """
+    Map a serializer field source to ``(field_path, model_field)``, or
+    None if it reads anything other than concrete fields along to-one
+    relations.
+    """
+    path = []
+    for index, attr in enumerate(source_attrs):
+        is_last = index == len(source_attrs) - 1
+        
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # get_FOO_display() only reads the FOO column
+            display = re.fullmatch(r'get_(\w+)_display', attr)
+            if not (display and is_last):
+                return None
+            try:
+                field = model._meta.get_field(display.group(1))
+            except FieldDoesNotExist:
+                return None
+        
+        if not field.concrete or field.many_to_many:
+            return None
+        
+        path.append(field.name)
+        if field.is_relation and not is_last:
+            model = field.related_model
+    
+    return '__'.join(path), field
+
+
+def collect_field_paths(model, serializer, prefix=''):
+    """Get the model field paths read by a serializer instance, or None."""
+    meta = getattr(serializer, 'Meta', None)
+    extra_fields = getattr(meta, 'projection_extra_fields', None)
+    paths = {prefix + model._meta.pk.name}
+    
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        
+        # Method fields are opaque; the serializer must list what they read
+        if isinstance(field, serializers.SerializerMethodField):
+            if extra_fields is None:
+                return None
+            continue
+        
+        if field.source == '*' or isinstance(field, serializers.ListSerializer):
+            return None
+        
+        resolved = resolve_source(model, field.source_attrs)
+        if resolved is None:
+            return None
+        path, model_field = resolved
+        
+        # Nested serializers project their own fields through the relation
+        if isinstance(field, serializers.BaseSerializer):
+            if not model_field.is_relation:
+                return None
+            nested = collect_field_paths(model_field.related_model, field, f'{prefix}{path}__')
+            if nested is None:
+                return None
+            paths.update(nested)
+        
+        # Other relational fields may read anything on the related object
+        elif model_field.is_relation and not isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None
+        
+        paths.add(prefix + path)
+    
+    paths.update(prefix + name for name in extra_fields or [])
+    return paths
+
+
+@lru_cache(maxsize=None)
+def serializer_only_fields(serializer_class):
+    """
+    Get the field paths a model serializer reads, for ``QuerySet.only()``.
+    
+    Paths follow each field's ``source`` through to-one relations
+    (``developer.developer_name`` becomes ``developer__developer_name``).
+    ``SerializerMethodField`` values are computed in Python, so serializers
+    that use them declare the columns they read in
+    ``Meta.projection_extra_fields``. Returns None when the fields cannot be
+    resolved, in which case the queryset should be left unprojected.
+    """
+    paths = collect_field_paths(serializer_class.Meta.model, serializer_class())
+    return tuple(sorted(paths)) if paths is not None else None
+
+
+def project_queryset(queryset, serializer_class):
+    """
+    Restrict a queryset to the columns the serializer reads, joining
+    exactly the relations it follows.
+    """
+    fields = serializer_only_fields(serializer_class)
+    if fields is None:
+        return queryset
+    
+    relations = {path.rsplit('__', 1)[0] for path in fields if '__' in path}
+    return queryset.select_related(None).select_related(*relations).only(*fields)
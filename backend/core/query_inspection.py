@@ -0,0 +1,144 @@
+"""
+Development and test checks for repeated, slow and excessive SQL queries.
+"""
+import logging
+import re
+import time
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# Literals and placeholder lists that vary between otherwise identical statements
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+# Stack frames outside the project (the standard library, site-packages) are left out of reports
+PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request or block issues more queries than its budget."""
+
+
+def fingerprint(sql):
+    """Reduce a statement to its shape, so the same query with other parameters matches."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def project_stack(limit=6):
+    """Get the innermost project frames of the current stack, formatted for a log."""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(PROJECT_ROOT)
+        and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames[-limit:]))
+
+
+class QueryInspector:
+    """
+    Fingerprint every query on the default database.
+    
+    Installed with ``connection.execute_wrapper``, it counts queries per
+    fingerprint and keeps the project stack of the first call of each, so
+    a statement repeated ``repeat_threshold`` times or more (usually a
+    serializer method querying per row) is reported with the code that
+    issued it. Queries slower than ``slow_threshold_ms`` are logged as
+    they happen, with the database's EXPLAIN output for SELECTs.
+    """
+    
+    def __init__(self, repeat_threshold=None, slow_threshold_ms=None):
+        if repeat_threshold is None:
+            repeat_threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 5)
+        if slow_threshold_ms is None:
+            slow_threshold_ms = getattr(settings, 'QUERY_SLOW_THRESHOLD_MS', 100)
+        self.repeat_threshold = repeat_threshold
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.count = 0
+        self.statements = {}
+        self.explaining = False
+    
+    def __call__(self, execute, sql, params, many, context):
+        # Queries run by EXPLAIN itself are not inspected
+        if self.explaining:
+            return execute(sql, params, many, context)
+        
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = time.perf_counter() - started
+        
+        self.count += 1
+        key = fingerprint(sql)
+        statement = self.statements.get(key)
+        if statement is None:
+            statement = self.statements[key] = {'count': 0, 'seconds': 0, 'stack': project_stack()}
+        statement['count'] += 1
+        statement['seconds'] += elapsed
+        
+        if elapsed >= self.slow_threshold:
+            self.log_slow_query(sql, params, many, elapsed, statement['stack'])
+        return result
+    
+    def log_slow_query(self, sql, params, many, elapsed, stack):
+        """Log a slow query with its plan."""
+        plan = self.explain(sql, params) if not many and sql.lstrip()[:6].upper() == 'SELECT' else None
+        logger.warning(
+            "Slow query (%.1f ms): %s\n%sPlan:\n%s",
+            elapsed * 1000, sql, stack, plan or '(not a single SELECT)'
+        )
+    
+    def explain(self, sql, params):
+        """Get the database's plan for a statement, or None when it can't be explained."""
+        self.explaining = True
+        try:
+            # A savepoint keeps a failed EXPLAIN from aborting the request's transaction
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+        except DatabaseError:
+            return None
+        finally:
+            self.explaining = False
+    
+    def repeated(self):
+        """Get (fingerprint, statement) pairs issued at least repeat_threshold times, most first."""
+        return sorted(
+            ((key, statement) for key, statement in self.statements.items()
+             if statement['count'] >= self.repeat_threshold),
+            key=lambda item: -item[1]['count']
+        )
+    
+    def report(self):
+        """Describe the repeated statements and where they were issued."""
+        return '\n'.join(
+            f"{statement['count']}x ({statement['seconds'] * 1000:.1f} ms): {key}\n{statement['stack']}"
+            for key, statement in self.repeated()
+        )
+
+
+@contextmanager
+def query_budget(max_queries, repeat_threshold=None):
+    """
+    Fail with QueryBudgetExceeded if the block issues more than max_queries.
+    
+    The failure lists the repeated statements and the code that issued
+    them, which points straight at an N+1 pattern. For use in tests.
+    """
+    inspector = QueryInspector(repeat_threshold=repeat_threshold)
+    with connection.execute_wrapper(inspector):
+        yield inspector
+    
+    if inspector.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{inspector.count} queries issued, budget is {max_queries}\n{inspector.report()}"
+        )
@@ -0,0 +1,191 @@
+"""
+Compiled read-only serializers for large list pages.
+"""
+from functools import lru_cache
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import empty
+from .metrics import serializer_timer
+from .projection import resolve_source
+
+
+class Row:
+    """
+    Attribute access over a ``values()`` row, for serializer methods.
+    
+    Compiled serializers subclass this per model and copy the model's
+    properties onto it, so methods such as ``get_total_tokens`` can keep
+    reading ``obj.total_tokens`` without a model instance being built.
+    """
+    __slots__ = ('_row',)
+    
+    def __init__(self, row):
+        self._row = row
+    
+    def __getattr__(self, name):
+        try:
+            return self._row[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def row_class(model):
+    """Build the Row subclass carrying a model's properties."""
+    properties = {}
+    for klass in reversed(model.__mro__):
+        if issubclass(klass, models.Model) and klass is not models.Model:
+            properties.update(
+                (name, value) for name, value in vars(klass).items()
+                if isinstance(value, property)
+            )
+    return type(f'{model.__name__}Row', (Row,), {'__slots__': (), **properties})
+
+
+def field_converter(field):
+    """
+    Get a plain function equivalent to ``field.to_representation`` for
+    non-null values, or None when the value is returned unchanged.
+    """
+    if isinstance(field, (serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField)):
+        # values() already yields the primary key itself
+        if getattr(field, 'pk_field', None) is None:
+            return None
+    elif isinstance(field, serializers.JSONField) and not field.binary:
+        return None
+    elif isinstance(field, serializers.BooleanField):
+        return bool
+    elif isinstance(field, serializers.IntegerField):
+        return int
+    elif isinstance(field, serializers.FloatField):
+        return float
+    elif isinstance(field, serializers.CharField):
+        return str
+    elif isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    return field.to_representation
+
+
+class CompiledSerializer:
+    """
+    A read-only ``ModelSerializer`` compiled to a single row-to-dict function.
+    
+    Rows are read with ``QuerySet.values(*value_fields)``, so no model
+    instances are built, and each declared field becomes one dict lookup
+    plus its type conversion. ``get_FOO_display`` sources are answered from
+    precomputed choice maps, and ``SerializerMethodField`` methods receive a
+    ``Row`` exposing the row values and the model's properties. Output
+    matches the serializer's own ``to_representation``, including fields
+    skipped when a nullable relation along their source is missing.
+    """
+    
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.value_fields = []
+        self.represent = self.compile(serializer_class())
+    
+    def compile(self, serializer):
+        """Generate the row-to-dict function; raise ValueError if unsupported."""
+        namespace = {}
+        lines = ['def represent(row):', '    data = {}']
+        
+        for index, field in enumerate(serializer.fields.values()):
+            if field.write_only:
+                continue
+            
+            name = field.field_name
+            if isinstance(field, serializers.SerializerMethodField):
+                if 'row_class' not in namespace:
+                    namespace['row_class'] = row_class(self.model)
+                    lines.insert(1, '    obj = row_class(row)')
+                namespace[f'method_{index}'] = getattr(serializer, field.method_name)
+                lines.append(f'    data[{name!r}] = method_{index}(obj)')
+                continue
+            
+            if (
+                field.source == '*'
+                or isinstance(field, serializers.BaseSerializer)
+                or (isinstance(field, serializers.RelatedField)
+                    and not isinstance(field, serializers.PrimaryKeyRelatedField))
+            ):
+                raise ValueError(f"Field '{name}' cannot be compiled")
+            
+            resolved = resolve_source(self.model, field.source_attrs)
+            if resolved is None:
+                raise ValueError(f"Field '{name}' cannot be compiled")
+            path, model_field = resolved
+            self.add_value_field(path)
+            
+            # DRF skips the field when a nullable relation on the way is missing
+            indent = '    '
+            guards = self.nullable_relations(path)
+            if guards and not field.allow_null:
+                if field.default is not empty:
+                    raise ValueError(f"Field '{name}' cannot be compiled")
+                for guard in guards:
+                    self.add_value_field(guard)
+                lines.append('    if ' + ' and '.join(
+                    f'row[{guard!r}] is not None' for guard in guards
+                ) + ':')
+                indent = '        '
+            
+            lines.append(f'{indent}value = row[{path!r}]')
+            if field.source_attrs[-1] == f'get_{model_field.name}_display':
+                namespace[f'display_{index}'] = dict(model_field.flatchoices)
+                lines.append(f'{indent}value = display_{index}.get(value, value)')
+            
+            converter = field_converter(field)
+            if converter is None:
+                lines.append(f'{indent}data[{name!r}] = value')
+            else:
+                namespace[f'convert_{index}'] = converter
+                lines.append(
+                    f'{indent}data[{name!r}] = None if value is None else convert_{index}(value)'
+                )
+        
+        # Columns read by serializer methods
+        extra_fields = getattr(serializer.Meta, 'projection_extra_fields', None)
+        if 'row_class' in namespace and extra_fields is None:
+            raise ValueError("Serializer methods need Meta.projection_extra_fields")
+        for path in extra_fields or []:
+            self.add_value_field(path)
+        
+        lines.append('    return data')
+        exec('\n'.join(lines), namespace)
+        return namespace['represent']
+    
+    def add_value_field(self, path):
+        """Add a path to the values() field list, keeping declaration order."""
+        if path not in self.value_fields:
+            self.value_fields.append(path)
+    
+    def nullable_relations(self, path):
+        """Get the nullable relation paths traversed on the way to a field."""
+        nullable = []
+        model = self.model
+        names = path.split('__')
+        for position, name in enumerate(names[:-1]):
+            relation = model._meta.get_field(name)
+            if relation.null:
+                nullable.append('__'.join(names[:position + 1]))
+            model = relation.related_model
+        return nullable
+    
+    def values(self, queryset):
+        """Restrict a queryset to the rows this serializer reads."""
+        return queryset.values(*self.value_fields)
+    
+    def represent_many(self, rows):
+        """Serialize values() rows in order."""
+        represent = self.represent
+        with serializer_timer():
+            return [represent(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """Compile a serializer class once, or return None if it cannot be compiled."""
+    try:
+        return CompiledSerializer(serializer_class)
+    except ValueError:
+        return None
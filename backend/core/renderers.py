@@ -0,0 +1,58 @@
+"""
+Renderers for the AI Platform.
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+# Types orjson cannot encode natively (Decimal, lazy strings, querysets, ...)
+# are passed to DRF's own encoder so the output stays identical
+drf_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer which serializes to JSON with orjson.
+    
+    Output matches the stock ``JSONRenderer`` with the default compact,
+    unicode settings: UUIDs and dates are encoded natively (UTC as ``Z``),
+    Decimals become floats, non-string dict keys become strings and
+    U+2028/U+2029 are escaped. Indented responses and data orjson rejects
+    (such as integers wider than 64 bits) are rendered by ``JSONRenderer``.
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        try:
+            ret = orjson.dumps(data, default=drf_default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        # Keep the output a strict javascript subset, as JSONRenderer does
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class PrometheusRenderer(BaseRenderer):
+    """
+    Renderer for the Prometheus text exposition format.
+    
+    Views return the exposition text as their data; error payloads, such
+    as a refused permission, are rendered as JSON.
+    """
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return ORJSONRenderer().render(data, accepted_media_type, renderer_context)
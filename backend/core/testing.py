@@ -0,0 +1,47 @@
+"""
+Shared fixtures and helpers for the test suites of the AI Platform apps.
+"""
+from django.db import connection
+from users.models import User
+from developers.models import Developer
+from ai_models.models import AIModel
+from user_history.models import UserHistory
+
+# Password given to every test user
+TEST_PASSWORD = 'pass12345'
+
+
+def create_user(username, **extra_fields):
+    """Create a user whose email is derived from the username."""
+    extra_fields.setdefault('password', TEST_PASSWORD)
+    return User.objects.create_user(username=username, email=f'{username}@example.com', **extra_fields)
+
+
+def create_developer(username='developer', user=None, **extra_fields):
+    """Create a developer profile, with its own user unless one is given."""
+    extra_fields.setdefault('developer_name', username)
+    return Developer.objects.create(user=user or create_user(username), **extra_fields)
+
+
+def create_model(developer, name='Test Model', api_name='test-model', **extra_fields):
+    """Create an AI model of a developer."""
+    extra_fields.setdefault('description', 'Test model')
+    extra_fields.setdefault('category', 'nlp')
+    extra_fields.setdefault('api_endpoint', 'https://example.com/api')
+    return AIModel.objects.create(developer=developer, name=name, api_name=api_name, **extra_fields)
+
+
+def create_history(user, model, **extra_fields):
+    """Record one interaction of a user with a model."""
+    extra_fields.setdefault('session_id', 'session')
+    extra_fields.setdefault('prompt', 'Hello')
+    extra_fields.setdefault('response_time_ms', 100)
+    extra_fields.setdefault('ip_address', '127.0.0.1')
+    return UserHistory.objects.create(user=user, model=model, **extra_fields)
+
+
+def explain_with_index_scans(queryset):
+    """Get the plan of a queryset with sequential scans off, as tiny test tables are otherwise always scanned."""
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
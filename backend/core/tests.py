@@ -0,0 +1,429 @@
+import io
+import json
+import tempfile
+import uuid
+import zoneinfo
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from authentication.tokens import PlatformRefreshToken
+from users.models import User
+from developers.models import Developer
+from developers.quota import billing_period
+from ai_models.models import AIModel
+from reviews.models import ModelReview
+from .metrics import Histogram, registry
+from .parsers import ORJSONParser
+from .principal import ROLE_ADMIN, ROLE_DEVELOPER, ROLE_USER, Principal
+from .query_inspection import QueryBudgetExceeded, fingerprint, query_budget
+from .renderers import ORJSONRenderer
+from .testing import create_developer, create_history, create_model, create_user
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """
+    The orjson renderer must produce the same bytes as JSONRenderer.
+    """
+    
+    def assertRendersLikeJSONRenderer(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_stats_payload_matches_json_renderer(self):
+        now = timezone.now()
+        self.assertRendersLikeJSONRenderer({
+            'id': uuid.uuid4(),
+            'created_at': now,
+            'created_at_local': now.astimezone(zoneinfo.ZoneInfo('America/New_York')),
+            'created_at_naive': datetime(2024, 3, 10, 2, 30),
+            'day': date(2024, 3, 10),
+            'at': time(12, 30, 15, 250),
+            'window': timedelta(hours=1, milliseconds=5),
+            'total_cost': Decimal('12.345600'),
+            'rating_distribution': {1: 0, 2: 3, 5: 10},
+            'label': gettext_lazy('Other'),
+            'results': [OrderedDict([('name', 'Modèle\u2028✓'), ('tags', ('a', 'b'))])],
+            'empty': None,
+        })
+    
+    def test_wide_integers_fall_back_to_json_renderer(self):
+        self.assertRendersLikeJSONRenderer({'total': 2 ** 70})
+    
+    def test_indented_responses_use_json_renderer(self):
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+    
+    def test_parser_round_trip_and_strict_constants(self):
+        parser = ORJSONParser()
+        body = ORJSONRenderer().render({'prompt': 'héllo', 'max_tokens': 50})
+        self.assertEqual(parser.parse(io.BytesIO(body)), {'prompt': 'héllo', 'max_tokens': 50})
+        
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"value": NaN}'))
+
+
+class PermissionMatrixTests(TestCase):
+    """
+    Permission checks must decide from the request principal's ids, without
+    loading developer profiles or the objects' developers.
+    """
+    
+    def setUp(self):
+        self.users = {
+            'admin': create_user('admin', password=None, is_staff=True),
+            'user': create_user('user', password=None),
+        }
+        for name in ['owner', 'other']:
+            self.users[name] = create_developer(name, user=create_user(name, password=None)).user
+        
+        self.model = create_model(
+            self.users['owner'].developer_profile,
+            name='Owned Model',
+            api_name='owned-model'
+        )
+    
+    def matrix(self):
+        """Get (method, url, data, expected status per role) rows."""
+        model_url = f'/api/v1/models/{self.model.pk}/'
+        return [
+            ('get', '/api/v1/models/', None,
+             {'anonymous': 200, 'user': 200, 'owner': 200, 'other': 200, 'admin': 200}),
+            ('post', '/api/v1/models/', {},
+             {'anonymous': 401, 'user': 403, 'owner': 400, 'other': 400, 'admin': 403}),
+            ('patch', model_url, {'description': 'Updated'},
+             {'anonymous': 401, 'user': 403, 'owner': 200, 'other': 404, 'admin': 200}),
+            ('get', '/api/v1/logs/usage/', None,
+             {'anonymous': 401, 'user': 200, 'owner': 200, 'other': 200, 'admin': 200}),
+            ('get', '/api/v1/logs/metrics/', None,
+             {'anonymous': 401, 'user': 200, 'owner': 200, 'other': 200, 'admin': 200}),
+        ]
+    
+    def request(self, client, method, url, data):
+        """Make a request and get its response and developers table queries."""
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data, format='json')
+        queries = [query['sql'] for query in context.captured_queries if 'FROM "developers"' in query['sql']]
+        return response, queries
+    
+    def test_token_principals_need_no_developer_queries(self):
+        for method, url, data, expected in self.matrix():
+            for role, status_code in expected.items():
+                with self.subTest(method=method, url=url, role=role):
+                    client = APIClient()
+                    if role != 'anonymous':
+                        token = PlatformRefreshToken.for_user(self.users[role]).access_token
+                        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+                    
+                    response, queries = self.request(client, method, url, data)
+                    self.assertEqual(response.status_code, status_code)
+                    self.assertEqual(queries, [])
+    
+    def test_session_principals_resolve_the_profile_once(self):
+        for method, url, data, expected in self.matrix():
+            for role, status_code in expected.items():
+                if role == 'anonymous':
+                    continue
+                with self.subTest(method=method, url=url, role=role):
+                    client = APIClient()
+                    client.force_authenticate(User.objects.get(pk=self.users[role].pk))
+                    
+                    response, queries = self.request(client, method, url, data)
+                    self.assertEqual(response.status_code, status_code)
+                    self.assertEqual(len(queries), 1)
+    
+    def test_roles(self):
+        roles = {
+            name: Principal.from_user(User.objects.get(pk=user.pk)).role
+            for name, user in self.users.items()
+        }
+        self.assertEqual(
+            roles,
+            {'admin': ROLE_ADMIN, 'user': ROLE_USER, 'owner': ROLE_DEVELOPER, 'other': ROLE_DEVELOPER}
+        )
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Conditional actions must answer a fresh If-None-Match with 304, and the
+    ETag must change with the payload and differ between users.
+    """
+    
+    def setUp(self):
+        self.owner = create_developer('owner').user
+        self.model = create_model(self.owner.developer_profile)
+        self.url = '/api/v1/models/'
+        self.client = APIClient()
+    
+    def test_get_returns_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'])
+        self.assertIn('Last-Modified', response)
+    
+    def test_fresh_etag_gets_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+    
+    def test_update_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        
+        owner = APIClient()
+        owner.force_authenticate(self.owner)
+        response = owner.patch(f'{self.url}{self.model.pk}/', {'description': 'Updated'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'][0]['description'], 'Updated')
+    
+    def test_rating_counter_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        
+        ModelReview.objects.create(
+            model=self.model, user=create_user('reviewer'), rating=5, review_title='Good', review_text='Works well'
+        )
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['total_reviews'], 1)
+    
+    def test_etag_is_per_user(self):
+        anonymous_etag = self.client.get(self.url)['ETag']
+        
+        member = APIClient()
+        member.force_authenticate(create_user('member'))
+        response = member.get(self.url, HTTP_IF_NONE_MATCH=anonymous_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], anonymous_etag)
+        self.assertEqual(member.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+    
+    def test_model_detail_is_not_conditional(self):
+        url = f'{self.url}{self.model.pk}/'
+        self.assertNotIn('ETag', self.client.get(url))
+        
+        # The nested developer totals cover sibling models
+        create_model(self.owner.developer_profile, name='Sibling', api_name='sibling')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['developer']['model_count'], 2)
+    
+    def test_developer_etag_changes_with_billing_period(self):
+        developer = self.owner.developer_profile
+        url = f'/api/v1/developers/{developer.pk}/'
+        last_month = timezone.now() - timedelta(days=40)
+        Developer.objects.filter(pk=developer.pk).update(
+            current_month_usage=3, usage_period=billing_period(last_month), updated_at=last_month
+        )
+        User.objects.filter(pk=self.owner.pk).update(updated_at=last_month)
+        
+        with mock.patch('django.utils.timezone.now', return_value=last_month):
+            response = self.client.get(url)
+        self.assertEqual(response.data['current_month_usage'], 3)
+        
+        # No write happens at the rollover, yet the usage now reads as 0
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['current_month_usage'], 0)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+class HistogramTests(SimpleTestCase):
+    """
+    Histogram buckets must bound each value to within a quarter of itself.
+    """
+    
+    def test_values_fall_within_their_bucket(self):
+        for value in [0.00013, 0.5, 1, 3, 7.9, 1000, 123456]:
+            with self.subTest(value=value):
+                index = Histogram.bucket_index(value)
+                upper = Histogram.bucket_upper_bound(index)
+                lower = Histogram.bucket_upper_bound(index - 1)
+                self.assertTrue(lower <= value < upper)
+                self.assertLessEqual(upper - lower, value / 4)
+    
+    def test_cumulative_buckets(self):
+        histogram = Histogram()
+        for value in [0, 0, 1, 1, 5, 100]:
+            histogram.record(value)
+        
+        buckets = histogram.cumulative_buckets()
+        self.assertEqual(buckets[0], (0, 2))
+        self.assertEqual([count for _, count in buckets], [2, 4, 5, 6, 6])
+        self.assertEqual(histogram.sum, 107)
+
+
+@override_settings(METRICS_SAMPLE_RATE=1.0)
+class MetricsEndpointTests(TestCase):
+    """
+    Sampled requests must be exported per view at the admin-only metrics endpoint.
+    """
+    
+    def setUp(self):
+        registry.clear()
+        self.admin = create_user('admin', password=None, is_staff=True)
+        self.client = APIClient()
+    
+    def test_sampled_requests_are_exported(self):
+        self.assertEqual(self.client.get('/api/v1/models/').status_code, 200)
+        
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/v1/_metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        
+        text = response.content.decode()
+        labels = 'view="ai_models:aimodel-list",method="GET"'
+        self.assertIn(f'ai_platform_http_requests_total{{{labels},status="200"}} 1', text)
+        for metric in [
+            'http_request_duration_seconds', 'db_queries_per_request', 'db_query_duration_seconds',
+            'serializer_duration_seconds', 'http_response_size_bytes'
+        ]:
+            self.assertIn(f'ai_platform_{metric}_count{{{labels}}} 1', text)
+        self.assertIn(f'ai_platform_db_queries_per_request_bucket{{{labels},le="+Inf"}} 1', text)
+    
+    def test_metrics_are_admin_only(self):
+        self.client.force_authenticate(create_user('member', password=None))
+        
+        self.assertEqual(self.client.get('/api/v1/_metrics').status_code, 403)
+
+
+class QueryInspectionTests(TestCase):
+    """
+    Repeated statements must be reported with the code that issued them,
+    slow queries with their plan, and budget overruns must fail.
+    """
+    
+    def setUp(self):
+        self.member = create_user('member', password=None)
+        for index in range(3):
+            developer = create_developer(f'developer{index}', status='active')
+            for number in range(3):
+                model = create_model(developer, name=f'Model {index}-{number}', api_name=f'model-{index}-{number}')
+                ModelReview.objects.create(
+                    model=model, user=developer.user, rating=4, review_title='Good', review_text='Works well'
+                )
+                create_history(self.member, model)
+    
+    def test_fingerprint_ignores_parameters(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 42 AND name = 'it''s'"),
+            fingerprint('SELECT *  FROM t\nWHERE id = 7 AND name = \'other\'')
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'), fingerprint('SELECT * FROM t WHERE id IN (%s)')
+        )
+    
+    def test_repeated_queries_fail_the_budget_with_their_origin(self):
+        with self.assertRaises(QueryBudgetExceeded) as context:
+            with query_budget(2, repeat_threshold=3):
+                [model.developer.developer_name for model in AIModel.objects.all()]
+        
+        message = str(context.exception)
+        self.assertIn('10 queries issued, budget is 2', message)
+        self.assertIn('9x', message)
+        self.assertIn('core/tests.py', message)
+        self.assertIn('model.developer.developer_name', message)
+    
+    @override_settings(QUERY_SLOW_THRESHOLD_MS=0)
+    def test_slow_queries_are_logged_with_their_plan(self):
+        with self.assertLogs('core.query_inspection', 'WARNING') as logs:
+            with query_budget(1):
+                list(AIModel.objects.filter(status='active'))
+        
+        self.assertEqual(len(logs.output), 1)
+        self.assertRegex(logs.output[0], r'(?i)plan:\n.*(scan|search)')
+    
+    @override_settings(QUERY_INSPECTION=True, QUERY_BUDGET_RAISE=True)
+    def test_endpoints_stay_within_their_budgets(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        
+        for url in [
+            '/api/v1/developers/',
+            '/api/v1/models/',
+            f'/api/v1/models/{AIModel.objects.first().id}/',
+            '/api/v1/reviews/',
+            '/api/v1/history/',
+            '/api/v1/logs/usage/',
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 200)
+    
+    @override_settings(
+        QUERY_INSPECTION=True, QUERY_BUDGET_RAISE=True, QUERY_BUDGETS={('ai_models:aimodel-list', 'GET'): 0}
+    )
+    def test_endpoint_over_budget_fails(self):
+        with self.assertRaisesRegex(QueryBudgetExceeded, r'ai_models:aimodel-list\) issued \d+ queries, budget is 0'):
+            APIClient().get('/api/v1/models/')
+    
+    @override_settings(
+        QUERY_INSPECTION=True, QUERY_BUDGET_RAISE=True, QUERY_BUDGETS={('api_logs:apiusagelog-list', 'GET'): 0}
+    )
+    def test_writes_are_not_held_to_the_read_budget(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        
+        with self.assertRaises(QueryBudgetExceeded):
+            client.get('/api/v1/logs/usage/')
+        
+        response = client.post('/api/v1/logs/usage/', {
+            'model': str(AIModel.objects.first().pk),
+            'request_method': 'POST',
+            'request_path': '/api/v1/predict/',
+            'response_status_code': 200,
+            'processing_time_ms': 10,
+            'ip_address': '127.0.0.1'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+
+class BenchmarkApiCommandTests(TestCase):
+    """
+    The API benchmark must seed, drive every endpoint and write comparable JSON.
+    """
+    
+    def test_benchmark_writes_and_compares_results(self):
+        volumes = {'users': 5, 'developers': 2, 'models': 4, 'history': 50, 'logs': 50, 'reviews': 5}
+        with tempfile.TemporaryDirectory() as directory:
+            output = f'{directory}/results.json'
+            call_command(
+                'benchmark_api', requests=3, warmup=1, output=output, stdout=io.StringIO(), skip_checks=True,
+                **volumes
+            )
+            with open(output) as file:
+                report = json.load(file)
+            
+            self.assertEqual(report['volumes'], volumes)
+            self.assertIn('models.list', report['endpoints'])
+            for result in report['endpoints'].values():
+                self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+                self.assertLessEqual(result['p95_ms'], result['p99_ms'])
+                self.assertGreater(result['queries_per_request'], 0)
+            
+            # A baseline no request can beat must fail the comparison
+            for result in report['endpoints'].values():
+                result['p95_ms'] = 0.001
+            with open(output, 'w') as file:
+                json.dump(report, file)
+            with self.assertRaisesRegex(CommandError, 'p95 regressed'):
+                call_command(
+                    'benchmark_api', requests=3, warmup=1, compare=output, max_regression=10,
+                    stdout=io.StringIO(), skip_checks=True, **volumes
+                )
+        
+        # Seeded data is rolled back
+        self.assertFalse(User.objects.filter(username__startswith='bench-').exists())
@@ -0,0 +1,182 @@
+"""
+Time-bucketed aggregation for statistics endpoints.
+"""
+import zoneinfo
+from datetime import datetime, time, timedelta
+from django.db import models
+from django.db.models import Count, Q
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+
+def get_request_timezone(request):
+    """Get the time zone named by the ``tz`` query param, or the default one."""
+    name = request.query_params.get('tz')
+    if not name:
+        return timezone.get_default_timezone()
+    
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}")
+
+
+class TimeBuckets:
+    """
+    A half-open time range split into hour, day, week or month buckets
+    aligned to a time zone.
+    
+    Rows are selected with plain ``field >= start AND field < end``
+    predicates so the ``created_at`` indexes stay usable, grouped with
+    ``date_trunc`` in the given time zone, and missing buckets are filled in.
+    """
+    BUCKET_CHOICES = ['hour', 'day', 'week', 'month']
+    
+    # Upper bound on buckets per response
+    MAX_BUCKETS = 1000
+    
+    def __init__(self, bucket, start, end, tz=None):
+        if bucket not in self.BUCKET_CHOICES:
+            raise ValueError(
+                f"Invalid bucket '{bucket}'. Choose from: {', '.join(self.BUCKET_CHOICES)}"
+            )
+        
+        self.bucket = bucket
+        self.tz = tz or timezone.get_default_timezone()
+        self.start = self.floor(start)
+        self.end = end
+    
+    @classmethod
+    def last(cls, count, bucket, tz=None, now=None):
+        """Get the ``count`` most recent buckets, ending with the current one."""
+        now = now or timezone.now()
+        buckets = cls(bucket, now, now, tz)
+        current = buckets.start
+        buckets.start = buckets.shift(current, 1 - count)
+        buckets.end = buckets.shift(current, 1)
+        return buckets
+    
+    @classmethod
+    def from_request(cls, request, default_bucket='day', default_days=30):
+        """
+        Build buckets covering the last ``days`` up to now from the
+        ``bucket``, ``days`` and ``tz`` query params.
+        """
+        try:
+            days = int(request.query_params.get('days', default_days))
+        except ValueError:
+            raise ValueError("days must be an integer")
+        if days < 0:
+            raise ValueError("days must not be negative")
+        
+        now = timezone.now()
+        buckets = cls(
+            request.query_params.get('bucket', default_bucket),
+            now - timedelta(days=days),
+            now,
+            get_request_timezone(request)
+        )
+        buckets.end = buckets.shift(buckets.floor(now), 1)
+        
+        if len(buckets.starts()) > cls.MAX_BUCKETS:
+            raise ValueError(f"Too many buckets requested (max {cls.MAX_BUCKETS})")
+        return buckets
+    
+    @classmethod
+    def current(cls, bucket, tz=None, now=None):
+        """Get the single bucket containing now (e.g. today, this month)."""
+        return cls.last(1, bucket, tz, now)
+    
+    def floor(self, value):
+        """Get the start of the bucket containing value."""
+        local = timezone.localtime(value, self.tz).replace(tzinfo=None)
+        
+        if self.bucket == 'hour':
+            local = local.replace(minute=0, second=0, microsecond=0)
+        elif self.bucket == 'day':
+            local = datetime.combine(local.date(), time.min)
+        elif self.bucket == 'week':
+            local = datetime.combine(local.date() - timedelta(days=local.weekday()), time.min)
+        else:
+            local = datetime.combine(local.date().replace(day=1), time.min)
+        
+        return timezone.make_aware(local, self.tz)
+    
+    def shift(self, start, count):
+        """Move a bucket start by count buckets."""
+        # Hours are absolute; longer buckets follow the local calendar across DST changes
+        if self.bucket == 'hour':
+            utc_start = start.astimezone(zoneinfo.ZoneInfo('UTC'))
+            return timezone.localtime(utc_start + timedelta(hours=count), self.tz)
+        
+        local = timezone.localtime(start, self.tz).replace(tzinfo=None)
+        if self.bucket == 'day':
+            local += timedelta(days=count)
+        elif self.bucket == 'week':
+            local += timedelta(weeks=count)
+        else:
+            months = local.year * 12 + local.month - 1 + count
+            local = local.replace(year=months // 12, month=months % 12 + 1)
+        
+        return timezone.make_aware(local, self.tz)
+    
+    def starts(self):
+        """Get the start of every bucket in the range."""
+        starts = []
+        start = self.start
+        while start < self.end:
+            starts.append(start)
+            start = self.shift(start, 1)
+        return starts
+    
+    def label(self, start):
+        """Format a bucket start for API output."""
+        start = timezone.localtime(start, self.tz)
+        if self.bucket == 'hour':
+            return start.isoformat()
+        return start.date().isoformat()
+    
+    def q(self, field='created_at'):
+        """Get the half-open range predicate on a timestamp field."""
+        return Q(**{f'{field}__gte': self.start, f'{field}__lt': self.end})
+    
+    def filter(self, queryset, field='created_at'):
+        """Restrict a queryset to the range with index-friendly predicates."""
+        return queryset.filter(self.q(field))
+    
+    def aggregate(self, queryset, field='created_at', fill_value=0, **aggregates):
+        """
+        Aggregate rows per bucket; return one dict per bucket in order,
+        with fill_value for buckets that have no rows.
+        """
+        rows = self.filter(queryset, field).order_by().annotate(
+            bucket_start=Trunc(field, self.bucket, output_field=models.DateTimeField(), tzinfo=self.tz)
+        ).values('bucket_start').annotate(**aggregates)
+        
+        return self.fill(
+            {row.pop('bucket_start'): row for row in rows},
+            {name: fill_value for name in aggregates}
+        )
+    
+    def fill(self, rows_by_start, empty):
+        """Order rows keyed by bucket start, filling gaps with a copy of empty."""
+        return [
+            {'period': self.label(start), **rows_by_start.get(start, empty)}
+            for start in self.starts()
+        ]
+
+
+def count_current_periods(queryset, tz=None, field='created_at', now=None):
+    """
+    Count rows created today and this month in one query.
+    
+    Both windows are half-open timestamp ranges in the given time zone
+    (the default one if omitted), never ``__date`` casts of the column.
+    """
+    today = TimeBuckets.current('day', tz, now)
+    this_month = TimeBuckets.current('month', tz, now)
+    
+    return this_month.filter(queryset, field).order_by().aggregate(
+        today=Count('pk', filter=today.q(field)),
+        this_month=Count('pk')
+    )
@@ -2,9 +2,10 @@
 URL configuration for core app.
 """
 from django.urls import path
+from .views import metrics_view
 
 app_name = 'core'
 
 urlpatterns = [
-    # Core endpoints can be added here if needed
+    path('_metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,26 @@
+"""
+Views for the core app.
+"""
+from django.conf import settings
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema
+from .metrics import registry
+from .renderers import PrometheusRenderer
+
+
+@extend_schema(
+    summary="Request metrics",
+    description="Per-view request counts and sampled latency, query and size histograms "
+                "in the Prometheus text format (Admin only)"
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+@renderer_classes([PrometheusRenderer])
+def metrics_view(request):
+    """Export the request metrics of this process."""
+    return Response(
+        registry.render(getattr(settings, 'METRICS_SAMPLE_RATE', 0.1)),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -20,7 +20,11 @@ class DeveloperAdmin(admin.ModelAdmin):
         'user__username', 'specialization'
     )
     ordering = ('-created_at',)
-    readonly_fields = ('api_key', 'total_revenue', 'created_at', 'updated_at')
+    # Usage is charged in the database and reset with the action below
+    readonly_fields = (
+        'api_key_prefix', 'api_key_created_at', 'current_month_usage', 'usage_period',
+        'total_revenue', 'created_at', 'updated_at'
+    )
     
     fieldsets = (
         ('Basic Information', {
@@ -36,7 +40,10 @@ class DeveloperAdmin(admin.ModelAdmin):
             'fields': ('status', 'is_verified', 'verification_date')
         }),
         ('API & Quota Management', {
-            'fields': ('api_key', 'monthly_quota_limit', 'current_month_usage')
+            'fields': (
+                'api_key_prefix', 'api_key_created_at', 'monthly_quota_limit',
+                'current_month_usage', 'usage_period'
+            )
         }),
         ('Revenue Tracking', {
             'fields': ('total_revenue',)
@@ -60,11 +67,14 @@ class DeveloperAdmin(admin.ModelAdmin):
     def verify_developers(self, request, queryset):
         """Verify selected developers."""
         from django.utils import timezone
-        queryset.update(is_verified=True, verification_date=timezone.now(), status='active')
+        now = timezone.now()
+        queryset.update(is_verified=True, verification_date=now, status='active', updated_at=now)
         self.message_user(request, f"{queryset.count()} developers verified successfully.")
     verify_developers.short_description = "Verify selected developers"
     
     def reset_monthly_usage(self, request, queryset):
         """Reset monthly usage for selected developers."""
-        queryset.update(current_month_usage=0)
+        from django.utils import timezone
+        from .quota import billing_period
+        queryset.update(current_month_usage=0, usage_period=billing_period(), updated_at=timezone.now())
         self.message_user(request, f"Monthly usage reset for {queryset.count()} developers.")
@@ -0,0 +1,111 @@
+"""
+Developer API keys: generation, hashing and cached lookup.
+"""
+import hashlib
+import hmac
+import secrets
+from django.conf import settings
+from django.core.cache import cache
+from core.cache import TTLCache, rebuild_instance
+
+# Keys look like dev_<secret>; the start of the secret is stored in clear
+# as the lookup prefix, the whole key only as a SHA-256 hash
+KEY_PREFIX = 'dev_'
+LOOKUP_PREFIX_LENGTH = 8
+
+# Fields kept in the cache. Counters such as current_month_usage are left
+# deferred, so reading them goes to the database instead of a stale copy
+CACHED_DEVELOPER_FIELDS = [
+    'id', 'user_id', 'developer_name', 'status', 'is_verified',
+    'monthly_quota_limit', 'api_key_prefix', 'api_key_hash'
+]
+CACHED_USER_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'status', 'is_active', 'is_staff', 'is_superuser'
+]
+
+# Per-process copies of key records, in front of the shared cache
+local_keys = TTLCache(ttl=getattr(settings, 'API_KEY_LOCAL_CACHE_TIMEOUT', 30))
+
+
+def generate_api_key():
+    """Generate a new plain API key."""
+    return f"{KEY_PREFIX}{secrets.token_urlsafe(32)}"
+
+
+def lookup_prefix(key):
+    """Get the lookup prefix of a well-formed key, or None."""
+    if not key.startswith(KEY_PREFIX) or len(key) <= len(KEY_PREFIX) + LOOKUP_PREFIX_LENGTH:
+        return None
+    return key[len(KEY_PREFIX):len(KEY_PREFIX) + LOOKUP_PREFIX_LENGTH]
+
+
+def hash_api_key(key):
+    """Hash a plain API key for storage and comparison."""
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def cache_key(prefix):
+    """Get the shared cache key for a lookup prefix."""
+    return f'developers:api_key:{prefix}'
+
+
+def load_key_record(prefix):
+    """Read the developer owning a lookup prefix; an empty record if none does."""
+    # Import here to avoid circular imports
+    from .models import Developer
+    
+    developer = Developer.objects.select_related('user').only(
+        *CACHED_DEVELOPER_FIELDS, *[f'user__{field}' for field in CACHED_USER_FIELDS]
+    ).filter(api_key_prefix=prefix).first()
+    if developer is None:
+        return {}
+    
+    return {
+        'key_hash': developer.api_key_hash,
+        'developer': {field: getattr(developer, field) for field in CACHED_DEVELOPER_FIELDS},
+        'user': {field: getattr(developer.user, field) for field in CACHED_USER_FIELDS},
+    }
+
+
+def get_key_record(prefix):
+    """Get the record for a lookup prefix from the local cache, the shared cache or the database."""
+    record = local_keys.get(prefix)
+    if record is None:
+        record = cache.get(cache_key(prefix))
+        if record is None:
+            # Unknown prefixes are cached too, so bad keys can't flood the database
+            record = load_key_record(prefix)
+            cache.set(cache_key(prefix), record, getattr(settings, 'API_KEY_CACHE_TIMEOUT', 300))
+        local_keys.set(prefix, record)
+    return record
+
+
+def authenticate_api_key(key):
+    """
+    Get the developer, with its user, owning a plain API key, or None.
+    
+    A key seen recently costs no database queries; the instances are
+    rebuilt from the cached fields.
+    """
+    prefix = lookup_prefix(key)
+    if prefix is None:
+        return None
+    
+    record = get_key_record(prefix)
+    if not record or not hmac.compare_digest(record['key_hash'], hash_api_key(key)):
+        return None
+    
+    # Import here to avoid circular imports
+    from users.models import User
+    from .models import Developer
+    
+    developer = rebuild_instance(Developer, record['developer'])
+    developer.user = rebuild_instance(User, record['user'])
+    return developer
+
+
+def invalidate_api_key(prefix):
+    """Drop the cached record of a lookup prefix in this process and the shared cache."""
+    local_keys.delete(prefix)
+    cache.delete(cache_key(prefix))
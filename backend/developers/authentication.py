@@ -0,0 +1,47 @@
+"""
+API key authentication for developers.
+"""
+from rest_framework import authentication, exceptions
+from .api_keys import authenticate_api_key
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticate developers by API key.
+    
+    The key is read from an ``Authorization: Api-Key <key>`` header or an
+    ``X-API-Key`` header. On success ``request.user`` is the developer's
+    user and ``request.auth`` is the Developer, for downstream quota checks
+    and usage logging.
+    """
+    keyword = 'Api-Key'
+    
+    def authenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+        
+        developer = authenticate_api_key(key)
+        if developer is None:
+            raise exceptions.AuthenticationFailed('Invalid API key')
+        
+        if not developer.user.is_active or developer.status in developer.API_KEY_BLOCKED_STATUSES:
+            raise exceptions.AuthenticationFailed('API key owner is not active')
+        
+        return developer.user, developer
+    
+    def get_key(self, request):
+        """Get the plain key from the request headers, or None."""
+        parts = authentication.get_authorization_header(request).split()
+        if parts and parts[0].lower() == self.keyword.lower().encode():
+            if len(parts) != 2:
+                raise exceptions.AuthenticationFailed('Invalid API key header')
+            try:
+                return parts[1].decode()
+            except UnicodeError:
+                raise exceptions.AuthenticationFailed('Invalid API key header')
+        
+        return request.META.get('HTTP_X_API_KEY') or None
+    
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+import django.contrib.postgres.fields
+import django.core.validators
+from django.db import migrations, models
+import phonenumber_field.modelfields
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Developer',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('developer_name', models.CharField(max_length=100, unique=True)),
+                ('company_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('website_url', models.URLField(blank=True, null=True)),
+                ('business_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('business_phone', phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None)),
+                ('specialization', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), default=list, help_text='Areas of AI/ML specialization', size=10)),
+                ('bio', models.TextField(blank=True)),
+                ('years_experience', models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(50)])),
+                ('status', models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive'), ('suspended', 'Suspended'), ('pending_approval', 'Pending Approval')], default='pending_approval', max_length=20)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('verification_date', models.DateTimeField(blank=True, null=True)),
+                ('api_key', models.CharField(blank=True, max_length=255, null=True, unique=True)),
+                ('monthly_quota_limit', models.PositiveIntegerField(default=10000)),
+                ('current_month_usage', models.PositiveIntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+            ],
+            options={
+                'verbose_name': 'Developer',
+                'verbose_name_plural': 'Developers',
+                'db_table': 'developers',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('developers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='developer',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='developer_profile', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='developer',
+            index=models.Index(fields=['developer_name'], name='developers_develop_8c9a6e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='developer',
+            index=models.Index(fields=['status'], name='developers_status_21c089_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='developer',
+            index=models.Index(fields=['is_verified'], name='developers_is_veri_8653ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='developer',
+            index=models.Index(fields=['created_at'], name='developers_created_9c2ab2_idx'),
+        ),
+    ]
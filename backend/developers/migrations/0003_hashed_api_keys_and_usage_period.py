@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+import hashlib
+from django.db import migrations, models
+
+# Key format of developers.api_keys at the time of this migration
+KEY_PREFIX = 'dev_'
+LOOKUP_PREFIX_LENGTH = 8
+
+
+def hash_legacy_api_keys(apps, schema_editor):
+    """
+    Move every plain api_key into api_key_prefix and api_key_hash, so
+    issued keys keep working. Keys that don't have the dev_ format, or
+    whose lookup prefix is already taken, are dropped and must be rotated.
+    """
+    Developer = apps.get_model('developers', 'Developer')
+    seen_prefixes = set()
+
+    developers = Developer.objects.exclude(api_key=None).exclude(api_key='').only('id', 'api_key', 'created_at')
+    for developer in developers.iterator():
+        key = developer.api_key
+        if not key.startswith(KEY_PREFIX) or len(key) <= len(KEY_PREFIX) + LOOKUP_PREFIX_LENGTH:
+            continue
+        prefix = key[len(KEY_PREFIX):len(KEY_PREFIX) + LOOKUP_PREFIX_LENGTH]
+        if prefix in seen_prefixes:
+            continue
+        seen_prefixes.add(prefix)
+
+        Developer.objects.filter(pk=developer.pk).update(
+            api_key_prefix=prefix,
+            api_key_hash=hashlib.sha256(key.encode('utf-8')).hexdigest(),
+            api_key_created_at=developer.created_at
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developers', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='developer',
+            name='api_key_created_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='developer',
+            name='api_key_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='developer',
+            name='api_key_prefix',
+            field=models.CharField(blank=True, max_length=16, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='developer',
+            name='usage_period',
+            field=models.DateField(blank=True, help_text='First day of the billing month current_month_usage counts', null=True),
+        ),
+        # Hash the stored keys before the plain column goes; plain keys can't be restored on reversal
+        migrations.RunPython(hash_legacy_api_keys, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='developer',
+            name='api_key',
+        ),
+    ]
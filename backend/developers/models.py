@@ -2,12 +2,17 @@
 Developer models for managing AI model creators.
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 from core.models import BaseModel
 from users.models import User
+from .api_keys import (
+    CACHED_DEVELOPER_FIELDS, generate_api_key, hash_api_key, invalidate_api_key, lookup_prefix
+)
+from .quota import billing_period, charge_usage, usage_in_period
 
 
 class Developer(BaseModel):
@@ -21,6 +26,15 @@ class Developer(BaseModel):
         ('pending_approval', 'Pending Approval'),
     ]
     
+    # Statuses whose API keys are refused
+    API_KEY_BLOCKED_STATUSES = ['inactive', 'suspended']
+    
+    # API key fields written on rotation and revocation
+    API_KEY_FIELDS = ['api_key_prefix', 'api_key_hash', 'api_key_created_at']
+    
+    # Usage fields charged in the database, which full saves leave alone
+    USAGE_FIELDS = ['current_month_usage', 'usage_period']
+    
     # Link to user account
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='developer_profile')
     
@@ -52,10 +66,15 @@ class Developer(BaseModel):
     is_verified = models.BooleanField(default=False)
     verification_date = models.DateTimeField(null=True, blank=True)
     
-    # API and quota management
-    api_key = models.CharField(max_length=255, unique=True, blank=True, null=True)
+    # API and quota management; the key itself is only stored as a hash
+    api_key_prefix = models.CharField(max_length=16, unique=True, blank=True, null=True)
+    api_key_hash = models.CharField(max_length=64, blank=True)
+    api_key_created_at = models.DateTimeField(null=True, blank=True)
     monthly_quota_limit = models.PositiveIntegerField(default=10000)
     current_month_usage = models.PositiveIntegerField(default=0)
+    usage_period = models.DateField(
+        null=True, blank=True, help_text="First day of the billing month current_month_usage counts"
+    )
     
     # Revenue tracking
     total_revenue = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
@@ -75,27 +94,93 @@ class Developer(BaseModel):
         return f"{self.developer_name} ({self.user.email})"
     
     def save(self, *args, **kwargs):
-        # Generate API key if not exists
-        if not self.api_key:
-            import secrets
-            self.api_key = f"dev_{secrets.token_urlsafe(32)}"
+        # Issue an API key on creation; the plain key is only kept on this instance
+        if self._state.adding and not self.api_key_hash:
+            self.issued_api_key = self.set_api_key()
+        
+        # Usage is charged by conditional UPDATEs; writing this instance's copy back would undo charges
+        if (not self._state.adding and not args and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred_fields = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.USAGE_FIELDS
+                and field.attname not in deferred_fields
+            ]
+        
         super().save(*args, **kwargs)
+        
+        # Cached key lookups carry a copy of these fields
+        update_fields = kwargs.get('update_fields')
+        if self.api_key_prefix and (
+            update_fields is None or set(update_fields) & set(CACHED_DEVELOPER_FIELDS)
+        ):
+            self.forget_api_key(self.api_key_prefix)
+    
+    def set_api_key(self):
+        """Generate an API key, store its prefix and hash, and return the plain key."""
+        key = generate_api_key()
+        self.api_key_prefix = lookup_prefix(key)
+        self.api_key_hash = hash_api_key(key)
+        self.api_key_created_at = timezone.now()
+        return key
+    
+    def rotate_api_key(self):
+        """Replace the API key and return the new plain key; the old key stops working."""
+        previous_prefix = self.api_key_prefix
+        key = self.set_api_key()
+        self.save(update_fields=self.API_KEY_FIELDS + ['updated_at'])
+        if previous_prefix:
+            self.forget_api_key(previous_prefix)
+        return key
+    
+    def revoke_api_key(self):
+        """Remove the API key so no key authenticates as this developer."""
+        previous_prefix = self.api_key_prefix
+        self.api_key_prefix = None
+        self.api_key_hash = ''
+        self.api_key_created_at = None
+        self.save(update_fields=self.API_KEY_FIELDS + ['updated_at'])
+        if previous_prefix:
+            self.forget_api_key(previous_prefix)
+    
+    def forget_api_key(self, prefix):
+        """Invalidate cached lookups of a key now and again once the transaction commits."""
+        invalidate_api_key(prefix)
+        transaction.on_commit(lambda: invalidate_api_key(prefix))
+    
+    def get_current_usage(self, now=None):
+        """Get the usage of the current billing month; zero if none was charged yet."""
+        return usage_in_period(self.current_month_usage, self.usage_period, billing_period(now))
     
     def is_quota_available(self, requested_calls=1):
         """Check if developer has quota available."""
-        return (self.current_month_usage + requested_calls) <= self.monthly_quota_limit
+        return (self.get_current_usage() + requested_calls) <= self.monthly_quota_limit
+    
+    def consume_quota(self, calls=1):
+        """Charge calls against the quota atomically; return False if it is exhausted."""
+        usage = charge_usage(self.pk, calls)
+        if usage is None:
+            return False
+        self.current_month_usage = usage
+        self.usage_period = billing_period()
+        return True
     
     def increment_usage(self, calls=1):
         """Increment API usage count."""
-        self.current_month_usage += calls
-        self.save(update_fields=['current_month_usage'])
+        usage = charge_usage(self.pk, calls, enforce_limit=False)
+        if usage is None:
+            raise Developer.DoesNotExist(f"Developer {self.pk} no longer exists.")
+        self.current_month_usage = usage
+        self.usage_period = billing_period()
     
     def reset_monthly_usage(self):
         """Reset monthly usage counter."""
         self.current_month_usage = 0
-        self.save(update_fields=['current_month_usage'])
+        self.usage_period = billing_period()
+        self.save(update_fields=['current_month_usage', 'usage_period', 'updated_at'])
     
     def add_revenue(self, amount):
         """Add revenue to developer's total."""
         self.total_revenue += amount
-        self.save(update_fields=['total_revenue'])
+        self.save(update_fields=['total_revenue', 'updated_at'])
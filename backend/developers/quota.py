@@ -0,0 +1,178 @@
+"""
+Atomic monthly quota accounting for developers.
+"""
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from core.cache import TTLCache
+from core.timebuckets import TimeBuckets
+
+# Usage within the billing period being charged; a row last charged in an
+# earlier period starts again from zero, and rows never charged keep their count
+PERIOD_USAGE_SQL = (
+    "CASE WHEN COALESCE(usage_period, %s) = %s THEN current_month_usage ELSE 0 END"
+)
+
+
+def billing_period(now=None):
+    """Get the first day of the billing month containing now, in the default time zone."""
+    return TimeBuckets.current('month', now=now).start.date()
+
+
+def usage_in_period(usage, usage_period, period):
+    """Get a stored usage count as seen from a billing period."""
+    if usage_period is None or usage_period == period:
+        return usage
+    return 0
+
+
+def developer_table():
+    """Get the quoted developers table name."""
+    # Import here to avoid circular imports
+    from .models import Developer
+    return connection.ops.quote_name(Developer._meta.db_table)
+
+
+def charge_usage(developer_id, calls=1, enforce_limit=True, now=None):
+    """
+    Add calls to a developer's usage in one conditional UPDATE.
+    
+    The month rolls over in the same statement: usage recorded for an
+    earlier billing period is replaced rather than added to. With
+    ``enforce_limit`` the row is only updated if the new usage stays within
+    ``monthly_quota_limit``, so concurrent charges can never overshoot it.
+    Returns the new usage, or None if the limit would be exceeded (or the
+    developer does not exist).
+    """
+    now = now or timezone.now()
+    period = billing_period(now)
+    condition = f" AND {PERIOD_USAGE_SQL} + %s <= monthly_quota_limit" if enforce_limit else ""
+    condition_params = [period, period, calls] if enforce_limit else []
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {developer_table()} "
+            f"SET current_month_usage = {PERIOD_USAGE_SQL} + %s, usage_period = %s, updated_at = %s "
+            f"WHERE id = %s{condition} RETURNING current_month_usage",
+            [period, period, calls, period, now, developer_id] + condition_params
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def refund_usage(developer_id, calls, period):
+    """Give back calls charged in a billing period, if it is still the current one."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {developer_table()} "
+            "SET current_month_usage = GREATEST(current_month_usage - %s, 0), updated_at = %s "
+            "WHERE id = %s AND usage_period = %s",
+            [calls, timezone.now(), developer_id, period]
+        )
+
+
+class QuotaReservations:
+    """
+    Blocks of quota reserved in the database and spent in process for
+    developers making frequent calls.
+    
+    A developer's first call in a window is charged exactly. Once it calls
+    again within ``ttl`` seconds, a block of ``block_size`` calls is charged
+    with the same conditional UPDATE and later calls are served from the
+    block without a query. Blocks are never larger than the remaining quota,
+    so the limit still holds across processes; near the limit calls are
+    charged one by one. Unspent calls of blocks older than ``ttl`` are
+    refunded on the next reconciliation, which runs at most once per
+    ``ttl``. A process that stops with a block open leaves at most
+    ``block_size`` calls over-counted until the month rolls over.
+    """
+    
+    def __init__(self, block_size, ttl):
+        self.block_size = block_size
+        self.ttl = ttl
+        self.recent_callers = TTLCache(ttl=ttl, maxsize=10000)
+        self.blocks = {}
+        self.lock = threading.Lock()
+        self.next_reconcile = time.monotonic() + ttl
+    
+    def consume(self, developer_id, calls=1, now=None):
+        """Spend calls of a developer's quota; return False if it is exhausted."""
+        now = now or timezone.now()
+        period = billing_period(now)
+        self.maybe_reconcile()
+        
+        # Served from a block reserved earlier in this process
+        with self.lock:
+            block = self.blocks.get(developer_id)
+            if block and block['period'] == period and block['remaining'] >= calls:
+                block['remaining'] -= calls
+                return True
+        
+        # Reserve a block for developers seen recently, otherwise charge exactly
+        hot = self.recent_callers.get(developer_id) is not None
+        self.recent_callers.set(developer_id, True)
+        reserved = max(self.block_size, calls) if hot else calls
+        if reserved > calls and charge_usage(developer_id, reserved, now=now) is not None:
+            self.add_block(developer_id, period, reserved - calls)
+            return True
+        return charge_usage(developer_id, calls, now=now) is not None
+    
+    def add_block(self, developer_id, period, remaining):
+        """Keep unspent reserved calls, merging with or replacing an earlier block."""
+        stale = None
+        with self.lock:
+            block = self.blocks.get(developer_id)
+            if block and block['period'] == period:
+                block['remaining'] += remaining
+                block['reserved_at'] = time.monotonic()
+            else:
+                stale = block
+                self.blocks[developer_id] = {
+                    'period': period, 'remaining': remaining, 'reserved_at': time.monotonic()
+                }
+        if stale and stale['remaining']:
+            refund_usage(developer_id, stale['remaining'], stale['period'])
+    
+    def maybe_reconcile(self):
+        """Reconcile if a ttl has passed since the last reconciliation."""
+        if time.monotonic() >= self.next_reconcile:
+            self.reconcile()
+    
+    def reconcile(self, force=False):
+        """Refund the unspent calls of expired blocks (of every block with force)."""
+        now = time.monotonic()
+        with self.lock:
+            self.next_reconcile = now + self.ttl
+            expired = [
+                (developer_id, self.blocks.pop(developer_id))
+                for developer_id, block in list(self.blocks.items())
+                if force or block['reserved_at'] + self.ttl <= now
+            ]
+        for developer_id, block in expired:
+            if block['remaining']:
+                refund_usage(developer_id, block['remaining'], block['period'])
+    
+    def clear(self):
+        """Drop every block and recent caller without refunding."""
+        with self.lock:
+            self.blocks.clear()
+        self.recent_callers.clear()
+
+
+# Reservations are off unless QUOTA_RESERVATION_SIZE is above one call
+reservations = QuotaReservations(
+    block_size=getattr(settings, 'QUOTA_RESERVATION_SIZE', 0),
+    ttl=getattr(settings, 'QUOTA_RESERVATION_TIMEOUT', 5)
+)
+
+
+def consume_quota(developer_id, calls=1):
+    """
+    Spend calls of a developer's monthly quota; return False if it is
+    exhausted. Uses the reservation cache when it is enabled.
+    """
+    if reservations.block_size > 1:
+        return reservations.consume(developer_id, calls)
+    return charge_usage(developer_id, calls) is not None
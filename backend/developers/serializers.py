@@ -2,6 +2,8 @@
 Developer serializers for API endpoints.
 """
 from rest_framework import serializers
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from .models import Developer
 from users.serializers import UserSerializer
 
@@ -29,6 +31,7 @@ class DeveloperSerializer(serializers.ModelSerializer):
     Serializer for developer details.
     """
     user = UserSerializer(read_only=True)
+    current_month_usage = serializers.IntegerField(source='get_current_usage', read_only=True)
     quota_percentage = serializers.SerializerMethodField()
     
     class Meta:
@@ -42,7 +45,7 @@ class DeveloperSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = [
             'id', 'user', 'status', 'is_verified', 'verification_date',
-            'api_key', 'current_month_usage', 'total_revenue',
+            'current_month_usage', 'total_revenue',
             'created_at', 'updated_at'
         ]
     
@@ -50,7 +53,33 @@ class DeveloperSerializer(serializers.ModelSerializer):
         """Calculate quota usage percentage."""
         if obj.monthly_quota_limit == 0:
             return 0
-        return (obj.current_month_usage / obj.monthly_quota_limit) * 100
+        return (obj.get_current_usage() / obj.monthly_quota_limit) * 100
+
+
+def annotate_developer_summaries(queryset):
+    """
+    Annotate active model counts and request totals in the main query, so
+    DeveloperListSerializer doesn't query per developer.
+    """
+    from ai_models.models import AIModel
+    
+    # Correlated subqueries avoid fanning out developer rows over models
+    developer_models = AIModel.objects.filter(developer=OuterRef('pk')).order_by().values('developer')
+    
+    return queryset.annotate(
+        active_model_count=Coalesce(
+            Subquery(
+                developer_models.filter(status='active').annotate(count=Count('pk')).values('count')
+            ),
+            0
+        ),
+        total_model_requests=Coalesce(
+            Subquery(
+                developer_models.annotate(total=Sum('total_requests')).values('total')
+            ),
+            0
+        )
+    )
 
 
 class DeveloperListSerializer(serializers.ModelSerializer):
@@ -60,18 +89,29 @@ class DeveloperListSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     user_email = serializers.EmailField(source='user.email', read_only=True)
     model_count = serializers.SerializerMethodField()
+    total_requests = serializers.SerializerMethodField()
     
     class Meta:
         model = Developer
         fields = [
             'id', 'developer_name', 'company_name', 'website_url',
             'specialization', 'bio', 'years_experience',
-            'is_verified', 'user_name', 'user_email', 'model_count', 'created_at'
+            'is_verified', 'user_name', 'user_email', 'model_count',
+            'total_requests', 'total_revenue', 'created_at'
         ]
     
     def get_model_count(self, obj):
         """Get number of models by developer."""
+        # Use the annotation from annotate_developer_summaries() when present
+        if hasattr(obj, 'active_model_count'):
+            return obj.active_model_count
         return obj.models.filter(status='active').count()
+    
+    def get_total_requests(self, obj):
+        """Get total requests served across the developer's models."""
+        if hasattr(obj, 'total_model_requests'):
+            return obj.total_model_requests
+        return obj.models.aggregate(total=Sum('total_requests'))['total'] or 0
 
 
 class DeveloperUpdateSerializer(serializers.ModelSerializer):
@@ -1,3 +1,270 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from ai_models.models import AIModel
+from core.testing import create_developer, create_model, create_user
+from .api_keys import local_keys
+from .authentication import APIKeyAuthentication
+from .models import Developer
+from .quota import QuotaReservations, billing_period, charge_usage, refund_usage
 
-# Create your tests here.
+
+class DeveloperListQueryCountTests(TestCase):
+    """
+    The developer list must not query per developer.
+    """
+    
+    def setUp(self):
+        self.client = APIClient()
+    
+    def create_developer(self, index, active_models=2, inactive_models=1):
+        developer = create_developer(f'developer{index}')
+        statuses = ['active'] * active_models + ['inactive'] * inactive_models
+        AIModel.objects.bulk_create([
+            AIModel(
+                developer=developer,
+                name=f'Model {index}-{position}',
+                description='Test model',
+                category='nlp',
+                api_name=f'model-{index}-{position}',
+                api_endpoint='https://example.com/api',
+                status=model_status,
+                total_requests=10
+            )
+            for position, model_status in enumerate(statuses)
+        ])
+        return developer
+    
+    def test_list_page_of_100_developers_uses_constant_queries(self):
+        for index in range(100):
+            self.create_developer(index)
+        
+        # Page count query plus the annotated page query
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/developers/?page_size=100')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 100)
+        for item in response.data['results']:
+            self.assertEqual(item['model_count'], 2)
+            self.assertEqual(item['total_requests'], 30)
+    
+    def test_developer_without_models_has_zero_summaries(self):
+        self.create_developer(0, active_models=0, inactive_models=0)
+        
+        response = self.client.get('/api/v1/developers/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['model_count'], 0)
+        self.assertEqual(response.data['results'][0]['total_requests'], 0)
+
+
+class APIKeyAuthenticationTests(TestCase):
+    """
+    API keys must authenticate from cache and stop working once rotated or revoked.
+    """
+    
+    def setUp(self):
+        cache.clear()
+        local_keys.clear()
+        self.developer = create_developer()
+        self.api_key = self.developer.issued_api_key
+    
+    def authenticate(self, api_key):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Api-Key {api_key}')
+        return APIKeyAuthentication().authenticate(request)
+    
+    def test_key_is_stored_hashed(self):
+        stored = Developer.objects.get(pk=self.developer.pk)
+        self.assertTrue(self.api_key.startswith(f'dev_{stored.api_key_prefix}'))
+        self.assertNotIn(self.api_key, [stored.api_key_prefix, stored.api_key_hash])
+    
+    def test_cached_key_costs_no_queries(self):
+        with self.assertNumQueries(1):
+            user, developer = self.authenticate(self.api_key)
+        
+        with self.assertNumQueries(0):
+            user, developer = self.authenticate(self.api_key)
+        
+        self.assertEqual(developer.pk, self.developer.pk)
+        self.assertEqual(user.pk, self.developer.user_id)
+    
+    def test_rotated_and_revoked_keys_are_rejected(self):
+        self.authenticate(self.api_key)
+        
+        new_key = self.developer.rotate_api_key()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.api_key)
+        self.assertEqual(self.authenticate(new_key)[1].pk, self.developer.pk)
+        
+        self.developer.revoke_api_key()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(new_key)
+    
+    def test_suspended_developer_is_rejected(self):
+        self.authenticate(self.api_key)
+        
+        self.developer.status = 'suspended'
+        self.developer.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.api_key)
+    
+    def test_rotate_endpoint_returns_working_key(self):
+        client = APIClient()
+        client.credentials(HTTP_X_API_KEY=self.api_key)
+        
+        response = client.post(f'/api/v1/developers/{self.developer.pk}/rotate_api_key/')
+        self.assertEqual(response.status_code, 200)
+        
+        client.credentials(HTTP_X_API_KEY=response.data['api_key'])
+        response = client.post(f'/api/v1/developers/{self.developer.pk}/revoke_api_key/')
+        self.assertEqual(response.status_code, 200)
+        
+        response = client.post(f'/api/v1/developers/{self.developer.pk}/revoke_api_key/')
+        self.assertEqual(response.status_code, 401)
+
+
+class QuotaTests(TestCase):
+    """
+    Quota charges must be atomic, stop at the limit and roll over by billing month.
+    """
+    
+    def setUp(self):
+        cache.clear()
+        local_keys.clear()
+        self.developer = create_developer(status='active', monthly_quota_limit=3)
+    
+    def usage(self):
+        return Developer.objects.values_list('current_month_usage', flat=True).get(pk=self.developer.pk)
+    
+    def test_charges_stop_at_the_limit(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.developer.consume_quota())
+        self.assertTrue(self.developer.consume_quota(2))
+        self.assertFalse(self.developer.consume_quota())
+        
+        self.assertEqual(self.usage(), 3)
+        self.assertFalse(self.developer.is_quota_available())
+    
+    def test_usage_rolls_over_with_the_billing_month(self):
+        last_month = billing_period(timezone.now() - timedelta(days=40))
+        Developer.objects.filter(pk=self.developer.pk).update(current_month_usage=3, usage_period=last_month)
+        
+        developer = Developer.objects.get(pk=self.developer.pk)
+        self.assertEqual(developer.get_current_usage(), 0)
+        self.assertTrue(developer.consume_quota())
+        self.assertEqual(self.usage(), 1)
+        self.assertEqual(developer.usage_period, billing_period())
+    
+    def test_reservations_serve_hot_developers_from_memory(self):
+        Developer.objects.filter(pk=self.developer.pk).update(monthly_quota_limit=100)
+        reservations = QuotaReservations(block_size=10, ttl=60)
+        
+        self.assertTrue(reservations.consume(self.developer.pk))
+        self.assertTrue(reservations.consume(self.developer.pk))
+        self.assertEqual(self.usage(), 11)
+        with self.assertNumQueries(0):
+            for _ in range(9):
+                self.assertTrue(reservations.consume(self.developer.pk))
+        
+        self.assertTrue(reservations.consume(self.developer.pk))
+        reservations.reconcile(force=True)
+        self.assertEqual(self.usage(), 12)
+    
+    def test_reservations_fall_back_to_exact_charges_near_the_limit(self):
+        reservations = QuotaReservations(block_size=10, ttl=60)
+        
+        results = [reservations.consume(self.developer.pk) for _ in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(self.usage(), 3)
+    
+    def test_full_saves_keep_charged_usage(self):
+        developer = Developer.objects.get(pk=self.developer.pk)
+        charge_usage(self.developer.pk, 2)
+        
+        developer.developer_name = 'Renamed'
+        developer.save()
+        self.assertEqual(self.usage(), 2)
+        self.assertEqual(Developer.objects.get(pk=self.developer.pk).developer_name, 'Renamed')
+        
+        # The update endpoint saves the whole developer too
+        client = APIClient()
+        client.force_authenticate(create_user('admin', is_staff=True))
+        charge_usage(self.developer.pk)
+        response = client.patch(
+            f'/api/v1/developers/{self.developer.pk}/', {'company_name': 'Acme'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.usage(), 3)
+    
+    def test_increment_usage_of_a_deleted_developer_raises(self):
+        developer = Developer.objects.get(pk=self.developer.pk)
+        developer.increment_usage()
+        self.assertEqual(developer.current_month_usage, 1)
+        
+        Developer.objects.filter(pk=developer.pk).delete()
+        with self.assertRaises(Developer.DoesNotExist):
+            developer.increment_usage()
+        self.assertEqual(developer.current_month_usage, 1)
+    
+    def test_refunds_bump_updated_at(self):
+        charge_usage(self.developer.pk, 3)
+        charged_at = Developer.objects.values_list('updated_at', flat=True).get(pk=self.developer.pk)
+        
+        refund_usage(self.developer.pk, 2, billing_period())
+        developer = Developer.objects.get(pk=self.developer.pk)
+        self.assertEqual(developer.current_month_usage, 1)
+        self.assertGreater(developer.updated_at, charged_at)
+    
+    def test_api_key_calls_are_throttled_past_the_quota(self):
+        client = APIClient()
+        client.credentials(HTTP_X_API_KEY=self.developer.issued_api_key)
+        model = create_model(
+            self.developer,
+            name='Quota Model',
+            api_name='quota-model'
+        )
+        log = {
+            'model': str(model.pk),
+            'request_method': 'POST',
+            'request_path': '/api/v1/predict/',
+            'response_status_code': 200,
+            'processing_time_ms': 10,
+            'ip_address': '127.0.0.1'
+        }
+        
+        for _ in range(3):
+            self.assertEqual(client.post('/api/v1/logs/usage/', log, format='json').status_code, 201)
+        self.assertEqual(client.post('/api/v1/logs/usage/', log, format='json').status_code, 429)
+        self.assertEqual(self.usage(), 3)
+
+
+class ConcurrentQuotaTests(TransactionTestCase):
+    """
+    Concurrent charges must never push usage past the limit.
+    """
+    
+    def test_concurrent_charges_respect_the_limit(self):
+        developer = create_developer(monthly_quota_limit=10)
+        results = []
+        
+        def charge():
+            try:
+                results.append(charge_usage(developer.pk) is not None)
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=charge) for _ in range(25)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results.count(True), 10)
+        developer.refresh_from_db()
+        self.assertEqual(developer.current_month_usage, 10)
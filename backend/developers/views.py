@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django.db.models import Count, Avg, Sum
 from drf_spectacular.utils import extend_schema
+from core.mixins import ConditionalGetMixin
+from core.timebuckets import TimeBuckets
 from core.permissions import IsOwnerOrAdmin, IsDeveloperOrAdmin, IsOwnerDeveloperOrAdmin
 from .models import Developer
 from .serializers import (
@@ -14,21 +16,38 @@ from .serializers import (
     DeveloperRegistrationSerializer,
     DeveloperUpdateSerializer,
     DeveloperListSerializer,
-    DeveloperStatsSerializer
+    DeveloperStatsSerializer,
+    annotate_developer_summaries
 )
 
 
-class DeveloperViewSet(ModelViewSet):
+class DeveloperViewSet(ConditionalGetMixin, ModelViewSet):
     """
     ViewSet for managing developers.
     """
     queryset = Developer.objects.select_related('user').all()
+    # The list payload carries per-developer model counts, which the
+    # developer's own timestamps don't track, so only retrieve is conditional
+    conditional_actions = ['retrieve']
+    conditional_timestamp_fields = ['updated_at', 'user__updated_at']
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['developer_name', 'company_name', 'specialization']
     ordering_fields = ['developer_name', 'created_at', 'total_revenue', 'is_verified']
     ordering = ['-created_at']
     
+    def get_conditional_state(self):
+        """Count the start of the billing period as a change of the payload."""
+        row_count, last_modified = super().get_conditional_state()
+        
+        # current_month_usage reads as 0 once the month rolls over, without
+        # any write to the row, so a new period must change the validators
+        period_start = TimeBuckets.current('month').start
+        if last_modified is None or last_modified < period_start:
+            last_modified = period_start
+        
+        return row_count, last_modified
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return DeveloperRegistrationSerializer
@@ -46,6 +65,8 @@ class DeveloperViewSet(ModelViewSet):
             permission_classes = [permissions.IsAuthenticated, IsOwnerDeveloperOrAdmin]
         elif self.action in ['retrieve', 'list']:
             permission_classes = [permissions.AllowAny]
+        elif self.action in ['rotate_api_key', 'revoke_api_key']:
+            permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
         else:
             permission_classes = [permissions.IsAuthenticated, IsOwnerDeveloperOrAdmin]
         
@@ -74,6 +95,10 @@ class DeveloperViewSet(ModelViewSet):
         if not self.request.user.is_staff and self.action in ['update', 'partial_update', 'destroy']:
             queryset = queryset.filter(user=self.request.user)
         
+        # Compute list summaries in the main query
+        if self.action == 'list':
+            queryset = annotate_developer_summaries(queryset)
+        
         return queryset
     
     def create(self, request, *args, **kwargs):
@@ -116,16 +141,17 @@ class DeveloperViewSet(ModelViewSet):
             model__developer=developer
         ).aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
         
+        current_usage = developer.get_current_usage()
         stats_data = {
             'total_models': total_models,
             'active_models': active_models,
             'total_interactions': total_interactions,
             'total_revenue': float(developer.total_revenue),
             'avg_model_rating': round(avg_rating, 2),
-            'current_month_usage': developer.current_month_usage,
+            'current_month_usage': current_usage,
             'quota_limit': developer.monthly_quota_limit,
             'quota_percentage': round(
-                (developer.current_month_usage / developer.monthly_quota_limit) * 100, 2
+                (current_usage / developer.monthly_quota_limit) * 100, 2
             ) if developer.monthly_quota_limit > 0 else 0
         }
         
@@ -188,6 +214,37 @@ class DeveloperViewSet(ModelViewSet):
         return Response({
             'message': 'Developer verified successfully'
         })
+    
+    @extend_schema(
+        summary="Rotate API key",
+        description="Issue a new API key; the previous key stops working immediately"
+    )
+    @action(detail=True, methods=['post'])
+    def rotate_api_key(self, request, pk=None):
+        """Rotate the developer's API key."""
+        developer = self.get_object()
+        api_key = developer.rotate_api_key()
+        
+        # The plain key is only ever returned here
+        return Response({
+            'message': 'API key rotated successfully',
+            'api_key': api_key,
+            'api_key_prefix': developer.api_key_prefix
+        })
+    
+    @extend_schema(
+        summary="Revoke API key",
+        description="Revoke the developer's API key without issuing a new one"
+    )
+    @action(detail=True, methods=['post'])
+    def revoke_api_key(self, request, pk=None):
+        """Revoke the developer's API key."""
+        developer = self.get_object()
+        developer.revoke_api_key()
+        
+        return Response({
+            'message': 'API key revoked successfully'
+        })
 
 
 class DeveloperRegistrationView(generics.CreateAPIView):
@@ -216,7 +273,8 @@ class DeveloperRegistrationView(generics.CreateAPIView):
             return Response(
                 {
                     'message': 'Developer profile created successfully',
-                    'developer': DeveloperSerializer(developer).data
+                    'developer': DeveloperSerializer(developer).data,
+                    'api_key': developer.issued_api_key
                 },
                 status=status.HTTP_201_CREATED
             )
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelReview',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('rating', models.PositiveIntegerField(help_text='Rating from 1-5 stars', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('review_title', models.CharField(max_length=200)),
+                ('review_text', models.TextField()),
+                ('is_verified_user', models.BooleanField(default=False)),
+                ('is_approved', models.BooleanField(default=True)),
+                ('helpful_votes', models.PositiveIntegerField(default=0)),
+                ('total_votes', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Model Review',
+                'verbose_name_plural': 'Model Reviews',
+                'db_table': 'model_reviews',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewVote',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('vote_type', models.CharField(choices=[('helpful', 'Helpful'), ('not_helpful', 'Not Helpful')], max_length=20)),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='reviews.modelreview')),
+            ],
+            options={
+                'verbose_name': 'Review Vote',
+                'verbose_name_plural': 'Review Votes',
+                'db_table': 'review_votes',
+            },
+        ),
+    ]
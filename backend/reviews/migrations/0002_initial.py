@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+        ('ai_models', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewvote',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_votes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='modelreview',
+            name='model',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='ai_models.aimodel'),
+        ),
+        migrations.AddField(
+            model_name='modelreview',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='reviewvote',
+            index=models.Index(fields=['review'], name='review_vote_review__b8b80c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewvote',
+            index=models.Index(fields=['user'], name='review_vote_user_id_3abe31_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewvote',
+            index=models.Index(fields=['vote_type'], name='review_vote_vote_ty_05cf19_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reviewvote',
+            unique_together={('review', 'user')},
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(fields=['model'], name='model_revie_model_i_ced875_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(fields=['user'], name='model_revie_user_id_4f4f8b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(fields=['rating'], name='model_revie_rating_e9b6ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(fields=['created_at'], name='model_revie_created_a24c57_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(fields=['is_approved'], name='model_revie_is_appr_da1066_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='modelreview',
+            unique_together={('model', 'user')},
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0003_rating_aggregates_and_catalog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='modelreview',
+            name='model_revie_model_i_ced875_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='modelreview',
+            name='model_revie_user_id_4f4f8b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='modelreview',
+            name='model_revie_rating_e9b6ec_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='modelreview',
+            name='model_revie_created_a24c57_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='modelreview',
+            name='model_revie_is_appr_da1066_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reviewvote',
+            name='review_vote_review__b8b80c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reviewvote',
+            name='review_vote_user_id_3abe31_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reviewvote',
+            name='review_vote_vote_ty_05cf19_idx',
+        ),
+        migrations.AlterField(
+            model_name='modelreview',
+            name='model',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='ai_models.aimodel'),
+        ),
+        migrations.AlterField(
+            model_name='modelreview',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='reviewvote',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='reviews.modelreview'),
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(fields=['user', 'created_at'], name='review_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['model', '-created_at'], name='review_model_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelreview',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-created_at'], name='review_approved_recent_idx'),
+        ),
+    ]
@@ -2,8 +2,9 @@
 Model Review models for the platform.
 """
 import uuid
-from django.db import models
+from django.db import models, connection, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from core.models import BaseModel
 from users.models import User
 
@@ -12,9 +13,14 @@ class ModelReview(BaseModel):
     """
     User reviews for AI models.
     """
+    # Fields that decide a review's contribution to the model's rating aggregates
+    RATING_FIELDS = ['rating', 'is_approved']
+    
     # Core relationships
-    model = models.ForeignKey('ai_models.AIModel', on_delete=models.CASCADE, related_name='reviews')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
+    model = models.ForeignKey(
+        'ai_models.AIModel', on_delete=models.CASCADE, related_name='reviews', db_index=False
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews', db_index=False)
     
     # Review content
     rating = models.PositiveIntegerField(
@@ -38,40 +44,86 @@ class ModelReview(BaseModel):
         verbose_name_plural = 'Model Reviews'
         unique_together = ['model', 'user']  # One review per user per model
         indexes = [
-            models.Index(fields=['model']),
-            models.Index(fields=['user']),
-            models.Index(fields=['rating']),
-            models.Index(fields=['created_at']),
-            models.Index(fields=['is_approved']),
+            models.Index(fields=['user', 'created_at'], name='review_user_created_idx'),
+            # Approved reviews only, as served by the public listings
+            models.Index(
+                fields=['model', '-created_at'],
+                condition=models.Q(is_approved=True),
+                name='review_model_approved_idx'
+            ),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(is_approved=True),
+                name='review_approved_recent_idx'
+            ),
         ]
         ordering = ['-created_at']
     
     def __str__(self):
         return f"{self.user.username} - {self.model.name} ({self.rating}★)"
     
+    @staticmethod
+    def rating_contribution(rating, is_approved):
+        """Rating a review with these values contributes to the model aggregates, if any."""
+        return rating if is_approved else None
+    
+    @property
+    def counted_rating(self):
+        """Rating this review contributes to the model aggregates, if any."""
+        return self.rating_contribution(self.rating, self.is_approved)
+    
+    def lock_stored_rating(self):
+        """Lock the stored review and return its {rating, is_approved}, or None if it isn't stored."""
+        return ModelReview.objects.select_for_update().filter(pk=self.pk).values(*self.RATING_FIELDS).first()
+    
     def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        
         # Set verification status based on user's interaction history
-        if not self.pk:  # Only on creation
-            from user_history.models import UserHistory
-            user_interactions = UserHistory.objects.filter(
-                user=self.user,
-                model=self.model,
-                response_status='success'
-            ).count()
+        if is_new:  # Only on creation
+            from user_history.models import UserModelUsage
+            successful_interactions = UserModelUsage.success_count_for(self.user, self.model)
             
             # User is verified if they have at least 3 successful interactions with the model
-            self.is_verified_user = user_interactions >= 3
+            self.is_verified_user = successful_interactions >= 3
         
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        rating_written = update_fields is None or bool(set(self.RATING_FIELDS) & set(update_fields))
         
-        # Update model's average rating
-        self.model.update_rating()
+        # The review and its rating aggregates are written together or not at all
+        with transaction.atomic():
+            # Lock the stored review so the delta is computed from its current rating
+            stored = self.lock_stored_rating() if rating_written and not is_new else None
+            
+            super().save(*args, **kwargs)
+            
+            if not rating_written:
+                return
+            
+            # Fields left out of update_fields keep their stored values
+            written = {
+                name: getattr(self, name) if stored is None or update_fields is None or name in update_fields
+                else stored[name]
+                for name in self.RATING_FIELDS
+            }
+            
+            # Update model's rating aggregates by delta
+            self.model.apply_rating_change(
+                self.rating_contribution(**stored) if stored else None,
+                self.rating_contribution(**written)
+            )
     
     def delete(self, *args, **kwargs):
         model = self.model
-        super().delete(*args, **kwargs)
-        # Update model's average rating after deletion
-        model.update_rating()
+        with transaction.atomic():
+            stored = self.lock_stored_rating()
+            result = super().delete(*args, **kwargs)
+            
+            # Remove this review's contribution from the model's aggregates unless it was already gone
+            if stored is not None:
+                model.apply_rating_change(self.rating_contribution(**stored), None)
+        
+        return result
     
     @property
     def helpfulness_ratio(self):
@@ -82,10 +134,31 @@ class ModelReview(BaseModel):
     
     def vote_helpful(self, is_helpful=True):
         """Add a vote for helpfulness."""
-        if is_helpful:
-            self.helpful_votes += 1
-        self.total_votes += 1
-        self.save(update_fields=['helpful_votes', 'total_votes'])
+        return self.apply_vote_delta(1 if is_helpful else 0, 1)
+    
+    def apply_vote_delta(self, helpful_delta, total_delta):
+        """
+        Adjust the vote counters by delta in a single UPDATE and return the
+        fresh (helpful_votes, total_votes) read back via RETURNING.
+        """
+        if helpful_delta or total_delta:
+            table = connection.ops.quote_name(self._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} "
+                    "SET helpful_votes = helpful_votes + %s, "
+                    "total_votes = total_votes + %s, updated_at = %s "
+                    "WHERE id = %s RETURNING helpful_votes, total_votes",
+                    [helpful_delta, total_delta, timezone.now(), self.pk]
+                )
+                counts = cursor.fetchone()
+        else:
+            counts = ModelReview.objects.filter(pk=self.pk).values_list(
+                'helpful_votes', 'total_votes'
+            ).get()
+        
+        self.helpful_votes, self.total_votes = counts
+        return counts
 
 
 class ReviewVote(BaseModel):
@@ -97,7 +170,7 @@ class ReviewVote(BaseModel):
         ('not_helpful', 'Not Helpful'),
     ]
     
-    review = models.ForeignKey(ModelReview, on_delete=models.CASCADE, related_name='votes')
+    review = models.ForeignKey(ModelReview, on_delete=models.CASCADE, related_name='votes', db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='review_votes')
     vote_type = models.CharField(max_length=20, choices=VOTE_CHOICES)
     
@@ -106,49 +179,103 @@ class ReviewVote(BaseModel):
         verbose_name = 'Review Vote'
         verbose_name_plural = 'Review Votes'
         unique_together = ['review', 'user']  # One vote per user per review
-        indexes = [
-            models.Index(fields=['review']),
-            models.Index(fields=['user']),
-            models.Index(fields=['vote_type']),
-        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.review.review_title} ({self.vote_type})"
     
-    def save(self, *args, **kwargs):
-        is_new = not self.pk
-        was_helpful = None
+    @staticmethod
+    def count_deltas(previous_type, new_type):
+        """Get (helpful_delta, total_delta) for a vote changing type."""
+        helpful_delta = int(new_type == 'helpful') - int(previous_type == 'helpful')
+        total_delta = int(new_type is not None) - int(previous_type is not None)
+        return helpful_delta, total_delta
+    
+    @classmethod
+    def cast(cls, review, user, vote_type):
+        """
+        Record (or change) a user's vote on a review.
         
-        if not is_new:
-            # Get old vote before saving
-            old_vote = ReviewVote.objects.get(pk=self.pk)
-            was_helpful = old_vote.vote_type == 'helpful'
+        The vote is upserted on (review, user) and the review counters are
+        adjusted by delta in the same transaction, so concurrent votes never
+        lose counts. Returns the fresh (helpful_votes, total_votes).
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = timezone.now()
         
-        super().save(*args, **kwargs)
+        with transaction.atomic(), connection.cursor() as cursor:
+            while True:
+                # Exactly one concurrent insert for (review, user) can win
+                cursor.execute(
+                    f"INSERT INTO {table} (id, review_id, user_id, vote_type, created_at, updated_at) "
+                    "VALUES (%s, %s, %s, %s, %s, %s) "
+                    "ON CONFLICT (review_id, user_id) DO NOTHING RETURNING id",
+                    [uuid.uuid4(), review.pk, user.pk, vote_type, now, now]
+                )
+                if cursor.fetchone():
+                    previous_type = None
+                    break
+                
+                # Lock the existing vote and swap its type, reading the old one
+                cursor.execute(
+                    f"UPDATE {table} AS vote SET vote_type = %s, updated_at = %s "
+                    f"FROM (SELECT id, vote_type FROM {table} "
+                    "WHERE review_id = %s AND user_id = %s FOR UPDATE) AS previous "
+                    "WHERE vote.id = previous.id RETURNING previous.vote_type",
+                    [vote_type, now, review.pk, user.pk]
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    previous_type = row[0]
+                    break
+                # A concurrent retract deleted the vote after the insert conflicted, so insert again
+            
+            return review.apply_vote_delta(*cls.count_deltas(previous_type, vote_type))
+    
+    @classmethod
+    def retract(cls, review, user):
+        """
+        Remove a user's vote on a review.
         
-        # Update review vote counts
-        if is_new:
-            # New vote
-            if self.vote_type == 'helpful':
-                self.review.helpful_votes += 1
-            self.review.total_votes += 1
-        else:
-            # Changed vote
-            if was_helpful and self.vote_type == 'not_helpful':
-                self.review.helpful_votes -= 1
-            elif not was_helpful and self.vote_type == 'helpful':
-                self.review.helpful_votes += 1
+        Returns the fresh (helpful_votes, total_votes), or None if the user
+        had not voted.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
         
-        self.review.save(update_fields=['helpful_votes', 'total_votes'])
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE review_id = %s AND user_id = %s RETURNING vote_type",
+                [review.pk, user.pk]
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            
+            return review.apply_vote_delta(*cls.count_deltas(row[0], None))
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous_type = None
+            if not self._state.adding:
+                # Lock the stored vote so the delta is computed from its current type
+                previous_type = ReviewVote.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('vote_type', flat=True).first()
+            
+            super().save(*args, **kwargs)
+            
+            # Update review vote counts
+            self.review.apply_vote_delta(*self.count_deltas(previous_type, self.vote_type))
     
     def delete(self, *args, **kwargs):
-        review = self.review
-        was_helpful = self.vote_type == 'helpful'
-        
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            previous_type = ReviewVote.objects.select_for_update().filter(
+                pk=self.pk
+            ).values_list('vote_type', flat=True).first()
+            
+            result = super().delete(*args, **kwargs)
+            
+            # Update review vote counts unless the vote was already gone
+            if previous_type is not None:
+                self.review.apply_vote_delta(*self.count_deltas(previous_type, None))
         
-        # Update review vote counts
-        if was_helpful:
-            review.helpful_votes -= 1
-        review.total_votes -= 1
-        review.save(update_fields=['helpful_votes', 'total_votes'])
+        return result
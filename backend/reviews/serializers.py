@@ -3,6 +3,7 @@ Review serializers for API endpoints.
 """
 from rest_framework import serializers
 from django.db import transaction
+from django.db.models import Prefetch
 from .models import ModelReview, ReviewVote
 from users.serializers import UserSerializer
 from ai_models.serializers import AIModelListSerializer
@@ -32,8 +33,8 @@ class ModelReviewCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You have already reviewed this model.")
         
         # Check if user has actually used the model
-        from user_history.models import UserHistory
-        if not UserHistory.objects.filter(user=user, model=model, response_status='success').exists():
+        from user_history.models import UserModelUsage
+        if not UserModelUsage.success_count_for(user, model):
             raise serializers.ValidationError("You must use the model before reviewing it.")
         
         return attrs
@@ -68,6 +69,11 @@ class ModelReviewSerializer(serializers.ModelSerializer):
         """Get current user's vote on this review."""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            # Use votes loaded by prefetch_user_votes() when available
+            if hasattr(obj, 'current_user_votes'):
+                votes = obj.current_user_votes
+                return votes[0].vote_type if votes else None
+            
             try:
                 vote = ReviewVote.objects.get(review=obj, user=request.user)
                 return vote.vote_type
@@ -76,6 +82,23 @@ class ModelReviewSerializer(serializers.ModelSerializer):
         return None
 
 
+def prefetch_user_votes(queryset, user):
+    """
+    Prefetch the given user's votes onto each review in one query, so
+    ModelReviewSerializer.get_user_vote doesn't query per review.
+    """
+    if not (user and user.is_authenticated):
+        return queryset
+    
+    return queryset.prefetch_related(
+        Prefetch(
+            'votes',
+            queryset=ReviewVote.objects.filter(user=user).only('id', 'review_id', 'vote_type'),
+            to_attr='current_user_votes'
+        )
+    )
+
+
 class ModelReviewListSerializer(serializers.ModelSerializer):
     """
     Serializer for model review list.
@@ -119,19 +142,9 @@ class ReviewVoteSerializer(serializers.ModelSerializer):
         review = validated_data['review']
         vote_type = validated_data['vote_type']
         
-        # Use get_or_create to handle existing votes
-        vote, created = ReviewVote.objects.get_or_create(
-            review=review,
-            user=user,
-            defaults={'vote_type': vote_type}
-        )
-        
-        if not created and vote.vote_type != vote_type:
-            # Update existing vote
-            vote.vote_type = vote_type
-            vote.save()
-        
-        return vote
+        # Upsert the vote and adjust the review counters atomically
+        ReviewVote.cast(review, user, vote_type)
+        return ReviewVote.objects.get(review=review, user=user)
     
     def validate(self, attrs):
         """Validate vote creation."""
@@ -1,3 +1,177 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from core.testing import create_developer, create_model, create_user
+from users.models import User
+from .models import ModelReview, ReviewVote
 
-# Create your tests here.
+
+class ModelReviewQueryCountTests(TestCase):
+    """
+    Review listings must not issue per-review queries.
+    """
+    
+    def setUp(self):
+        self.developer = create_developer()
+        self.model = create_model(self.developer)
+        self.voter = create_user('voter')
+        self.client = APIClient()
+    
+    def add_reviews(self, count):
+        """Create reviews on the model, each voted on by the voter."""
+        offset = ModelReview.objects.count()
+        for index in range(offset, offset + count):
+            author = create_user(f'author{index}')
+            review = ModelReview.objects.create(
+                model=self.model,
+                user=author,
+                rating=(index % 5) + 1,
+                review_title=f'Review {index}',
+                review_text='Review text'
+            )
+            ReviewVote.objects.bulk_create([
+                ReviewVote(review=review, user=self.voter, vote_type='helpful')
+            ])
+    
+    def count_queries(self, url):
+        # Authenticate a fresh instance so no relation cache carries over
+        self.client.force_authenticate(User.objects.get(pk=self.voter.pk))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+    
+    def test_model_reviews_query_count_is_constant(self):
+        url = f'/api/v1/models/{self.model.id}/reviews/'
+        
+        self.add_reviews(2)
+        small_count, response = self.count_queries(url)
+        self.assertEqual(response.data['count'], 2)
+        self.assertTrue(all(item['user_vote'] == 'helpful' for item in response.data['results']))
+        
+        self.add_reviews(8)
+        large_count, response = self.count_queries(url)
+        self.assertEqual(response.data['count'], 10)
+        self.assertEqual(small_count, large_count)
+    
+    def test_review_list_query_count_is_constant(self):
+        url = f'/api/v1/reviews/?model={self.model.id}'
+        
+        self.add_reviews(2)
+        small_count, _ = self.count_queries(url)
+        
+        self.add_reviews(8)
+        large_count, _ = self.count_queries(url)
+        self.assertEqual(small_count, large_count)
+
+
+class ReviewVoteCounterTests(TestCase):
+    """
+    Casting, changing and retracting votes must keep a review's
+    helpful_votes and total_votes equal to its stored votes.
+    """
+    
+    def setUp(self):
+        self.review = ModelReview.objects.create(
+            model=create_model(create_developer()),
+            user=create_user('author'),
+            rating=4,
+            review_title='Review',
+            review_text='Review text'
+        )
+        self.voter = create_user('voter')
+        self.other_voter = create_user('other')
+    
+    def assertCounts(self, helpful_votes, total_votes):
+        """Check the stored counters and that they match the stored votes."""
+        review = ModelReview.objects.get(pk=self.review.pk)
+        self.assertEqual((review.helpful_votes, review.total_votes), (helpful_votes, total_votes))
+        votes = ReviewVote.objects.filter(review=self.review)
+        self.assertEqual(votes.filter(vote_type='helpful').count(), helpful_votes)
+        self.assertEqual(votes.count(), total_votes)
+    
+    def test_first_vote(self):
+        self.assertEqual(ReviewVote.cast(self.review, self.voter, 'helpful'), (1, 1))
+        self.assertCounts(1, 1)
+        
+        self.assertEqual(ReviewVote.cast(self.review, self.other_voter, 'not_helpful'), (1, 2))
+        self.assertCounts(1, 2)
+    
+    def test_changed_vote(self):
+        ReviewVote.cast(self.review, self.voter, 'helpful')
+        
+        self.assertEqual(ReviewVote.cast(self.review, self.voter, 'not_helpful'), (0, 1))
+        self.assertCounts(0, 1)
+        
+        self.assertEqual(ReviewVote.cast(self.review, self.voter, 'helpful'), (1, 1))
+        self.assertCounts(1, 1)
+    
+    def test_same_vote_again_is_a_no_op(self):
+        ReviewVote.cast(self.review, self.voter, 'helpful')
+        
+        self.assertEqual(ReviewVote.cast(self.review, self.voter, 'helpful'), (1, 1))
+        self.assertCounts(1, 1)
+    
+    def test_retract(self):
+        ReviewVote.cast(self.review, self.voter, 'helpful')
+        ReviewVote.cast(self.review, self.other_voter, 'not_helpful')
+        
+        self.assertEqual(ReviewVote.retract(self.review, self.voter), (0, 1))
+        self.assertCounts(0, 1)
+        
+        # Retracting a vote that doesn't exist changes nothing
+        self.assertIsNone(ReviewVote.retract(self.review, self.voter))
+        self.assertCounts(0, 1)
+    
+    def test_vote_retracted_during_a_change_is_cast_again(self):
+        ReviewVote.cast(self.review, self.voter, 'helpful')
+        retracted = []
+        
+        def retract_before_update(execute, sql, params, many, context):
+            # Retract the vote between the conflicting INSERT and the UPDATE
+            if sql.startswith('UPDATE') and 'FOR UPDATE' in sql and not retracted:
+                retracted.append(ReviewVote.retract(self.review, self.voter))
+            return execute(sql, params, many, context)
+        
+        with connection.execute_wrapper(retract_before_update):
+            counts = ReviewVote.cast(self.review, self.voter, 'not_helpful')
+        
+        self.assertEqual(retracted, [(0, 0)])
+        self.assertEqual(counts, (0, 1))
+        self.assertCounts(0, 1)
+    
+    def test_model_save_and_delete(self):
+        vote = ReviewVote.objects.create(review=self.review, user=self.voter, vote_type='not_helpful')
+        self.assertCounts(0, 1)
+        
+        vote.vote_type = 'helpful'
+        vote.save()
+        self.assertCounts(1, 1)
+        
+        vote.delete()
+        self.assertCounts(0, 0)
+    
+    def test_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(self.voter)
+        url = f'/api/v1/reviews/{self.review.pk}/'
+        
+        response = client.post(f'{url}vote/', {'vote_type': 'helpful'}, format='json')
+        self.assertEqual((response.data['helpful_votes'], response.data['total_votes']), (1, 1))
+        
+        response = client.post(f'{url}vote/', {'vote_type': 'not_helpful'}, format='json')
+        self.assertEqual((response.data['helpful_votes'], response.data['total_votes']), (0, 1))
+        
+        response = client.delete(f'{url}remove_vote/')
+        self.assertEqual((response.data['helpful_votes'], response.data['total_votes']), (0, 0))
+        self.assertCounts(0, 0)
+        
+        self.assertEqual(client.delete(f'{url}remove_vote/').status_code, 400)
+    
+    def test_review_delete_removes_votes(self):
+        ReviewVote.cast(self.review, self.voter, 'helpful')
+        ReviewVote.cast(self.review, self.other_voter, 'not_helpful')
+        
+        self.review.delete()
+        self.assertFalse(ReviewVote.objects.exists())
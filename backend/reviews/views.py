@@ -9,6 +9,7 @@ from django.db.models import Count, Avg, Q
 from django.utils import timezone
 from datetime import timedelta
 from drf_spectacular.utils import extend_schema
+from core.mixins import ConditionalGetMixin
 from core.permissions import IsOwnerOrAdmin
 from .models import ModelReview, ReviewVote
 from .serializers import (
@@ -16,17 +17,18 @@ from .serializers import (
     ModelReviewCreateSerializer,
     ModelReviewUpdateSerializer,
     ModelReviewListSerializer,
-    ReviewVoteSerializer,
     ReviewStatsSerializer,
-    UserReviewStatsSerializer
+    UserReviewStatsSerializer,
+    prefetch_user_votes
 )
 
 
-class ModelReviewViewSet(ModelViewSet):
+class ModelReviewViewSet(ConditionalGetMixin, ModelViewSet):
     """
     ViewSet for managing model reviews.
     """
-    queryset = ModelReview.objects.select_related('user', 'model').filter(is_approved=True)
+    queryset = ModelReview.objects.select_related('user', 'model__developer').filter(is_approved=True)
+    conditional_timestamp_fields = ['updated_at', 'user__updated_at', 'model__updated_at']
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['review_title', 'review_text']
     ordering_fields = ['created_at', 'rating', 'helpful_votes', 'total_votes']
@@ -100,6 +102,10 @@ class ModelReviewViewSet(ModelViewSet):
             self.action in ['update', 'partial_update', 'destroy']):
             queryset = queryset.filter(user=self.request.user)
         
+        # Load the current user's vote alongside the review
+        if self.action == 'retrieve':
+            queryset = prefetch_user_votes(queryset, self.request.user)
+        
         return queryset
     
     @extend_schema(
@@ -125,24 +131,15 @@ class ModelReviewViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create or update vote
-        data = {'review': review.id, 'vote_type': vote_type}
-        serializer = ReviewVoteSerializer(data=data, context={'request': request})
+        # Create or update vote; fresh counts come back from the counter update
+        helpful_votes, total_votes = ReviewVote.cast(review, request.user, vote_type)
         
-        if serializer.is_valid():
-            vote = serializer.save()
-            
-            # Refresh review to get updated vote counts
-            review.refresh_from_db()
-            
-            return Response({
-                'message': 'Vote recorded successfully',
-                'vote_type': vote.vote_type,
-                'helpful_votes': review.helpful_votes,
-                'total_votes': review.total_votes
-            })
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'message': 'Vote recorded successfully',
+            'vote_type': vote_type,
+            'helpful_votes': helpful_votes,
+            'total_votes': total_votes
+        })
     
     @extend_schema(
         summary="Remove vote from review",
@@ -153,24 +150,19 @@ class ModelReviewViewSet(ModelViewSet):
         """Remove vote from review."""
         review = self.get_object()
         
-        try:
-            vote = ReviewVote.objects.get(review=review, user=request.user)
-            vote.delete()
-            
-            # Refresh review to get updated vote counts
-            review.refresh_from_db()
-            
-            return Response({
-                'message': 'Vote removed successfully',
-                'helpful_votes': review.helpful_votes,
-                'total_votes': review.total_votes
-            })
-        
-        except ReviewVote.DoesNotExist:
+        counts = ReviewVote.retract(review, request.user)
+        if counts is None:
             return Response(
                 {'error': 'You have not voted on this review'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        helpful_votes, total_votes = counts
+        return Response({
+            'message': 'Vote removed successfully',
+            'helpful_votes': helpful_votes,
+            'total_votes': total_votes
+        })
 
 
 class ModelReviewStatsView(generics.RetrieveAPIView):
@@ -197,7 +189,8 @@ class ModelReviewStatsView(generics.RetrieveAPIView):
         
         reviews = ModelReview.objects.filter(model=model, is_approved=True)
         
-        if not reviews.exists():
+        # Totals and distribution come from the model's stored rating aggregates
+        if model.rating_count == 0:
             stats_data = {
                 'total_reviews': 0,
                 'average_rating': 0,
@@ -209,21 +202,22 @@ class ModelReviewStatsView(generics.RetrieveAPIView):
             }
         else:
             # Basic statistics
-            total_reviews = reviews.count()
-            average_rating = reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
-            
-            # Rating distribution
-            rating_dist = reviews.values('rating').annotate(count=Count('rating'))
-            rating_distribution = {str(i): 0 for i in range(1, 6)}
-            for item in rating_dist:
-                rating_distribution[str(item['rating'])] = item['count']
+            total_reviews = model.rating_count
+            average_rating = model.rating_sum / model.rating_count
+            rating_distribution = model.rating_distribution
             
-            # Verified reviews
-            verified_count = reviews.filter(is_verified_user=True).count()
+            # Verified and recent (last 30 days) reviews in one query
+            thirty_days_ago = timezone.now() - timedelta(days=30)
+            counts = reviews.aggregate(
+                verified_count=Count('id', filter=Q(is_verified_user=True)),
+                recent_count=Count('id', filter=Q(created_at__gte=thirty_days_ago))
+            )
+            verified_count = counts['verified_count']
             verified_percentage = (verified_count / total_reviews * 100) if total_reviews > 0 else 0
+            recent_count = counts['recent_count']
             
             # Most helpful review
-            most_helpful = reviews.filter(total_votes__gt=0).order_by(
+            most_helpful = reviews.select_related('user').filter(total_votes__gt=0).order_by(
                 '-helpful_votes', '-total_votes'
             ).first()
             
@@ -238,10 +232,6 @@ class ModelReviewStatsView(generics.RetrieveAPIView):
                     'user_name': most_helpful.user.get_full_name()
                 }
             
-            # Recent reviews (last 30 days)
-            thirty_days_ago = timezone.now() - timedelta(days=30)
-            recent_count = reviews.filter(created_at__gte=thirty_days_ago).count()
-            
             stats_data = {
                 'total_reviews': total_reviews,
                 'average_rating': round(average_rating, 2),
@@ -0,0 +1,35 @@
+"""
+Rebuild usage summary tables from the full user history.
+"""
+from django.core.management.base import BaseCommand
+from user_history.models import (
+    UserHistory, UserModelUsage, UserDailyUsage, UserSession, rebuild_usage_summaries
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild usage summaries, daily rollups and session summaries from user history"
+
+    # Summary models rebuilt by this command
+    summary_models = [UserModelUsage, UserDailyUsage, UserSession]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='user_id', help="Only rebuild summaries for this user id")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows inserted per query")
+
+    def handle(self, *args, **options):
+        history = UserHistory.objects.all()
+        if options['user_id']:
+            history = history.filter(user_id=options['user_id'])
+
+        for summary_model in self.summary_models:
+            summaries = summary_model.objects.all()
+            if options['user_id']:
+                summaries = summaries.filter(user_id=options['user_id'])
+
+            created = rebuild_usage_summaries(
+                summary_model, summaries, history, batch_size=options['batch_size']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {created} {summary_model._meta.verbose_name_plural} rows"
+            ))
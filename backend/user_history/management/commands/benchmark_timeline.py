@@ -0,0 +1,143 @@
+"""
+Benchmark the user history timeline query paths on synthetic data.
+"""
+import statistics
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+from datetime import timedelta
+from core.timebuckets import TimeBuckets
+from users.models import User
+from developers.models import Developer
+from ai_models.models import AIModel
+from user_history.models import UserHistory, UserDailyUsage, rebuild_usage_summaries
+from user_history.views import UserHistoryViewSet
+
+
+class Command(BaseCommand):
+    help = "Compare the legacy .extra() timeline with the bucketed and rollup timelines"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--interactions', type=int, default=20000, help="History rows to seed")
+        parser.add_argument('--models', type=int, default=5, help="Models the rows are spread over")
+        parser.add_argument('--days', type=int, default=30, help="Timeline window in days")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query path")
+    
+    def handle(self, *args, **options):
+        days = options['days']
+        
+        # Seed inside a transaction that is always rolled back
+        with transaction.atomic():
+            user = self.seed(options['interactions'], options['models'], days)
+            buckets = TimeBuckets.last(days + 1, 'day')
+            history = UserHistory.objects.filter(user=user)
+            
+            paths = {
+                'legacy .extra() by date': lambda: list(self.legacy_timeline(history, days)),
+                'bucketed history': lambda: buckets.aggregate(
+                    history,
+                    interactions=Count('id'),
+                    successful_interactions=Count('id', filter=Q(response_status='success')),
+                    total_cost=Sum('cost_incurred'),
+                    average_response_time=Avg('response_time_ms'),
+                    unique_models=Count('model', distinct=True)
+                ),
+                'daily rollups': lambda: UserHistoryViewSet().get_summary_timeline(
+                    UserDailyUsage.objects.filter(user=user), buckets
+                ),
+            }
+            
+            self.stdout.write(
+                f"{options['interactions']} interactions over {days} days, "
+                f"{options['repeat']} runs per path"
+            )
+            for name, run in paths.items():
+                run()  # Warm up
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    run()
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"  {name:<26} median {statistics.median(timings):8.2f} ms   "
+                    f"p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms"
+                )
+            
+            transaction.set_rollback(True)
+    
+    def legacy_timeline(self, history, days):
+        """The timeline query as it was before bucketing."""
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=days)
+        
+        return history.filter(
+            created_at__date__gte=start_date,
+            created_at__date__lte=end_date
+        ).extra(
+            select={'day': 'date(created_at)'}
+        ).values('day').annotate(
+            interactions=Count('id'),
+            successful_interactions=Count('id', filter=Q(response_status='success')),
+            total_cost=Sum('cost_incurred'),
+            average_response_time=Avg('response_time_ms'),
+            unique_models=Count('model', distinct=True)
+        ).order_by('day')
+    
+    def seed(self, interactions, model_count, days):
+        """Create a user with history spread over the window; return the user."""
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            username=f'bench-{suffix}', email=f'bench-{suffix}@example.com', password=None
+        )
+        developer = Developer.objects.create(
+            user=User.objects.create_user(
+                username=f'bench-dev-{suffix}', email=f'bench-dev-{suffix}@example.com', password=None
+            ),
+            developer_name=f'bench-dev-{suffix}'
+        )
+        models = [
+            AIModel.objects.create(
+                developer=developer,
+                name=f'Bench Model {index}',
+                description='Benchmark model',
+                category='nlp',
+                api_name=f'bench-{suffix}-{index}',
+                api_endpoint='https://example.com/api'
+            )
+            for index in range(model_count)
+        ]
+        
+        # Bulk insert skips save(), so the rollups are rebuilt afterwards
+        UserHistory.objects.bulk_create(
+            (
+                UserHistory(
+                    user=user,
+                    model=models[index % model_count],
+                    session_id=f'bench-session-{index // 20}',
+                    prompt='Benchmark prompt',
+                    response='Benchmark response',
+                    response_status='success' if index % 10 else 'error',
+                    response_time_ms=100 + index % 400,
+                    input_tokens=index % 50,
+                    output_tokens=index % 200,
+                    ip_address='127.0.0.1'
+                )
+                for index in range(interactions)
+            ),
+            batch_size=2000
+        )
+        table = connection.ops.quote_name(UserHistory._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET created_at = now() - random() * %s * interval '1 day' "
+                "WHERE user_id = %s",
+                [days, user.pk]
+            )
+        
+        history = UserHistory.objects.filter(user=user)
+        rebuild_usage_summaries(UserDailyUsage, UserDailyUsage.objects.filter(user=user), history)
+        return user
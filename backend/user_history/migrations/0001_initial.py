@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('ai_models', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserHistory',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session_id', models.CharField(db_index=True, max_length=255)),
+                ('request_id', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('prompt', models.TextField()),
+                ('request_parameters', models.JSONField(blank=True, default=dict)),
+                ('response', models.TextField(blank=True)),
+                ('response_status', models.CharField(choices=[('success', 'Success'), ('error', 'Error'), ('timeout', 'Timeout'), ('rate_limited', 'Rate Limited'), ('insufficient_quota', 'Insufficient Quota')], default='success', max_length=20)),
+                ('response_timestamp', models.DateTimeField(auto_now_add=True)),
+                ('response_time_ms', models.PositiveIntegerField(help_text='Response time in milliseconds', validators=[django.core.validators.MinValueValidator(0)])),
+                ('input_tokens', models.PositiveIntegerField(default=0)),
+                ('output_tokens', models.PositiveIntegerField(default=0)),
+                ('cost_incurred', models.DecimalField(decimal_places=6, default=0.0, max_digits=10)),
+                ('user_rating', models.PositiveIntegerField(blank=True, help_text='User rating from 1-5 stars', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('user_feedback', models.TextField(blank=True)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True)),
+                ('api_version', models.CharField(default='v1', max_length=20)),
+                ('model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_history', to='ai_models.aimodel')),
+            ],
+            options={
+                'verbose_name': 'User History',
+                'verbose_name_plural': 'User Histories',
+                'db_table': 'user_history',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
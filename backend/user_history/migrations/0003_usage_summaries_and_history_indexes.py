@@ -0,0 +1,261 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from itertools import islice
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+import django.contrib.postgres.fields
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+from django.utils import timezone
+import uuid
+
+BATCH_SIZE = 1000
+
+# Grouped history columns holding foreign key ids
+FOREIGN_KEYS = {'user': 'user_id', 'model': 'model_id'}
+
+
+def summarize_model_usage(history):
+    """Aggregate history rows into per-(user, model) summary values."""
+    return history.values('user', 'model').annotate(
+        interaction_count=Count('id'),
+        success_count=Count('id', filter=Q(response_status='success')),
+        total_cost=Sum('cost_incurred'),
+        total_tokens=Sum('input_tokens') + Sum('output_tokens'),
+        first_used_at=Min('created_at'),
+        last_used_at=Max('created_at')
+    )
+
+
+def summarize_daily_usage(history):
+    """Aggregate history rows into per-(user, day) rollup values, days in the server time zone."""
+    return history.annotate(
+        day=TruncDate('created_at', tzinfo=timezone.get_default_timezone())
+    ).values('user', 'day').annotate(
+        interaction_count=Count('id'),
+        success_count=Count('id', filter=Q(response_status='success')),
+        total_cost=Sum('cost_incurred'),
+        total_tokens=Sum('input_tokens') + Sum('output_tokens'),
+        response_time_sum=Sum('response_time_ms'),
+        rating_sum=Sum('user_rating'),
+        rating_count=Count('user_rating'),
+        model_ids=ArrayAgg('model', distinct=True),
+        session_ids=ArrayAgg('session_id', distinct=True)
+    )
+
+
+def summarize_sessions(history):
+    """Aggregate history rows into per-(user, session) summary values."""
+    return history.values('user', 'session_id').annotate(
+        interaction_count=Count('id'),
+        total_cost=Sum('cost_incurred'),
+        response_time_sum=Sum('response_time_ms'),
+        model_ids=ArrayAgg('model', distinct=True),
+        first_interaction=Min('created_at'),
+        last_interaction=Max('created_at')
+    )
+
+
+def backfill_usage_summaries(apps, schema_editor):
+    """
+    Fill the new summary tables from the existing history, the same
+    rebuild as backfill_usage_summaries, so review eligibility, stats,
+    timelines and sessions cover interactions recorded before them.
+    """
+    UserHistory = apps.get_model('user_history', 'UserHistory')
+    history = UserHistory.objects.order_by()
+
+    # Summary model, grouped history values, and the summary fields that default to 0 on NULL sums
+    summaries = [
+        (apps.get_model('user_history', 'UserModelUsage'), summarize_model_usage(history),
+         ['total_cost', 'total_tokens']),
+        (apps.get_model('user_history', 'UserDailyUsage'), summarize_daily_usage(history),
+         ['total_cost', 'total_tokens', 'response_time_sum', 'rating_sum']),
+        (apps.get_model('user_history', 'UserSession'), summarize_sessions(history),
+         ['total_cost', 'response_time_sum']),
+    ]
+
+    for summary_model, grouped, summed_fields in summaries:
+        rows = (
+            summary_model(**{
+                FOREIGN_KEYS.get(name, name): (value or 0) if name in summed_fields else value
+                for name, value in row.items()
+            })
+            for row in grouped.iterator()
+        )
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            summary_model.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0003_rating_aggregates_and_catalog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('user_history', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyUsage',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('interaction_count', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=6, default=0, max_digits=14)),
+                ('total_tokens', models.BigIntegerField(default=0)),
+                ('response_time_sum', models.BigIntegerField(default=0, help_text='Sum of response times in milliseconds')),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('model_ids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), default=list, size=None)),
+                ('session_ids', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), default=list, size=None)),
+            ],
+            options={
+                'verbose_name': 'User Daily Usage',
+                'verbose_name_plural': 'User Daily Usage',
+                'db_table': 'user_daily_usage',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserModelUsage',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('interaction_count', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=6, default=0, max_digits=14)),
+                ('total_tokens', models.BigIntegerField(default=0)),
+                ('first_used_at', models.DateTimeField()),
+                ('last_used_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'User Model Usage',
+                'verbose_name_plural': 'User Model Usage',
+                'db_table': 'user_model_usage',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session_id', models.CharField(max_length=255)),
+                ('interaction_count', models.PositiveIntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=6, default=0, max_digits=14)),
+                ('response_time_sum', models.BigIntegerField(default=0, help_text='Sum of response times in milliseconds')),
+                ('model_ids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), default=list, size=None)),
+                ('first_interaction', models.DateTimeField()),
+                ('last_interaction', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'User Session',
+                'verbose_name_plural': 'User Sessions',
+                'db_table': 'user_sessions',
+                'ordering': ['-last_interaction'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='userhistory',
+            name='user_histor_user_id_d236a7_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userhistory',
+            name='user_histor_model_i_c28753_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userhistory',
+            name='user_histor_session_41b362_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userhistory',
+            name='user_histor_respons_ae72f9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userhistory',
+            name='user_histor_user_id_d5d100_idx',
+        ),
+        migrations.AlterField(
+            model_name='userhistory',
+            name='model',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='usage_history', to='ai_models.aimodel'),
+        ),
+        migrations.AlterField(
+            model_name='userhistory',
+            name='session_id',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='userhistory',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='history', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='userhistory',
+            index=models.Index(fields=['user', 'model', 'response_status'], name='history_user_model_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userhistory',
+            index=models.Index(fields=['model', 'created_at'], name='history_model_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userhistory',
+            index=models.Index(fields=['user', 'created_at'], name='history_user_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='interaction_sessions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='usermodelusage',
+            name='model',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_usage', to='ai_models.aimodel'),
+        ),
+        migrations.AddField(
+            model_name='usermodelusage',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='model_usage', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='userdailyusage',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['user', '-last_interaction'], name='user_sessio_user_id_a281ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['-last_interaction'], name='user_sessio_last_in_2127da_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='usersession',
+            unique_together={('user', 'session_id')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='usermodelusage',
+            unique_together={('user', 'model')},
+        ),
+        migrations.AddIndex(
+            model_name='userdailyusage',
+            index=models.Index(fields=['day'], name='user_daily__day_f24b3b_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='userdailyusage',
+            unique_together={('user', 'day')},
+        ),
+        # Start the summaries from the existing history, not empty
+        migrations.RunPython(backfill_usage_summaries, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,14 @@
 User History models for tracking AI model interactions.
 """
 import uuid
-from django.db import models
+from datetime import datetime, time, timedelta
+from itertools import islice
+from django.db import models, connection, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from core.models import BaseModel
 from users.models import User
@@ -20,12 +27,20 @@ class UserHistory(BaseModel):
         ('insufficient_quota', 'Insufficient Quota'),
     ]
     
-    # Core relationships
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='history')
-    model = models.ForeignKey('ai_models.AIModel', on_delete=models.CASCADE, related_name='usage_history')
+    # Fields folded into the usage summaries; user, model, session and day pick the summary rows
+    SUMMARY_FIELDS = [
+        'user', 'model', 'session_id', 'created_at', 'response_status',
+        'input_tokens', 'output_tokens', 'cost_incurred', 'response_time_ms', 'user_rating',
+    ]
+    
+    # Core relationships (indexed by the composite indexes in Meta)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='history', db_index=False)
+    model = models.ForeignKey(
+        'ai_models.AIModel', on_delete=models.CASCADE, related_name='usage_history', db_index=False
+    )
     
     # Session and request details
-    session_id = models.CharField(max_length=255, db_index=True)
+    session_id = models.CharField(max_length=255)
     request_id = models.UUIDField(default=uuid.uuid4, unique=True)
     
     # Request content
@@ -69,13 +84,12 @@ class UserHistory(BaseModel):
         verbose_name = 'User History'
         verbose_name_plural = 'User Histories'
         indexes = [
-            models.Index(fields=['user']),
-            models.Index(fields=['model']),
-            models.Index(fields=['session_id']),
-            models.Index(fields=['response_status']),
             models.Index(fields=['created_at']),
-            models.Index(fields=['user', 'model']),
+            models.Index(fields=['user', 'model', 'response_status'], name='history_user_model_status_idx'),
             models.Index(fields=['user', 'session_id']),
+            # Per-owner time windows (stats and timeline endpoints)
+            models.Index(fields=['model', 'created_at'], name='history_model_created_idx'),
+            models.Index(fields=['user', 'created_at'], name='history_user_created_idx'),
         ]
         ordering = ['-created_at']
     
@@ -97,12 +111,52 @@ class UserHistory(BaseModel):
         
         return self.cost_incurred
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored summary contribution so saves can apply deltas
+        if all(cls._meta.get_field(name).attname in field_names for name in cls.SUMMARY_FIELDS):
+            instance._stored_summary_state = instance.summary_state()
+        return instance
+    
+    def summary_state(self, update_fields=None, stored_state=None):
+        """
+        Get the values of the summarized fields, taking fields not in
+        update_fields from stored_state as a partial save doesn't write them.
+        """
+        state = {}
+        for name in self.SUMMARY_FIELDS:
+            attname = self._meta.get_field(name).attname
+            if update_fields is None or name in update_fields or attname in update_fields:
+                state[name] = getattr(self, attname)
+            else:
+                state[name] = stored_state[name]
+        return state
+    
     def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        
         # Calculate cost if not already set
         if self.cost_incurred == 0 and self.model.pricing_type in ['per_request', 'per_token']:
             self.calculate_cost()
         
-        super().save(*args, **kwargs)
+        # The row and its usage summaries are written together or not at all
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            update_fields = kwargs.get('update_fields')
+            if is_new:
+                UserModelUsage.record_interaction(self)
+                UserDailyUsage.record_interaction(self)
+                UserSession.record_interaction(self)
+                self._stored_summary_state = self.summary_state()
+            elif hasattr(self, '_stored_summary_state'):
+                state = self.summary_state(update_fields, self._stored_summary_state)
+                self.apply_summary_change(self._stored_summary_state, state)
+                self._stored_summary_state = state
+            else:
+                # Previous values unknown, fall back to recomputing the summary rows
+                self.rebuild_summaries(self.summary_state())
         
         # Update model metrics
         if self.response_status == 'success':
@@ -116,6 +170,74 @@ class UserHistory(BaseModel):
         else:
             self.model.update_success_rate(False)
     
+    def delete(self, *args, **kwargs):
+        state = getattr(self, '_stored_summary_state', None) or self.summary_state()
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            
+            # Summaries can't subtract set members or extremes, so recompute the affected rows
+            self.rebuild_summaries(state)
+        
+        return result
+    
+    def apply_summary_change(self, old_state, new_state):
+        """Move an interaction's contribution to the usage summaries from old_state to new_state."""
+        old_day = UserDailyUsage.day_for(old_state['created_at'])
+        new_day = UserDailyUsage.day_for(new_state['created_at'])
+        if old_day != new_day or any(
+            old_state[name] != new_state[name] for name in ['user', 'model', 'session_id']
+        ):
+            # The interaction moved to other summary rows, so recompute both sides
+            self.rebuild_summaries(old_state)
+            self.rebuild_summaries(new_state)
+            return
+        
+        old_rating, new_rating = old_state['user_rating'], new_state['user_rating']
+        deltas = {
+            'success_count': int(new_state['response_status'] == 'success')
+            - int(old_state['response_status'] == 'success'),
+            'total_cost': new_state['cost_incurred'] - old_state['cost_incurred'],
+            'total_tokens': new_state['input_tokens'] + new_state['output_tokens']
+            - old_state['input_tokens'] - old_state['output_tokens'],
+            'response_time_sum': new_state['response_time_ms'] - old_state['response_time_ms'],
+            'rating_sum': (new_rating or 0) - (old_rating or 0),
+            'rating_count': int(new_rating is not None) - int(old_rating is not None),
+        }
+        if not any(deltas.values()):
+            return
+        
+        apply_summary_deltas(
+            UserModelUsage.objects.filter(user_id=self.user_id, model_id=self.model_id), deltas
+        )
+        apply_summary_deltas(UserDailyUsage.objects.filter(user_id=self.user_id, day=new_day), deltas)
+        apply_summary_deltas(
+            UserSession.objects.filter(user_id=self.user_id, session_id=self.session_id), deltas
+        )
+    
+    @staticmethod
+    def rebuild_summaries(state):
+        """Recompute the summary rows an interaction with the given summary_state() belongs to."""
+        user_id, model_id = state['user'], state['model']
+        rebuild_usage_summaries(
+            UserModelUsage,
+            UserModelUsage.objects.filter(user_id=user_id, model_id=model_id),
+            UserHistory.objects.filter(user_id=user_id, model_id=model_id)
+        )
+        
+        day = UserDailyUsage.day_for(state['created_at'])
+        day_start, day_end = UserDailyUsage.day_range(day)
+        rebuild_usage_summaries(
+            UserDailyUsage,
+            UserDailyUsage.objects.filter(user_id=user_id, day=day),
+            UserHistory.objects.filter(user_id=user_id, created_at__gte=day_start, created_at__lt=day_end)
+        )
+        
+        rebuild_usage_summaries(
+            UserSession,
+            UserSession.objects.filter(user_id=user_id, session_id=state['session_id']),
+            UserHistory.objects.filter(user_id=user_id, session_id=state['session_id'])
+        )
+    
     @property
     def total_tokens(self):
         """Get total tokens used."""
@@ -125,3 +247,372 @@ class UserHistory(BaseModel):
     def is_successful(self):
         """Check if the interaction was successful."""
         return self.response_status == 'success'
+
+
+class UserModelUsage(BaseModel):
+    """
+    Running usage summary per (user, model), maintained incrementally from
+    UserHistory so callers don't have to scan the full history.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='model_usage', db_index=False)
+    model = models.ForeignKey('ai_models.AIModel', on_delete=models.CASCADE, related_name='user_usage')
+    
+    # Counters
+    interaction_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    total_cost = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    total_tokens = models.BigIntegerField(default=0)
+    
+    # Usage window
+    first_used_at = models.DateTimeField()
+    last_used_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'user_model_usage'
+        verbose_name = 'User Model Usage'
+        verbose_name_plural = 'User Model Usage'
+        unique_together = ['user', 'model']
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.model_id} ({self.interaction_count} interactions)"
+    
+    @classmethod
+    def record_interaction(cls, history):
+        """Add a single interaction to its summary row with one atomic upsert."""
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = timezone.now()
+        used_at = history.created_at or now
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} AS summary (id, user_id, model_id, interaction_count, "
+                "success_count, total_cost, total_tokens, first_used_at, last_used_at, "
+                "created_at, updated_at) "
+                "VALUES (%s, %s, %s, 1, %s, %s, %s, %s, %s, %s, %s) "
+                "ON CONFLICT (user_id, model_id) DO UPDATE SET "
+                "interaction_count = summary.interaction_count + 1, "
+                "success_count = summary.success_count + EXCLUDED.success_count, "
+                "total_cost = summary.total_cost + EXCLUDED.total_cost, "
+                "total_tokens = summary.total_tokens + EXCLUDED.total_tokens, "
+                "first_used_at = LEAST(summary.first_used_at, EXCLUDED.first_used_at), "
+                "last_used_at = GREATEST(summary.last_used_at, EXCLUDED.last_used_at), "
+                "updated_at = EXCLUDED.updated_at",
+                [
+                    uuid.uuid4(), history.user_id, history.model_id,
+                    1 if history.is_successful else 0,
+                    history.cost_incurred, history.total_tokens,
+                    used_at, used_at, now, now,
+                ]
+            )
+    
+    @classmethod
+    def success_count_for(cls, user, model):
+        """Get the number of successful interactions a user had with a model."""
+        return cls.objects.filter(user=user, model=model).values_list(
+            'success_count', flat=True
+        ).first() or 0
+    
+    @staticmethod
+    def summarize_history(history_queryset):
+        """Aggregate history rows into per-(user, model) summary values."""
+        return history_queryset.order_by().values('user', 'model').annotate(
+            interaction_count=Count('id'),
+            success_count=Count('id', filter=Q(response_status='success')),
+            total_cost=Sum('cost_incurred'),
+            total_tokens=Sum('input_tokens') + Sum('output_tokens'),
+            first_used_at=Min('created_at'),
+            last_used_at=Max('created_at')
+        )
+    
+    @classmethod
+    def from_summary(cls, row):
+        """Build an unsaved summary from a summarize_history() row."""
+        return cls(
+            user_id=row['user'],
+            model_id=row['model'],
+            interaction_count=row['interaction_count'],
+            success_count=row['success_count'],
+            total_cost=row['total_cost'] or 0,
+            total_tokens=row['total_tokens'] or 0,
+            first_used_at=row['first_used_at'],
+            last_used_at=row['last_used_at']
+        )
+
+
+class UserDailyUsage(BaseModel):
+    """
+    Per-user rollup of one day's interactions (in the server time zone),
+    maintained incrementally so history statistics read a few hundred
+    rollup rows instead of the full history.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_usage', db_index=False)
+    day = models.DateField()
+    
+    # Counters
+    interaction_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    total_cost = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    total_tokens = models.BigIntegerField(default=0)
+    response_time_sum = models.BigIntegerField(default=0, help_text="Sum of response times in milliseconds")
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    
+    # Exact distinct members seen during the day
+    model_ids = ArrayField(models.UUIDField(), default=list)
+    session_ids = ArrayField(models.CharField(max_length=255), default=list)
+    
+    class Meta:
+        db_table = 'user_daily_usage'
+        verbose_name = 'User Daily Usage'
+        verbose_name_plural = 'User Daily Usage'
+        unique_together = ['user', 'day']
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+        ordering = ['day']
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.day} ({self.interaction_count} interactions)"
+    
+    @staticmethod
+    def day_for(value):
+        """Get the rollup day a timestamp falls on."""
+        return timezone.localtime(value, timezone.get_default_timezone()).date()
+    
+    @staticmethod
+    def day_range(day):
+        """Get the half-open [start, end) timestamp range covered by a rollup day."""
+        tz = timezone.get_default_timezone()
+        start = timezone.make_aware(datetime.combine(day, time.min), tz)
+        end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+        return start, end
+    
+    @classmethod
+    def record_interaction(cls, history):
+        """Add a single interaction to its day's rollup with one atomic upsert."""
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = timezone.now()
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} AS rollup (id, user_id, day, interaction_count, "
+                "success_count, total_cost, total_tokens, response_time_sum, rating_sum, "
+                "rating_count, model_ids, session_ids, created_at, updated_at) "
+                "VALUES (%s, %s, %s, 1, %s, %s, %s, %s, %s, %s, "
+                "ARRAY[%s]::uuid[], ARRAY[%s]::varchar[], %s, %s) "
+                "ON CONFLICT (user_id, day) DO UPDATE SET "
+                "interaction_count = rollup.interaction_count + 1, "
+                "success_count = rollup.success_count + EXCLUDED.success_count, "
+                "total_cost = rollup.total_cost + EXCLUDED.total_cost, "
+                "total_tokens = rollup.total_tokens + EXCLUDED.total_tokens, "
+                "response_time_sum = rollup.response_time_sum + EXCLUDED.response_time_sum, "
+                "rating_sum = rollup.rating_sum + EXCLUDED.rating_sum, "
+                "rating_count = rollup.rating_count + EXCLUDED.rating_count, "
+                "model_ids = CASE WHEN EXCLUDED.model_ids <@ rollup.model_ids "
+                "THEN rollup.model_ids ELSE rollup.model_ids || EXCLUDED.model_ids END, "
+                "session_ids = CASE WHEN EXCLUDED.session_ids <@ rollup.session_ids "
+                "THEN rollup.session_ids ELSE rollup.session_ids || EXCLUDED.session_ids END, "
+                "updated_at = EXCLUDED.updated_at",
+                [
+                    uuid.uuid4(), history.user_id, cls.day_for(history.created_at or now),
+                    1 if history.is_successful else 0,
+                    history.cost_incurred, history.total_tokens, history.response_time_ms,
+                    history.user_rating or 0, 0 if history.user_rating is None else 1,
+                    str(history.model_id), history.session_id, now, now,
+                ]
+            )
+    
+    @staticmethod
+    def count_distinct(queryset, field, group_by=None):
+        """
+        Count distinct members of an array field across rollup rows,
+        per value of group_by when given.
+        """
+        columns = [group_by, field] if group_by else [field]
+        sql, params = queryset.order_by().values(*columns).query.sql_with_params()
+        quote_name = connection.ops.quote_name
+        
+        with connection.cursor() as cursor:
+            if group_by is None:
+                cursor.execute(
+                    f"SELECT COUNT(DISTINCT member) FROM ({sql}) AS rollup, "
+                    f"unnest(rollup.{quote_name(field)}) AS member",
+                    params
+                )
+                return cursor.fetchone()[0]
+            
+            cursor.execute(
+                f"SELECT rollup.{quote_name(group_by)}, COUNT(DISTINCT member) "
+                f"FROM ({sql}) AS rollup, unnest(rollup.{quote_name(field)}) AS member "
+                "GROUP BY 1",
+                params
+            )
+            return dict(cursor.fetchall())
+    
+    @staticmethod
+    def summarize_history(history_queryset):
+        """Aggregate history rows into per-(user, day) rollup values."""
+        return history_queryset.order_by().annotate(
+            day=TruncDate('created_at', tzinfo=timezone.get_default_timezone())
+        ).values('user', 'day').annotate(
+            interaction_count=Count('id'),
+            success_count=Count('id', filter=Q(response_status='success')),
+            total_cost=Sum('cost_incurred'),
+            total_tokens=Sum('input_tokens') + Sum('output_tokens'),
+            response_time_sum=Sum('response_time_ms'),
+            rating_sum=Sum('user_rating'),
+            rating_count=Count('user_rating'),
+            model_ids=ArrayAgg('model', distinct=True),
+            session_ids=ArrayAgg('session_id', distinct=True)
+        )
+    
+    @classmethod
+    def from_summary(cls, row):
+        """Build an unsaved rollup from a summarize_history() row."""
+        return cls(
+            user_id=row['user'],
+            day=row['day'],
+            interaction_count=row['interaction_count'],
+            success_count=row['success_count'],
+            total_cost=row['total_cost'] or 0,
+            total_tokens=row['total_tokens'] or 0,
+            response_time_sum=row['response_time_sum'] or 0,
+            rating_sum=row['rating_sum'] or 0,
+            rating_count=row['rating_count'],
+            model_ids=row['model_ids'],
+            session_ids=row['session_ids']
+        )
+
+
+class UserSession(BaseModel):
+    """
+    Materialized summary of one user session, maintained on each interaction
+    so the sessions listing is an indexed range read.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='interaction_sessions', db_index=False
+    )
+    session_id = models.CharField(max_length=255)
+    
+    # Counters
+    interaction_count = models.PositiveIntegerField(default=0)
+    total_cost = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    response_time_sum = models.BigIntegerField(default=0, help_text="Sum of response times in milliseconds")
+    model_ids = ArrayField(models.UUIDField(), default=list)
+    
+    # Session window
+    first_interaction = models.DateTimeField()
+    last_interaction = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'user_sessions'
+        verbose_name = 'User Session'
+        verbose_name_plural = 'User Sessions'
+        unique_together = ['user', 'session_id']
+        indexes = [
+            models.Index(fields=['user', '-last_interaction']),
+            models.Index(fields=['-last_interaction']),
+        ]
+        ordering = ['-last_interaction']
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.session_id} ({self.interaction_count} interactions)"
+    
+    @property
+    def unique_models(self):
+        """Get the number of distinct models used in the session."""
+        return len(self.model_ids)
+    
+    @property
+    def average_response_time(self):
+        """Get the average response time in milliseconds."""
+        if not self.interaction_count:
+            return 0
+        return round(self.response_time_sum / self.interaction_count, 2)
+    
+    @classmethod
+    def record_interaction(cls, history):
+        """Add a single interaction to its session summary with one atomic upsert."""
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = timezone.now()
+        used_at = history.created_at or now
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} AS summary (id, user_id, session_id, interaction_count, "
+                "total_cost, response_time_sum, model_ids, first_interaction, last_interaction, "
+                "created_at, updated_at) "
+                "VALUES (%s, %s, %s, 1, %s, %s, ARRAY[%s]::uuid[], %s, %s, %s, %s) "
+                "ON CONFLICT (user_id, session_id) DO UPDATE SET "
+                "interaction_count = summary.interaction_count + 1, "
+                "total_cost = summary.total_cost + EXCLUDED.total_cost, "
+                "response_time_sum = summary.response_time_sum + EXCLUDED.response_time_sum, "
+                "model_ids = CASE WHEN EXCLUDED.model_ids <@ summary.model_ids "
+                "THEN summary.model_ids ELSE summary.model_ids || EXCLUDED.model_ids END, "
+                "first_interaction = LEAST(summary.first_interaction, EXCLUDED.first_interaction), "
+                "last_interaction = GREATEST(summary.last_interaction, EXCLUDED.last_interaction), "
+                "updated_at = EXCLUDED.updated_at",
+                [
+                    uuid.uuid4(), history.user_id, history.session_id,
+                    history.cost_incurred, history.response_time_ms, str(history.model_id),
+                    used_at, used_at, now, now,
+                ]
+            )
+    
+    @staticmethod
+    def summarize_history(history_queryset):
+        """Aggregate history rows into per-(user, session) summary values."""
+        return history_queryset.order_by().values('user', 'session_id').annotate(
+            interaction_count=Count('id'),
+            total_cost=Sum('cost_incurred'),
+            response_time_sum=Sum('response_time_ms'),
+            model_ids=ArrayAgg('model', distinct=True),
+            first_interaction=Min('created_at'),
+            last_interaction=Max('created_at')
+        )
+    
+    @classmethod
+    def from_summary(cls, row):
+        """Build an unsaved session summary from a summarize_history() row."""
+        return cls(
+            user_id=row['user'],
+            session_id=row['session_id'],
+            interaction_count=row['interaction_count'],
+            total_cost=row['total_cost'] or 0,
+            response_time_sum=row['response_time_sum'] or 0,
+            model_ids=row['model_ids'],
+            first_interaction=row['first_interaction'],
+            last_interaction=row['last_interaction']
+        )
+
+
+def rebuild_usage_summaries(summary_model, summaries, history, batch_size=1000):
+    """
+    Replace the given summary rows with ones recomputed from history;
+    return the number of rows created.
+    """
+    rows = (
+        summary_model.from_summary(row)
+        for row in summary_model.summarize_history(history).iterator()
+    )
+    created = 0
+    
+    with transaction.atomic():
+        summaries.delete()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            summary_model.objects.bulk_create(batch)
+            created += len(batch)
+    
+    return created
+
+
+def apply_summary_deltas(summaries, deltas):
+    """Add {field: delta} to the given summary rows in one UPDATE, skipping fields they don't have."""
+    field_names = {field.name for field in summaries.model._meta.concrete_fields}
+    summaries.update(
+        updated_at=timezone.now(),
+        **{name: F(name) + delta for name, delta in deltas.items() if delta and name in field_names}
+    )
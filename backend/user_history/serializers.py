@@ -76,6 +76,7 @@ class UserHistoryListSerializer(serializers.ModelSerializer):
             'response_status_display', 'response_time_ms', 'total_tokens',
             'cost_incurred', 'user_rating', 'created_at'
         ]
+        projection_extra_fields = ['input_tokens', 'output_tokens']
     
     def get_total_tokens(self, obj):
         """Get total tokens used."""
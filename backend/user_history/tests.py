@@ -1,3 +1,351 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.testing import create_developer, create_history, create_model, create_user, explain_with_index_scans
+from core.timebuckets import TimeBuckets
+from .models import UserDailyUsage, UserHistory, UserModelUsage, UserSession
 
-# Create your tests here.
+
+def summary_rows():
+    """Snapshot the three usage summary tables, without ids and timestamps."""
+    ignored = {'id', 'created_at', 'updated_at'}
+    rows = {}
+    for summary_model in [UserModelUsage, UserDailyUsage, UserSession]:
+        fields = [field.attname for field in summary_model._meta.concrete_fields if field.name not in ignored]
+        rows[summary_model.__name__] = sorted(
+            tuple(sorted(value) if isinstance(value, list) else value for value in row)
+            for row in summary_model.objects.values_list(*fields)
+        )
+    return rows
+
+
+def create_history_at(when, user, model, **extra_fields):
+    """Create a history row as if it had been recorded at the given time."""
+    with mock.patch('django.utils.timezone.now', return_value=when):
+        return create_history(user, model, **extra_fields)
+
+
+class TimeWindowIndexTests(TestCase):
+    """
+    History time windows must be index range scans on created_at.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.model = create_model(create_developer())
+    
+    def test_window_predicates_use_composite_indexes(self):
+        today = TimeBuckets.current('day')
+        cases = [
+            ({'model': self.model}, 'history_model_created_idx'),
+            ({'user': self.user}, 'history_user_created_idx'),
+        ]
+        
+        for owner_filter, index_name in cases:
+            with self.subTest(index=index_name):
+                plan = explain_with_index_scans(today.filter(UserHistory.objects.filter(**owner_filter)))
+                self.assertIn(index_name, plan)
+                self.assertNotIn('::date', plan)
+
+
+class HistoryListProjectionTests(TestCase):
+    """
+    The history list must not load prompt/response text.
+    """
+    
+    def setUp(self):
+        self.user = create_user('user')
+        self.model = create_model(create_developer())
+        for index in range(3):
+            create_history(
+                self.user,
+                self.model,
+                session_id=f'session-{index}',
+                prompt='p' * 10000,
+                response='r' * 10000,
+                input_tokens=10,
+                output_tokens=5
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_list_selects_only_serialized_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/v1/history/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        for item in response.data['results']:
+            self.assertEqual(item['model_name'], 'Test Model')
+            self.assertEqual(item['total_tokens'], 15)
+        
+        page_query = context.captured_queries[-1]['sql']
+        self.assertIn('"models"."name"', page_query)
+        self.assertNotIn('"prompt"', page_query)
+        self.assertNotIn('"response"', page_query)
+
+
+class UsageSummaryDeltaTests(TestCase):
+    """
+    Updating a history row must apply its change of every summarized field
+    to the usage summaries, leaving them equal to a rebuild from history.
+    """
+    
+    def setUp(self):
+        self.user = create_user('user')
+        self.model = create_model(
+            create_developer(total_revenue=Decimal('0')), pricing_type='per_request', price_per_request=Decimal('0.25')
+        )
+        self.history = create_history(
+            self.user, self.model, input_tokens=10, output_tokens=5, cost_incurred=Decimal('0.5')
+        )
+        create_history(self.user, self.model, response_time_ms=300, user_rating=4)
+    
+    def assertSummariesMatchHistory(self):
+        """Check the maintained summaries against ones rebuilt from history."""
+        maintained = summary_rows()
+        call_command('backfill_usage_summaries', stdout=io.StringIO())
+        self.assertEqual(maintained, summary_rows())
+    
+    def test_insert(self):
+        usage = UserModelUsage.objects.get(user=self.user, model=self.model)
+        self.assertEqual((usage.interaction_count, usage.success_count, usage.total_tokens), (2, 2, 15))
+        daily = UserDailyUsage.objects.get(user=self.user)
+        self.assertEqual((daily.response_time_sum, daily.rating_sum, daily.rating_count), (400, 4, 1))
+        self.assertSummariesMatchHistory()
+    
+    def test_update_applies_every_field(self):
+        history = UserHistory.objects.get(pk=self.history.pk)
+        history.response_status = 'error'
+        history.input_tokens = 100
+        history.cost_incurred = Decimal('2')
+        history.response_time_ms = 1000
+        history.user_rating = 2
+        history.save()
+        
+        usage = UserModelUsage.objects.get(user=self.user, model=self.model)
+        self.assertEqual((usage.success_count, usage.total_cost, usage.total_tokens), (1, Decimal('2.25'), 105))
+        daily = UserDailyUsage.objects.get(user=self.user)
+        self.assertEqual(
+            (daily.success_count, daily.response_time_sum, daily.rating_sum, daily.rating_count),
+            (1, 1300, 6, 2)
+        )
+        session = UserSession.objects.get(user=self.user)
+        self.assertEqual((session.total_cost, session.response_time_sum), (Decimal('2.25'), 1300))
+        self.assertSummariesMatchHistory()
+        
+        # Saving the same instance again applies nothing twice
+        history.save()
+        self.assertSummariesMatchHistory()
+    
+    def test_update_fields_apply_only_written_fields(self):
+        self.history.response_time_ms = 900
+        self.history.user_rating = 5
+        self.history.save(update_fields=['user_rating', 'updated_at'])
+        self.assertSummariesMatchHistory()
+        
+        self.history.save(update_fields=['response_time_ms'])
+        self.assertEqual(UserSession.objects.get(user=self.user).response_time_sum, 1200)
+        self.assertSummariesMatchHistory()
+    
+    def test_moving_to_another_session_rebuilds_both(self):
+        self.history.session_id = 'other'
+        self.history.save()
+        
+        sessions = dict(UserSession.objects.values_list('session_id', 'interaction_count'))
+        self.assertEqual(sessions, {'session': 1, 'other': 1})
+        self.assertSummariesMatchHistory()
+    
+    def test_delete(self):
+        UserHistory.objects.get(pk=self.history.pk).delete()
+        self.assertEqual(UserModelUsage.objects.get(user=self.user).interaction_count, 1)
+        self.assertSummariesMatchHistory()
+
+
+class DailyRollupTests(TestCase):
+    """
+    Daily rollups must equal an aggregate over the history rows, and the
+    stats and timeline served from them must match a history scan.
+    """
+    
+    def setUp(self):
+        self.user = create_user('user')
+        self.other_user = create_user('other')
+        developer = create_developer()
+        models = [create_model(developer), create_model(developer, name='Other', api_name='other-model')]
+        
+        now = timezone.now()
+        for index in range(12):
+            create_history_at(
+                now - timedelta(days=index % 3, minutes=index),
+                [self.user, self.other_user][index % 4 == 0],
+                models[index % 2],
+                session_id=f'session-{index % 5}',
+                response_status='error' if index % 3 == 0 else 'success',
+                response_time_ms=100 + index * 10,
+                input_tokens=index,
+                output_tokens=2 * index,
+                user_rating=(index % 5) + 1 if index % 2 else None
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def history_aggregate(self):
+        """Aggregate the history rows per (user, day) in Python."""
+        rollups = {}
+        for history in UserHistory.objects.all():
+            key = (history.user_id, UserDailyUsage.day_for(history.created_at))
+            rollup = rollups.setdefault(key, {
+                'interaction_count': 0, 'success_count': 0, 'total_cost': 0, 'total_tokens': 0,
+                'response_time_sum': 0, 'rating_sum': 0, 'rating_count': 0,
+                'model_ids': set(), 'session_ids': set(),
+            })
+            rollup['interaction_count'] += 1
+            rollup['success_count'] += history.is_successful
+            rollup['total_cost'] += history.cost_incurred
+            rollup['total_tokens'] += history.total_tokens
+            rollup['response_time_sum'] += history.response_time_ms
+            if history.user_rating is not None:
+                rollup['rating_sum'] += history.user_rating
+                rollup['rating_count'] += 1
+            rollup['model_ids'].add(history.model_id)
+            rollup['session_ids'].add(history.session_id)
+        return rollups
+    
+    def test_rollups_match_history_aggregate(self):
+        rollups = {
+            (rollup.user_id, rollup.day): {
+                'interaction_count': rollup.interaction_count,
+                'success_count': rollup.success_count,
+                'total_cost': rollup.total_cost,
+                'total_tokens': rollup.total_tokens,
+                'response_time_sum': rollup.response_time_sum,
+                'rating_sum': rollup.rating_sum,
+                'rating_count': rollup.rating_count,
+                'model_ids': set(rollup.model_ids),
+                'session_ids': set(rollup.session_ids),
+            }
+            for rollup in UserDailyUsage.objects.all()
+        }
+        self.assertEqual(len(rollups), 6)
+        self.assertEqual(rollups, self.history_aggregate())
+    
+    def test_backfill_matches_incremental_rollups(self):
+        maintained = summary_rows()
+        call_command('backfill_usage_summaries', stdout=io.StringIO())
+        self.assertEqual(maintained, summary_rows())
+    
+    def test_stats_match_history_scan(self):
+        admin = create_user('admin', is_staff=True)
+        for user in [self.user, admin]:
+            with self.subTest(user=user.username):
+                self.client.force_authenticate(user)
+                from_rollups = self.client.get('/api/v1/history/stats/').data
+                # A date filter forces the history scan
+                from_history = self.client.get('/api/v1/history/stats/?date_from=2000-01-01').data
+                self.assertEqual(from_rollups, from_history)
+        
+        self.assertEqual(from_rollups['total_interactions'], 12)
+        # Both models were used 6 times
+        self.assertEqual(from_rollups['most_used_model'], 'Other')
+    
+    def test_timeline_matches_history_scan(self):
+        from_rollups = self.client.get('/api/v1/history/timeline/?days=5').data
+        from_history = self.client.get('/api/v1/history/timeline/?days=5&date_from=2000-01-01').data
+        
+        self.assertEqual(len(from_rollups), 6)
+        self.assertEqual(from_rollups, from_history)
+        self.assertEqual(sum(row['interactions'] for row in from_rollups), 9)
+    
+    def test_timeline_keeps_day_key(self):
+        rows = self.client.get('/api/v1/history/timeline/?days=5').data
+        self.assertEqual(rows[-1]['day'], timezone.localdate().isoformat())
+        self.assertTrue(all(row['day'] == row['period'] for row in rows))
+
+
+class UserSessionTests(TestCase):
+    """
+    Materialized sessions must equal an aggregate over their history rows,
+    and the sessions listing must page through them by cursor.
+    """
+    
+    def setUp(self):
+        self.user = create_user('user')
+        developer = create_developer()
+        self.models = [create_model(developer), create_model(developer, name='Other', api_name='other-model')]
+        
+        now = timezone.now()
+        for index in range(25):
+            for number, model in enumerate(self.models):
+                create_history_at(
+                    now - timedelta(hours=index, minutes=number),
+                    self.user,
+                    model,
+                    session_id=f'session-{index}',
+                    response_time_ms=100 + number * 50
+                )
+        
+        # Interactions by another user stay out of the listing
+        create_history_at(now, create_user('other'), self.models[0], session_id='session-0')
+        
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_sessions_match_history_aggregate(self):
+        for session in UserSession.objects.filter(user=self.user):
+            history = UserHistory.objects.filter(user=self.user, session_id=session.session_id)
+            with self.subTest(session=session.session_id):
+                self.assertEqual(session.interaction_count, history.count())
+                self.assertEqual(session.total_cost, sum(row.cost_incurred for row in history))
+                self.assertEqual(session.response_time_sum, sum(row.response_time_ms for row in history))
+                self.assertEqual(set(session.model_ids), {row.model_id for row in history})
+                self.assertEqual(session.first_interaction, min(row.created_at for row in history))
+                self.assertEqual(session.last_interaction, max(row.created_at for row in history))
+                self.assertEqual(session.average_response_time, 125)
+        
+        self.assertEqual(UserSession.objects.filter(user=self.user).count(), 25)
+    
+    def test_backfill_matches_incremental_sessions(self):
+        maintained = summary_rows()
+        call_command('backfill_usage_summaries', stdout=io.StringIO())
+        self.assertEqual(maintained, summary_rows())
+    
+    def test_cursor_pagination_walks_every_session_once(self):
+        response = self.client.get('/api/v1/history/sessions/?page_size=10')
+        self.assertEqual(response.status_code, 200)
+        
+        session_ids = []
+        pages = 0
+        while True:
+            pages += 1
+            session_ids += [session['session_id'] for session in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        
+        self.assertEqual(pages, 3)
+        self.assertEqual(session_ids, [f'session-{index}' for index in range(25)])
+    
+    def test_listing_matches_history_scan(self):
+        from_sessions = self.client.get('/api/v1/history/sessions/?page_size=10').data['results']
+        # A date filter forces the history scan
+        from_history = self.client.get('/api/v1/history/sessions/?page_size=10&date_from=2000-01-01').data['results']
+        
+        self.assertEqual(from_sessions, from_history)
+        self.assertEqual(from_sessions[0]['interaction_count'], 2)
+        self.assertEqual(from_sessions[0]['unique_models'], 2)
+    
+    def test_new_interaction_moves_session_to_the_front(self):
+        create_history(self.user, self.models[1], session_id='session-20')
+        
+        first = self.client.get('/api/v1/history/sessions/?page_size=10').data['results'][0]
+        self.assertEqual(first['session_id'], 'session-20')
+        self.assertEqual(first['interaction_count'], 3)
@@ -7,10 +7,12 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django.db.models import Count, Avg, Sum, Min, Max, Q
 from django.utils import timezone
-from datetime import timedelta
 from drf_spectacular.utils import extend_schema
+from core.mixins import CompiledListMixin, ProjectedListMixin
+from core.pagination import RecentActivityCursorPagination
+from core.timebuckets import TimeBuckets, count_current_periods
 from core.permissions import IsUserOrAdmin
-from .models import UserHistory
+from .models import UserHistory, UserModelUsage, UserDailyUsage, UserSession
 from .serializers import (
     UserHistorySerializer,
     UserHistoryListSerializer,
@@ -21,7 +23,7 @@ from .serializers import (
 )
 
 
-class UserHistoryViewSet(ModelViewSet):
+class UserHistoryViewSet(CompiledListMixin, ProjectedListMixin, ModelViewSet):
     """
     ViewSet for managing user history.
     """
@@ -85,31 +87,22 @@ class UserHistoryViewSet(ModelViewSet):
         
         return queryset
     
-    @extend_schema(
-        summary="Get user's interaction statistics",
-        description="Get comprehensive statistics about the user's interactions with AI models"
-    )
-    @action(detail=False, methods=['get'])
-    def stats(self, request):
-        """Get user interaction statistics."""
-        user_history = self.get_queryset()
+    # Query params that narrow history below what the usage summaries cover
+    history_filter_params = ['model', 'session', 'status', 'date_from', 'date_to']
+    
+    def get_summary_queryset(self, queryset):
+        """Scope a per-user summary queryset, or return None when history filters apply."""
+        if any(self.request.query_params.get(param) for param in self.history_filter_params):
+            return None
         
-        if not user_history.exists():
-            return Response({
-                'total_interactions': 0,
-                'unique_models': 0,
-                'unique_sessions': 0,
-                'average_rating': 0,
-                'total_cost': 0,
-                'average_response_time': 0,
-                'success_rate': 0,
-                'total_tokens': 0,
-                'most_used_model': None,
-                'interactions_today': 0,
-                'interactions_this_month': 0
-            })
+        # Regular users can only see their own usage
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
         
-        # Basic statistics
+        return queryset
+    
+    def get_history_stats(self, user_history):
+        """Aggregate statistics by scanning the matching history rows."""
         stats = user_history.aggregate(
             total_interactions=Count('id'),
             unique_models=Count('model', distinct=True),
@@ -119,26 +112,99 @@ class UserHistoryViewSet(ModelViewSet):
             average_response_time=Avg('response_time_ms'),
             total_tokens=Sum('input_tokens') + Sum('output_tokens')
         )
+        if not stats['total_interactions']:
+            return stats
         
         # Success rate
         successful_interactions = user_history.filter(response_status='success').count()
-        total_interactions = stats['total_interactions']
-        stats['success_rate'] = (successful_interactions / total_interactions * 100) if total_interactions > 0 else 0
+        stats['success_rate'] = successful_interactions / stats['total_interactions'] * 100
         
         # Most used model
+        # Ties go to the first model by name, as in get_summary_stats()
         most_used = user_history.values('model__name').annotate(
             count=Count('id')
-        ).order_by('-count').first()
+        ).order_by('-count', 'model__name').first()
         stats['most_used_model'] = most_used['model__name'] if most_used else None
         
         # Time-based statistics
-        today = timezone.now().date()
-        stats['interactions_today'] = user_history.filter(created_at__date=today).count()
+        current_periods = count_current_periods(user_history)
+        stats['interactions_today'] = current_periods['today']
+        stats['interactions_this_month'] = current_periods['this_month']
         
+        return stats
+    
+    def get_summary_stats(self, daily_usage, model_usage):
+        """Aggregate statistics from the daily rollups and per-model summaries."""
+        today = UserDailyUsage.day_for(timezone.now())
         first_day_of_month = today.replace(day=1)
-        stats['interactions_this_month'] = user_history.filter(
-            created_at__date__gte=first_day_of_month
-        ).count()
+        
+        totals = daily_usage.aggregate(
+            total_interactions=Sum('interaction_count'),
+            successful_interactions=Sum('success_count'),
+            total_cost=Sum('total_cost'),
+            total_tokens=Sum('total_tokens'),
+            response_time_sum=Sum('response_time_sum'),
+            rating_sum=Sum('rating_sum'),
+            rating_count=Sum('rating_count'),
+            interactions_today=Sum('interaction_count', filter=Q(day=today)),
+            interactions_this_month=Sum('interaction_count', filter=Q(day__gte=first_day_of_month))
+        )
+        total_interactions = totals['total_interactions']
+        if not total_interactions:
+            return {'total_interactions': 0}
+        
+        # Ties go to the first model by name, as in get_history_stats()
+        most_used = model_usage.values('model__name').annotate(
+            count=Sum('interaction_count')
+        ).order_by('-count', 'model__name').first()
+        
+        return {
+            'total_interactions': total_interactions,
+            'unique_models': model_usage.aggregate(count=Count('model', distinct=True))['count'],
+            'unique_sessions': UserDailyUsage.count_distinct(daily_usage, 'session_ids'),
+            'average_rating': (
+                totals['rating_sum'] / totals['rating_count'] if totals['rating_count'] else None
+            ),
+            'total_cost': totals['total_cost'],
+            'average_response_time': totals['response_time_sum'] / total_interactions,
+            'success_rate': totals['successful_interactions'] / total_interactions * 100,
+            'total_tokens': totals['total_tokens'],
+            'most_used_model': most_used['model__name'] if most_used else None,
+            'interactions_today': totals['interactions_today'],
+            'interactions_this_month': totals['interactions_this_month'],
+        }
+    
+    @extend_schema(
+        summary="Get user's interaction statistics",
+        description="Get comprehensive statistics about the user's interactions with AI models"
+    )
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Get user interaction statistics."""
+        daily_usage = self.get_summary_queryset(UserDailyUsage.objects.all())
+        
+        # Unfiltered requests are answered from the rollups
+        if daily_usage is not None:
+            stats = self.get_summary_stats(
+                daily_usage, self.get_summary_queryset(UserModelUsage.objects.all())
+            )
+        else:
+            stats = self.get_history_stats(self.get_queryset())
+        
+        if not stats['total_interactions']:
+            return Response({
+                'total_interactions': 0,
+                'unique_models': 0,
+                'unique_sessions': 0,
+                'average_rating': 0,
+                'total_cost': 0,
+                'average_response_time': 0,
+                'success_rate': 0,
+                'total_tokens': 0,
+                'most_used_model': None,
+                'interactions_today': 0,
+                'interactions_this_month': 0
+            })
         
         # Round decimal values
         if stats['average_rating']:
@@ -160,58 +226,68 @@ class UserHistoryViewSet(ModelViewSet):
     
     @extend_schema(
         summary="Get user's sessions",
-        description="Get all unique sessions for the user with statistics"
+        description="Get the user's sessions with statistics, most recent first, using cursor pagination"
     )
     @action(detail=False, methods=['get'])
     def sessions(self, request):
         """Get user's unique sessions."""
-        sessions = self.get_queryset().values('session_id').annotate(
-            interaction_count=Count('id'),
-            first_interaction=Min('created_at'),
-            last_interaction=Max('created_at'),
-            unique_models=Count('model', distinct=True),
-            total_cost=Sum('cost_incurred'),
-            average_response_time=Avg('response_time_ms')
-        ).order_by('-last_interaction')
+        # Unfiltered requests read the materialized sessions
+        sessions = self.get_summary_queryset(UserSession.objects.all())
+        if sessions is None:
+            sessions = self.get_queryset().values('session_id').annotate(
+                interaction_count=Count('id'),
+                first_interaction=Min('created_at'),
+                last_interaction=Max('created_at'),
+                unique_models=Count('model', distinct=True),
+                total_cost=Sum('cost_incurred'),
+                average_response_time=Avg('response_time_ms')
+            )
+        
+        paginator = RecentActivityCursorPagination()
+        paginator.ordering = '-last_interaction'
+        page = paginator.paginate_queryset(sessions, request)
         
         # Round decimal values
-        for session in sessions:
-            if session['total_cost']:
-                session['total_cost'] = round(float(session['total_cost']), 6)
-            if session['average_response_time']:
+        for session in page:
+            if isinstance(session, dict) and session['average_response_time']:
                 session['average_response_time'] = round(session['average_response_time'], 2)
         
-        serializer = SessionStatsSerializer(sessions, many=True)
-        return Response(serializer.data)
+        serializer = SessionStatsSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @extend_schema(
         summary="Get interaction timeline",
-        description="Get user's interaction timeline with daily aggregations"
+        description="Get user's interaction timeline aggregated into hour, day, week or month buckets"
     )
     @action(detail=False, methods=['get'])
     def timeline(self, request):
         """Get user interaction timeline."""
-        # Get date range from query params
-        days = int(request.query_params.get('days', 30))
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=days)
-        
-        # Get daily aggregations
-        daily_stats = self.get_queryset().filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        ).extra(
-            select={'day': 'date(created_at)'}
-        ).values('day').annotate(
-            interactions=Count('id'),
-            successful_interactions=Count('id', filter=Q(response_status='success')),
-            total_cost=Sum('cost_incurred'),
-            average_response_time=Avg('response_time_ms'),
-            unique_models=Count('model', distinct=True)
-        ).order_by('day')
+        # Get buckets from query params
+        try:
+            buckets = TimeBuckets.from_request(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Daily buckets in the rollup time zone are served from the rollups
+        daily_usage = self.get_summary_queryset(UserDailyUsage.objects.all())
+        if (daily_usage is not None and buckets.bucket == 'day'
+                and str(buckets.tz) == str(timezone.get_default_timezone())):
+            daily_stats = self.get_summary_timeline(daily_usage, buckets)
+        else:
+            daily_stats = buckets.aggregate(
+                self.get_queryset(),
+                interactions=Count('id'),
+                successful_interactions=Count('id', filter=Q(response_status='success')),
+                total_cost=Sum('cost_incurred'),
+                average_response_time=Avg('response_time_ms'),
+                unique_models=Count('model', distinct=True)
+            )
         
         # Calculate success rate and round values
         for day_stat in daily_stats:
+            # Bucket label under the key clients of the daily-only timeline read
+            day_stat['day'] = day_stat['period']
+            
             total = day_stat['interactions']
             successful = day_stat['successful_interactions']
             day_stat['success_rate'] = (successful / total * 100) if total > 0 else 0
@@ -225,6 +301,39 @@ class UserHistoryViewSet(ModelViewSet):
         
         return Response(daily_stats)
     
+    def get_summary_timeline(self, daily_usage, buckets):
+        """Build the daily timeline from rollup rows."""
+        daily_usage = daily_usage.filter(
+            day__gte=UserDailyUsage.day_for(buckets.start),
+            day__lt=UserDailyUsage.day_for(buckets.end)
+        )
+        unique_models = UserDailyUsage.count_distinct(daily_usage, 'model_ids', group_by='day')
+        
+        rows_by_start = {}
+        for row in daily_usage.values('day').annotate(
+            interactions=Sum('interaction_count'),
+            successful_interactions=Sum('success_count'),
+            total_cost=Sum('total_cost'),
+            response_time_sum=Sum('response_time_sum')
+        ):
+            day_start, _ = UserDailyUsage.day_range(row['day'])
+            rows_by_start[day_start] = {
+                'interactions': row['interactions'],
+                'successful_interactions': row['successful_interactions'],
+                'total_cost': row['total_cost'],
+                'average_response_time': row['response_time_sum'] / row['interactions'],
+                'unique_models': unique_models.get(row['day'], 0),
+            }
+        
+        daily_stats = buckets.fill(rows_by_start, {
+            'interactions': 0,
+            'successful_interactions': 0,
+            'total_cost': 0,
+            'average_response_time': 0,
+            'unique_models': 0,
+        })
+        return daily_stats
+    
     @extend_schema(
         summary="Export user history",
         description="Export user's interaction history in CSV format"
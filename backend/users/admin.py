@@ -35,7 +35,7 @@ class UserAdmin(BaseUserAdmin):
             )
         }),
         ('Activity Tracking', {
-            'fields': ('last_login', 'login_count')
+            'fields': ('login_count',)
         }),
     )
     
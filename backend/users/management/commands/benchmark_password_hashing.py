@@ -0,0 +1,52 @@
+"""
+Benchmark password verification throughput per hasher.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+from users.hashers import TunedArgon2PasswordHasher
+
+
+class Command(BaseCommand):
+    help = "Measure logins/sec per core for PBKDF2, stock argon2 and the tuned argon2 hasher"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3.0, help="Timed seconds per measurement")
+        parser.add_argument('--threads', type=int, default=4, help="Concurrent logins in the threaded run")
+    
+    def handle(self, *args, **options):
+        hashers = {
+            'PBKDF2 (Django default)': PBKDF2PasswordHasher(),
+            'argon2 (Django default)': Argon2PasswordHasher(),
+            'argon2 (tuned)': TunedArgon2PasswordHasher(),
+        }
+        password = 'correct horse battery staple'
+        
+        self.stdout.write(f"{options['seconds']:.0f} s per run, {options['threads']} threads in the threaded run")
+        for name, hasher in hashers.items():
+            encoded = hasher.encode(password, hasher.salt())
+            verify = lambda: hasher.verify(password, encoded)
+            
+            single = self.rate(verify, options['seconds'])
+            threaded = self.threaded_rate(verify, options['seconds'], options['threads'])
+            self.stdout.write(
+                f"  {name:<26} {1000 / single:8.1f} ms/login   "
+                f"{single:8.1f} logins/sec/core   {threaded:8.1f} logins/sec threaded"
+            )
+    
+    def rate(self, run, seconds):
+        """Get runs per second on this thread."""
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            run()
+            count += 1
+        return count / (time.perf_counter() - started)
+    
+    def threaded_rate(self, run, seconds, threads):
+        """Get total runs per second across threads, to show whether hashing releases the GIL."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            counts = list(pool.map(lambda _: self.rate(run, seconds) * seconds, range(threads)))
+        return sum(counts) / (time.perf_counter() - started)
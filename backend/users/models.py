@@ -65,6 +65,35 @@ class User(AbstractUser, BaseModel):
     def __str__(self):
         return f"{self.username} ({self.email})"
     
+    def save(self, *args, **kwargs):
+        # A save would write the token's possibly stale username, active and staff flags back
+        if getattr(self, '_built_from_claims', False):
+            raise ValueError("Users built from token claims can't be saved; load the user first.")
+        
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        
+        # Import here to avoid circular imports
+        from developers.api_keys import CACHED_USER_FIELDS, invalidate_api_key
+        
+        # Developer API key lookups carry a copy of these fields
+        update_fields = kwargs.get('update_fields')
+        if not adding and (update_fields is None or set(update_fields) & set(CACHED_USER_FIELDS)):
+            from developers.models import Developer
+            prefixes = Developer.objects.filter(user=self).exclude(
+                api_key_prefix=None
+            ).values_list('api_key_prefix', flat=True)
+            for prefix in prefixes:
+                invalidate_api_key(prefix)
+    
+    def refresh_from_db(self, using=None, fields=None):
+        """Load every deferred field together when one of them is first read."""
+        # Users built from token claims defer most fields; load them in one query
+        deferred_fields = self.get_deferred_fields()
+        if fields is not None and deferred_fields and set(fields) <= deferred_fields:
+            fields = deferred_fields
+        super().refresh_from_db(using=using, fields=fields)
+    
     def get_full_name(self):
         """Return the full name of the user."""
         return f"{self.first_name} {self.last_name}".strip()
@@ -1,3 +1,89 @@
-from django.test import TestCase
+import threading
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from authentication.authentication import ClaimsJWTAuthentication
+from authentication.tokens import PlatformRefreshToken
+from core.testing import create_user
+from .hashers import run_hashing
+from .models import User
 
-# Create your tests here.
+PLATFORM_HASHERS = [
+    'users.hashers.TunedArgon2PasswordHasher',
+    'users.hashers.PooledPBKDF2PasswordHasher',
+]
+
+
+@override_settings(PASSWORD_HASHERS=PLATFORM_HASHERS)
+class PasswordHasherTests(TestCase):
+    """
+    Passwords must be hashed with the tuned argon2 parameters, upgrading older hashes.
+    """
+    
+    def test_new_passwords_use_tuned_argon2(self):
+        encoded = make_password('correct horse')
+        
+        self.assertTrue(encoded.startswith('argon2$argon2id$v=19$m=19456,t=2,p=1$'))
+        self.assertTrue(check_password('correct horse', encoded))
+        self.assertFalse(check_password('wrong horse', encoded))
+    
+    def test_pbkdf2_hashes_are_upgraded_on_login(self):
+        user = create_user('member', password=None)
+        user.password = make_password('correct horse', hasher='pbkdf2_sha256')
+        user.save(update_fields=['password'])
+        
+        self.assertTrue(user.check_password('correct horse'))
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, 'argon2')
+    
+    @override_settings(PASSWORD_HASHING_WORKERS=2)
+    def test_hashing_runs_on_the_pool(self):
+        self.assertTrue(run_hashing(lambda: threading.current_thread().name).startswith('password-hashing'))
+        self.assertTrue(check_password('correct horse', make_password('correct horse')))
+
+
+class CurrentUserUpdateTests(TestCase):
+    """
+    Updating the current user must not write the access token's claims
+    back over the stored user.
+    """
+    
+    def setUp(self):
+        self.user = create_user('member', is_staff=True)
+        self.client = APIClient()
+        token = PlatformRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def patch_profile(self):
+        response = self.client.patch('/api/v1/users/me/', {'first_name': 'Updated'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return User.objects.get(pk=self.user.pk)
+    
+    def test_patch_keeps_user_deactivated(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False, status='inactive')
+        
+        user = self.patch_profile()
+        self.assertEqual(user.first_name, 'Updated')
+        self.assertFalse(user.is_active)
+        self.assertEqual(user.status, 'inactive')
+    
+    def test_patch_keeps_user_demoted(self):
+        User.objects.filter(pk=self.user.pk).update(is_staff=False, username='renamed')
+        
+        user = self.patch_profile()
+        self.assertEqual(user.first_name, 'Updated')
+        self.assertFalse(user.is_staff)
+        self.assertEqual(user.username, 'renamed')
+    
+    def test_get_returns_stored_user(self):
+        User.objects.filter(pk=self.user.pk).update(username='renamed')
+        
+        response = self.client.get('/api/v1/users/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'renamed')
+    
+    def test_claims_user_refuses_to_save(self):
+        token = PlatformRefreshToken.for_user(self.user).access_token
+        user = ClaimsJWTAuthentication().get_user(token)
+        with self.assertRaises(ValueError):
+            user.save()
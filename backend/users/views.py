@@ -6,7 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django.contrib.auth import update_session_auth_hash
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, Sum
 from drf_spectacular.utils import extend_schema
 from core.permissions import IsOwnerOrAdmin, IsUserOrAdmin
 from .models import User
@@ -105,16 +105,21 @@ class UserViewSet(ModelViewSet):
             )
         
         # Import here to avoid circular imports
-        from user_history.models import UserHistory
+        from user_history.models import UserModelUsage
         from reviews.models import ModelReview
         
+        usage = UserModelUsage.objects.filter(user=user).aggregate(
+            total_interactions=Sum('interaction_count'),
+            unique_models_used=Count('id')
+        )
+        
         stats = {
-            'total_interactions': UserHistory.objects.filter(user=user).count(),
+            'total_interactions': usage['total_interactions'] or 0,
             'total_reviews': ModelReview.objects.filter(user=user).count(),
             'average_rating_given': ModelReview.objects.filter(user=user).aggregate(
                 avg_rating=Avg('rating')
             )['avg_rating'] or 0,
-            'unique_models_used': UserHistory.objects.filter(user=user).values('model').distinct().count(),
+            'unique_models_used': usage['unique_models_used'],
             'account_age_days': (user.created_at.date() - user.date_joined.date()).days if hasattr(user, 'date_joined') else 0,
         }
         
@@ -177,7 +182,8 @@ class CurrentUserView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        # request.user may be built from token claims, which a save would write back
+        return User.objects.get(pk=self.request.user.pk)
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']: